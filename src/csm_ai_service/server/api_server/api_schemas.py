@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import time
+import uuid
 from typing import Dict, List, Literal, Optional, Union
 
+import orjson
 from openai.types.chat import (
     ChatCompletionMessageParam,
     ChatCompletionToolChoiceOptionParam,
@@ -119,3 +121,42 @@ class OpenAIBaseOutput(BaseModel):
 
 class OpenAIChatOutput(OpenAIBaseOutput):
     ...
+
+
+class OpenAIChatStream:
+    """
+    流式输出的快速序列化器：一次流只生成一个 id，并预先把除 content 以外的 JSON 编码成前后缀模板，
+    每个 token 只需用 orjson 编码 content 再拼接，避免逐 token 构造 pydantic 对象和 model_dump_json。
+    输出的 JSON 结构与 OpenAIChatOutput(object="chat.completion.chunk").model_dump_json() 一致。
+    """
+
+    _PLACEHOLDER = "__csm_stream_content__"
+
+    def __init__(self, model: Optional[str] = None, id: Optional[str] = None, **kwargs):
+        self.id = id or f"chat{uuid.uuid4()}"
+        self.model = model
+        frame = OpenAIChatOutput(
+            id=self.id,
+            object="chat.completion.chunk",
+            content=self._PLACEHOLDER,
+            role="assistant",
+            model=model,
+            **kwargs,
+        ).model_dump()
+        encoded = orjson.dumps(frame).decode()
+        self._prefix, self._suffix = encoded.split(orjson.dumps(self._PLACEHOLDER).decode(), 1)
+
+    def chunk(self, content: str) -> str:
+        """编码一个 token（或合并后的一段 token）"""
+        return self._prefix + orjson.dumps(content).decode() + self._suffix
+
+    def output(self, content: str = "", object: str = "chat.completion.chunk", **kwargs) -> OpenAIChatOutput:
+        """构造同一流 id 的完整输出对象，用于携带 docs 等额外字段的非常规帧"""
+        return OpenAIChatOutput(
+            id=self.id,
+            object=object,
+            content=content,
+            role="assistant",
+            model=self.model,
+            **kwargs,
+        )
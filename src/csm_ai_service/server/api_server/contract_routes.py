@@ -3,12 +3,15 @@
 提供合同的增删改查及文件上传接口
 """
 import os
+from typing import Optional
+
 from fastapi import APIRouter, Query
 
 from csm_ai_service.server.utils import ApiResponse
 from csm_ai_service.server.db.repository.contract_repository import (
     get_contract_by_id,
     list_contracts,
+    count_contracts,
     delete_contract,
 )
 from csm_ai_service.settings import Settings
@@ -26,12 +29,17 @@ def _get_contract_file_path(file_name: str) -> str:
 @contract_router.get("/list", response_model=ApiResponse)
 async def get_contracts(
         limit: int = Query(100, description="返回数量限制"),
-        offset: int = Query(0, description="偏移量"),
+        offset: int = Query(0, description="偏移量（传入 cursor 时忽略）"),
+        cursor: Optional[str] = Query(None, description="分页游标，传入上一页返回的 next_cursor"),
 ):
     """获取合同列表"""
     try:
-        contracts = list_contracts(limit=limit, offset=offset)
-        return ApiResponse(success=True, message="获取成功", data={"contracts": contracts, "total": len(contracts)})
+        contracts, next_cursor = list_contracts(limit=limit, offset=offset, cursor=cursor)
+        return ApiResponse(success=True, message="获取成功", data={
+            "contracts": contracts,
+            "total": count_contracts(),
+            "next_cursor": next_cursor,
+        })
     except Exception as e:
         return ApiResponse(success=False, message=f"获取失败: {str(e)}")
 
@@ -1,14 +1,26 @@
 import os
-import shutil
+import uuid
 from typing import Optional
 from fastapi import APIRouter, Body, UploadFile, File
+from starlette.concurrency import run_in_threadpool
+from csm_ai_service.server.upload_utils import (
+    check_upload_size,
+    file_sha256,
+    link_or_copy,
+    save_upload_file,
+)
 from csm_ai_service.server.utils import ApiResponse
 from csm_ai_service.server.protection_audit.audit.extract_audit import get_audit_fields_from_db
 from csm_ai_service.server.protection_audit.tools.file_tools import ensure_cache_dir
 from csm_ai_service.server.protection_audit.tools.pdf_tools import get_pdf_pages
 from csm_ai_service.server.protection_audit.task_queue import task_worker
 from csm_ai_service.settings import Settings
-from csm_ai_service.server.db.repository.contract_repository import get_contract_by_name, add_contract
+from csm_ai_service.server.db.repository.contract_repository import (
+    add_contract,
+    get_contract_by_hash,
+    get_contract_by_name,
+    update_contract,
+)
 from csm_ai_service.server.db.repository.task_repository import get_task_by_id, add_task
 
 ocr_router = APIRouter(prefix="/api", tags=["OCR文件识别"])
@@ -33,33 +45,66 @@ async def pdf_pages(
 
 
 
+def _find_same_contract(file_name: str, file_hash: str) -> Optional[dict]:
+    """
+    按内容哈希查找已上传的相同合同
+    兼容未记录哈希的旧记录：同名且本地文件内容相同时补记哈希
+    """
+    existing = get_contract_by_hash(file_hash)
+    if existing:
+        return existing
+    legacy = get_contract_by_name(file_name)
+    if (legacy and not legacy["file_hash"] and os.path.exists(legacy["file_path"])
+            and file_sha256(legacy["file_path"]) == file_hash):
+        update_contract(legacy["id"], file_hash=file_hash)
+        return legacy
+    return None
+
+
+def _available_file_name(file_name: str, file_hash: str) -> str:
+    """同名文件已被其他内容占用时，文件名追加内容哈希前缀"""
+    if not os.path.exists(os.path.join(Settings.basic_settings.UPLOADS_DIR, file_name)) \
+            and get_contract_by_name(file_name) is None:
+        return file_name
+    stem, ext = os.path.splitext(file_name)
+    return f"{stem}_{file_hash[:8]}{ext}"
+
+
 @ocr_router.post("/upload", response_model=ApiResponse)
 async def upload_contract(
         file: UploadFile = File(..., description="合同文件(PDF)")
 ):
     """
     上传合同文件
-    1. 保存文件到本地
-    2. 创建数据库记录
+    1. 分块保存文件到本地，同时计算内容哈希并检查大小上限
+    2. 按内容哈希去重，相同内容的合同直接重新提交任务，否则创建数据库记录
     3. 创建任务记录（含规则关联）并提交到队列
     4. 立即返回 task_id 和 contract_id
 
     任务在后台依次执行 OCR识别 -> 审计，可通过 /api/contracts/task/{contract_id} 查询进度
     """
+    part_path = None
     try:
         if not file.filename.lower().endswith('.pdf'):
             return ApiResponse(success=False, message="仅支持 PDF 文件上传")
+        check_upload_size(file)
+
+        # 先写入上传目录下的临时文件，确定内容哈希后再决定保留还是丢弃
+        part_path = os.path.join(Settings.basic_settings.UPLOADS_DIR, f".{uuid.uuid4().hex}.upload")
+        saved = await run_in_threadpool(save_upload_file, file, part_path)
 
-        # 检查数据库中是否已存在同名文件
-        existing = get_contract_by_name(file.filename)
+        # 检查数据库中是否已存在相同内容的文件（旧记录需读取整个文件计算哈希，放到线程池）
+        existing = await run_in_threadpool(_find_same_contract, file.filename, saved.sha256)
         if existing:
             existing_contract_id = existing["id"]
-            # 确保缓存目录存在并复制原始文件
+            # 确保缓存目录存在并放入原始文件
             cache_dir = ensure_cache_dir(existing_contract_id)
-            src_path = os.path.join(Settings.basic_settings.UPLOADS_DIR, file.filename)
-            dst_path = os.path.join(cache_dir, file.filename)
-            if os.path.exists(src_path) and not os.path.exists(dst_path):
-                shutil.copy2(src_path, dst_path)
+            src_path = existing["file_path"]
+            dst_path = os.path.join(cache_dir, existing["file_name"])
+            if not os.path.exists(src_path):
+                os.replace(part_path, src_path)
+            if not os.path.exists(dst_path):
+                await run_in_threadpool(link_or_copy, src_path, dst_path)
             task_id = add_task(
                 contract_id=existing_contract_id,
                 status="pending",
@@ -71,7 +116,7 @@ async def upload_contract(
                 data={
                     "contract_id": existing_contract_id,
                     "task_id": task_id,
-                    "file_name": file.filename,
+                    "file_name": existing["file_name"],
                     "file_path": dst_path,
                     "status": "pending",
                     "existed": True,
@@ -80,14 +125,10 @@ async def upload_contract(
 
         # 不在数据库中
 
-        filename = file.filename
+        filename = _available_file_name(file.filename, saved.sha256)
         filepath = os.path.join(Settings.basic_settings.UPLOADS_DIR, filename)
-        if not os.path.exists(filepath):
-            content = await file.read()
-            with open(filepath, "wb") as f:
-                f.write(content)
-
-        file_size = os.path.getsize(filepath)
+        os.replace(part_path, filepath)
+        file_size = saved.size
 
         # 创建数据库记录（数据库只存 file_name，不存路径）
         contract_id = add_contract(
@@ -95,13 +136,15 @@ async def upload_contract(
             file_size=file_size,
             file_type="pdf",
             status="pending",
+            file_hash=saved.sha256,
         )
 
-        # 创建合同缓存目录，并将原始文件复制到缓存目录
+        # 创建合同缓存目录，并将原始文件放入缓存目录（同一文件系统内为硬链接，不再复制一份）
         cache_dir = ensure_cache_dir(contract_id)
         dst_path = os.path.join(cache_dir, filename)
-        if os.path.exists(filepath) and not os.path.exists(dst_path):
-            shutil.copy2(filepath, dst_path)
+        if not os.path.exists(dst_path):
+            # 不支持硬链接时会退回完整复制，放到线程池
+            await run_in_threadpool(link_or_copy, filepath, dst_path)
 
         task_id = add_task(
             contract_id=contract_id,
@@ -127,6 +170,9 @@ async def upload_contract(
 
     except Exception as e:
         return ApiResponse(success=False, message=f"上传失败: {str(e)}")
+    finally:
+        if part_path and os.path.exists(part_path):
+            os.remove(part_path)
 
 
 @ocr_router.get("/task/status/{task_id}", response_model=ApiResponse)
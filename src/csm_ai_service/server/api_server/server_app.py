@@ -19,9 +19,16 @@ from csm_ai_service.server.api_server.warning_routes import warning_router
 from csm_ai_service.settings import Settings
 from csm_ai_service.server.api_server.chat_routes import chat_router
 from csm_ai_service.server.api_server.kb_routes import kb_router
-from csm_ai_service.server.utils import MakeFastAPIOffline
+from csm_ai_service.server.utils import MakeFastAPIOffline, ApiResponse
+from csm_ai_service.server.db.base import get_db_lock_stats
+from csm_ai_service.server.db.message_writer import stop_message_writer
 from csm_ai_service.server.api_server.pdf_extract_routes import pdf_extract_router
 from csm_ai_service.server.api_server.chat_manager_routes import chat_manager_router
+from csm_ai_service.server.conversation.chat_agent.agent_chat import warmup_agents
+from csm_ai_service.server.csm_analyze.warning_analysis.analyze_job import start_warning_analyze_workers, \
+    stop_warning_analyze_workers
+from csm_ai_service.server.conversation.chat_agent.alert_api_client import alert_api_client
+from csm_ai_service.server.protection_audit.ocr_client import ocr_client
 from csm_ai_service.utils import build_logger
 logger = build_logger()
 
@@ -49,15 +56,30 @@ def create_app():
 
     @app.on_event("shutdown")
     def shutdown():
-        """服务关闭时停止 TaskWorker 线程"""
+        """服务关闭时停止 TaskWorker 线程，并写完尚未落库的聊天记录"""
         logger.info("服务正在关闭...")
         stop_task_workers()
+        stop_warning_analyze_workers()
+        stop_message_writer()
         logger.info("服务关闭完成")
 
+    @app.on_event("shutdown")
+    async def close_http_clients():
+        """关闭告警平台接口与 OCR 服务连接池"""
+        await alert_api_client.aclose()
+        ocr_client.close()
+
     @app.on_event("startup")
     def on_startup():
         """服务启动时执行初始化"""
         start_task_workers()
+        start_warning_analyze_workers()
+        warmup_agents()
+
+    @app.get("/server/db_stats", summary="数据库锁竞争统计", response_model=ApiResponse)
+    async def db_stats():
+        """返回 SQLite 锁等待次数、耗时以及连接池状态"""
+        return ApiResponse(success=True, message="获取成功", data=get_db_lock_stats())
 
     @app.get("/index",summary="文档展示页面", include_in_schema=False)
     async def root():
@@ -2,6 +2,8 @@
 任务管理 API 路由
 """
 import os
+from typing import Optional
+
 from fastapi import APIRouter, Query
 
 from csm_ai_service.server.api_server.contract_routes import _get_contract_file_path
@@ -13,6 +15,7 @@ from csm_ai_service.server.db.repository.task_repository import (
     get_task_by_id,
     get_task_by_contract_id,
     list_tasks,
+    count_tasks,
     delete_task,
 )
 from csm_ai_service.server.protection_audit.task_queue import task_worker
@@ -51,15 +54,16 @@ async def get_task(task_id: int):
 @task_router.get("", response_model=ApiResponse)
 async def get_all_tasks(
     limit: int = Query(100, description="返回数量限制"),
-    offset: int = Query(0, description="偏移量"),
+    offset: int = Query(0, description="偏移量（传入 cursor 时忽略）"),
+    cursor: Optional[str] = Query(None, description="分页游标，传入上一页返回的 next_cursor"),
 ):
     """查看所有任务列表"""
     try:
-        tasks = list_tasks(limit=limit, offset=offset)
+        tasks, next_cursor = list_tasks(limit=limit, offset=offset, cursor=cursor)
         return ApiResponse(
             success=True,
             message="获取成功",
-            data={"tasks": tasks, "total": len(tasks)}
+            data={"tasks": tasks, "total": count_tasks(), "next_cursor": next_cursor}
         )
     except Exception as e:
         return ApiResponse(success=False, message=f"获取任务列表失败: {str(e)}")
@@ -4,7 +4,11 @@ from fastapi.responses import FileResponse
 
 from csm_ai_service.utils import build_logger
 from csm_ai_service.server.csm_analyze.warning_analysis.gen_notice import generate_doc_from_data
-from csm_ai_service.server.csm_analyze.warning_analysis.report_analyze import warning_analyze, save_warning_report, delete_warning_report
+from csm_ai_service.server.csm_analyze.warning_analysis.report_analyze import warning_analyze, save_warning_report, delete_warning_report, \
+    get_warning_cache_stats
+from csm_ai_service.server.csm_analyze.warning_analysis.analyze_job import submit_warning_analyze, \
+    get_warning_analyze_job, stream_warning_analyze_job
+from csm_ai_service.server.utils import BaseResponse
 
 logger = build_logger()
 
@@ -15,6 +19,21 @@ warning_router.post(
     summary="对告警处置报告进行研判",
 )(warning_analyze)
 
+warning_router.post(
+    "/analyze/submit",
+    summary="提交告警处置报告异步研判任务",
+)(submit_warning_analyze)
+
+warning_router.get(
+    "/analyze/jobs/{job_id}",
+    summary="查询告警处置报告研判任务进度及结果",
+)(get_warning_analyze_job)
+
+warning_router.get(
+    "/analyze/jobs/{job_id}/stream",
+    summary="流式获取告警处置报告研判任务进度",
+)(stream_warning_analyze_job)
+
 
 @warning_router.post(
     "/generate_notice_doc",
@@ -60,3 +79,8 @@ warning_router.post(
     "/delete_warning_report",
     summary="删除告警处置报告",
 )(delete_warning_report)
+
+
+@warning_router.get("/cache_stats", summary="告警报告解析/研判缓存统计")
+def warning_cache_stats() -> BaseResponse:
+    return BaseResponse(data=get_warning_cache_stats())
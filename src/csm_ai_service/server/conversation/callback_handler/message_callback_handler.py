@@ -3,7 +3,7 @@ from typing import Any, Dict, List
 from langchain_core.callbacks.base import BaseCallbackHandler
 from langchain_core.outputs import LLMResult
 
-from csm_ai_service.server.db.repository import update_response_message
+from csm_ai_service.server.db.message_writer import enqueue_response_update
 
 
 class MessageCallbackHandler(BaseCallbackHandler):
@@ -30,5 +30,5 @@ class MessageCallbackHandler(BaseCallbackHandler):
 
     def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
         answer = response.generations[0][0].text
-        update_response_message(self.message_id, answer)
+        enqueue_response_update(self.message_id, answer)
 
@@ -2,7 +2,7 @@ from typing import Any, Dict, List
 from langchain_core.callbacks.base import BaseCallbackHandler
 from langchain_core.outputs import LLMResult
 
-from csm_ai_service.server.db.repository import update_user_message
+from csm_ai_service.server.db.message_writer import enqueue_user_response_update
 from csm_ai_service.server.conversation.user_base.faiss_user_service import FaissUserService
 
 
@@ -31,7 +31,7 @@ class UserCallbackHandler(BaseCallbackHandler):
 
     def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
         answer = response.generations[0][0].text
-        update_user_message(self.message_id, answer)
+        enqueue_user_response_update(self.message_id, answer)
 
         # 添加到faiss向量库中
         service = FaissUserService(self.user_id)
@@ -3,11 +3,12 @@ from fastapi import Body
 from langchain_classic.callbacks import AsyncIteratorCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate
 from sse_starlette.sse import EventSourceResponse
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.chat.utils import History
 from typing import AsyncIterable
 import asyncio
 from csm_ai_service.server.utils import (
+    coalesce_tokens,
     get_ChatOpenAI,
     get_prompt_template,
     wrap_done
@@ -46,15 +47,9 @@ async def chat(
         )
 
         if stream:
-            async for token in callback.aiter():
-                ret = OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=model_name,
-                )
-                yield ret.model_dump_json()
+            stream_output = OpenAIChatStream(model=model_name)
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
+                yield stream_output.chunk(token)
         else:
             answer = ""
             async for token in callback.aiter():
@@ -10,14 +10,14 @@ from sse_starlette.sse import EventSourceResponse
 from langchain_core.prompts import ChatPromptTemplate
 
 from csm_ai_service.server.conversation.callback_handler.message_callback_handler import MessageCallbackHandler
-from csm_ai_service.server.db.repository import add_message_to_db
+from csm_ai_service.server.db.message_writer import enqueue_message
 from csm_ai_service.server.conversation.knowledge_base.kb_cache.faiss_cache import memo_faiss_pool
 from csm_ai_service.settings import Settings
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.chat.utils import History
 from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_temp_docs
 from csm_ai_service.server.conversation.knowledge_base.utils import KnowledgeFile
-from csm_ai_service.server.utils import (wrap_done, get_ChatOpenAI, BaseResponse, get_prompt_template, run_in_thread_pool, get_temp_dir)
+from csm_ai_service.server.utils import (wrap_done, coalesce_tokens, get_ChatOpenAI, BaseResponse, get_prompt_template, run_in_thread_pool, get_temp_dir)
 
 from csm_ai_service.server.utils import build_logger
 
@@ -123,7 +123,7 @@ async def file_chat(query: str = Body(..., description="用户输入", examples=
     async def file_chat_iterator() -> AsyncIterable[str]:
 
         meta_data = {"file_id": file_id, "file_names": file_names}
-        message_id = add_message_to_db(query=query, conversation_id=conversation_id, metadata=meta_data)
+        message_id = enqueue_message(query=query, conversation_id=conversation_id, metadata=meta_data)
         message_callback = MessageCallbackHandler(conversation_id=conversation_id, message_id=message_id, query=query)
         nonlocal prompt_name
 
@@ -159,15 +159,9 @@ async def file_chat(query: str = Body(..., description="用户输入", examples=
         )
 
         if stream:
-            async for token in callback.aiter():
-                ret = OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=model,
-                )
-                yield ret.model_dump_json()
+            stream_output = OpenAIChatStream(model=model)
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
+                yield stream_output.chunk(token)
         else:
             answer = ""
             async for token in callback.aiter():
@@ -8,12 +8,13 @@ from langchain_classic.callbacks import AsyncIteratorCallbackHandler
 from sse_starlette.sse import EventSourceResponse
 from langchain_core.prompts import ChatPromptTemplate
 from csm_ai_service.settings import Settings
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.chat.utils import History
 from csm_ai_service.server.conversation.knowledge_base.kb_service.base import KBServiceFactory
-from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_docs
+from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_kb_docs
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
 from csm_ai_service.server.conversation.knowledge_base.utils import format_reference
-from csm_ai_service.server.utils import (wrap_done, get_ChatOpenAI,
+from csm_ai_service.server.utils import (wrap_done, coalesce_tokens, get_ChatOpenAI,
                           BaseResponse, get_prompt_template,)
 
 from csm_ai_service.server.utils import build_logger
@@ -34,19 +35,27 @@ async def kb_chat(query: str = Body(..., description="用户输入", examples=["
     temperature = Settings.model_settings.TEMPERATURE
     max_tokens = Settings.model_settings.MAX_TOKENS
     prompt_name = "default"
-    kb = KBServiceFactory.get_service_by_name(kb_name)
+    kb = await run_in_threadpool(KBServiceFactory.get_service_by_name, kb_name)
     if kb is None:
         return BaseResponse(code=404, msg=f"未找到知识库 {kb_name}")
 
     async def knowledge_base_chat_iterator() -> AsyncIterable[str]:
         nonlocal prompt_name
-        docs = await run_in_threadpool(search_docs,
-                                       query=query,
-                                       knowledge_base_name=kb_name,
-                                       top_k=top_k,
-                                       score_threshold=score_threshold,
-                                       file_name="",
-                                       metadata={})
+        cache_lookup = None
+        if Settings.kb_settings.SEMANTIC_CACHE_ENABLED and not return_direct:
+            cache_lookup = await run_in_threadpool(semantic_cache.lookup, kb_name, query, kb.embed_model)
+        cached = cache_lookup.hit if cache_lookup is not None else None
+        if cached is not None:
+            docs = cached.docs
+        else:
+            # 语义缓存未命中时复用其问题向量检索，不再重复向量化
+            docs = await run_in_threadpool(search_kb_docs,
+                                           kb,
+                                           query,
+                                           top_k,
+                                           score_threshold,
+                                           query_vector=cache_lookup.query_vector if cache_lookup else None,
+                                           embed_model=cache_lookup.embed_model if cache_lookup else None)
         source_documents = format_reference(kb_name, docs)
         if return_direct:
             yield OpenAIChatOutput(
@@ -60,6 +69,26 @@ async def kb_chat(query: str = Body(..., description="用户输入", examples=["
             ).model_dump_json()
             return
 
+        if len(docs) == 0:  # 如果没有找到相关文档，使用empty模板
+            prompt_name = "empty"
+        if len(source_documents) == 0:  # 没有找到相关文档
+            source_documents.append(f"<span style='color:red'>未找到相关文档,该回答为大模型自身能力解答！</span>")
+
+        if cached is not None:  # 语义缓存命中，直接返回历史答案
+            if stream:
+                stream_output = OpenAIChatStream(model=model)
+                yield stream_output.output(docs=source_documents).model_dump_json()
+                yield stream_output.chunk(cached.answer)
+            else:
+                yield OpenAIChatOutput(
+                    id=f"chat{uuid.uuid4()}",
+                    object="chat.completion",
+                    content=cached.answer,
+                    role="assistant",
+                    model=model,
+                ).model_dump_json()
+            return
+
         callback = AsyncIteratorCallbackHandler()
         callbacks = [callback]
 
@@ -71,8 +100,6 @@ async def kb_chat(query: str = Body(..., description="用户输入", examples=["
         )
         context = "\n\n".join([doc["page_content"] for doc in docs])
 
-        if len(docs) == 0:  # 如果没有找到相关文档，使用empty模板
-            prompt_name = "empty"
         prompt_template = get_prompt_template("rag", prompt_name)
         input_msg = History(role="user", content=prompt_template).to_msg_template(False)
         chat_prompt = ChatPromptTemplate.from_messages([input_msg])
@@ -80,39 +107,27 @@ async def kb_chat(query: str = Body(..., description="用户输入", examples=["
         chain = chat_prompt | llm
 
         # Begin a task that runs in the background.
-        task = asyncio.create_task(wrap_done(
-            chain.ainvoke({"context": context, "question": query}),
-            callback.done),
-        )
-
-        if len(source_documents) == 0:  # 没有找到相关文档
-            source_documents.append(f"<span style='color:red'>未找到相关文档,该回答为大模型自身能力解答！</span>")
+        generation = asyncio.ensure_future(chain.ainvoke({"context": context, "question": query}))
+        task = asyncio.create_task(wrap_done(generation, callback.done))
 
         if stream:
             # yield documents first
-            ret = OpenAIChatOutput(
-                id=f"chat{uuid.uuid4()}",
-                object="chat.completion.chunk",
-                content="",
-                role="assistant",
-                model=model,
-                docs=source_documents,
-            )
-            yield ret.model_dump_json()
+            stream_output = OpenAIChatStream(model=model)
+            yield stream_output.output(docs=source_documents).model_dump_json()
 
-            async for token in callback.aiter():
-                ret = OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=model,
-                )
-                yield ret.model_dump_json()
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
+                yield stream_output.chunk(token)
         else:
             answer = ""
             async for token in callback.aiter():
                 answer += token
+        await task
+
+        # 只缓存完整生成成功的答案（非流式调用方只取第一帧，因此需在 yield 之前写入）
+        if cache_lookup is not None and not generation.cancelled() and generation.exception() is None:
+            semantic_cache.store(cache_lookup, generation.result().content, docs)
+
+        if not stream:
             ret = OpenAIChatOutput(
                 id=f"chat{uuid.uuid4()}",
                 object="chat.completion",
@@ -121,7 +136,6 @@ async def kb_chat(query: str = Body(..., description="用户输入", examples=["
                 model=model,
             )
             yield ret.model_dump_json()
-        await task
 
     if stream:
         return EventSourceResponse(knowledge_base_chat_iterator())
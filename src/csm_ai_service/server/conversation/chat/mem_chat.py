@@ -4,14 +4,16 @@ from fastapi import Body
 from langchain_classic.callbacks import AsyncIteratorCallbackHandler
 from sse_starlette.sse import EventSourceResponse
 
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.callback_handler.message_callback_handler import MessageCallbackHandler
 from csm_ai_service.server.conversation.chat.utils import History
-from csm_ai_service.server.db.repository import add_message_to_db, filter_message
+from csm_ai_service.server.db.message_writer import enqueue_message
+from csm_ai_service.server.db.repository import filter_message
 from langchain_core.prompts import ChatPromptTemplate
 from typing import AsyncIterable
 import asyncio
 from csm_ai_service.server.utils import (
+    coalesce_tokens,
     get_ChatOpenAI,
     get_prompt_template,
     wrap_done
@@ -34,7 +36,7 @@ async def mem_chat(
         callbacks = [callback]
 
         # 负责保存llm response到message db
-        message_id = add_message_to_db(query=query, conversation_id=conversation_id)
+        message_id = enqueue_message(query=query, conversation_id=conversation_id)
         message_callback = MessageCallbackHandler(conversation_id=conversation_id, message_id=message_id,
                                                   query=query)
         callbacks.append(message_callback)
@@ -76,15 +78,9 @@ async def mem_chat(
         )
 
         if stream:
-            async for token in callback.aiter():
-                ret = OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=model_name,
-                )
-                yield ret.model_dump_json()
+            stream_output = OpenAIChatStream(model=model_name)
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
+                yield stream_output.chunk(token)
         else:
             answer = ""
             async for token in callback.aiter():
@@ -3,7 +3,7 @@ from fastapi import Body
 from langchain_classic.callbacks import AsyncIteratorCallbackHandler
 from sse_starlette.sse import EventSourceResponse
 
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.callback_handler.user_callback_handler import UserCallbackHandler
 from csm_ai_service.server.conversation.chat.utils import History
 from langchain_core.prompts import ChatPromptTemplate
@@ -12,12 +12,13 @@ import asyncio
 
 from csm_ai_service.server.conversation.user_base.faiss_user_service import FaissUserService
 from csm_ai_service.server.utils import (
+    coalesce_tokens,
     get_ChatOpenAI,
     get_prompt_template,
     wrap_done
 )
 from csm_ai_service.settings import Settings
-from csm_ai_service.server.db.repository import add_user_message_to_db
+from csm_ai_service.server.db.message_writer import enqueue_user_message
 
 
 async def similar_mem_chat(
@@ -36,7 +37,7 @@ async def similar_mem_chat(
         callbacks = [callback]
 
         # 负责保存llm response到message db
-        message_id = add_user_message_to_db(chat_type="llm_chat", query=query, user_id=user_id)
+        message_id = enqueue_user_message(chat_type="llm_chat", query=query, user_id=user_id)
         user_callback = UserCallbackHandler(user_id=user_id, message_id=message_id,
                                             chat_type="llm_chat",
                                             query=query)
@@ -76,15 +77,9 @@ async def similar_mem_chat(
         )
 
         if stream:
-            async for token in callback.aiter():
-                ret = OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=model_name,
-                )
-                yield ret.model_dump_json()
+            stream_output = OpenAIChatStream(model=model_name)
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
+                yield stream_output.chunk(token)
         else:
             answer = ""
             async for token in callback.aiter():
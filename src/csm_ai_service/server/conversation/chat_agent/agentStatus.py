@@ -1,4 +1,4 @@
-from typing import TypedDict, Literal, List
+from typing import Any, TypedDict, Literal, List
 
 
 # ====================== Agent状态定义 ======================
@@ -15,6 +15,10 @@ class AgentState(TypedDict):
     # 【告警中间结果-start】
     current_tool: str | None
     current_params: dict
+    # 本轮要并行调用的工具 [{"tool": 工具名, "params": 参数}]
+    current_calls: list[dict]
+    # 已执行的工具调用轮数
+    tool_round: int
     # 已执行的工具结果
     tool_results: list[dict]
     # 已调用的工具名称列表（用于避免重复）
@@ -22,6 +26,9 @@ class AgentState(TypedDict):
     # 【告警中间结果-end】
 
     rag_context: str  # RAG检索结果
+    rag_docs: list[dict]  # RAG检索到的原始文档
+    rag_cache: Any  # 语义缓存查询结果（CacheLookup），生成答案后用于写回缓存
+    cached_answer: str  # 语义缓存命中的历史答案
     alert_context: str  # 告警相关查询结果
     final_answer: str
 
@@ -1,21 +1,25 @@
 import uuid
 import asyncio
+import threading
 from typing import AsyncIterable
 from langgraph.graph import StateGraph, START, END
 from langchain_core.prompts import ChatPromptTemplate
 from fastapi import Body
+from fastapi.concurrency import run_in_threadpool
 from sse_starlette.sse import EventSourceResponse
 from langchain_classic.callbacks import AsyncIteratorCallbackHandler
-from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
 from csm_ai_service.server.conversation.callback_handler.message_callback_handler import MessageCallbackHandler
 from csm_ai_service.server.conversation.chat.utils import History
 from csm_ai_service.server.conversation.chat_agent.agentStatus import AgentState
+from csm_ai_service.server.conversation.chat_agent.alert_agent import get_alert_agent
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
 from csm_ai_service.server.conversation.chat_agent.node import supervisor_node, time_parse_node, rag_agent_node, llm_agent_node, alert_agent_node
-from csm_ai_service.server.utils import get_ChatOpenAI, get_prompt_template, wrap_done
-from csm_ai_service.server.db.repository import add_message_to_db, filter_message
+from csm_ai_service.server.utils import coalesce_tokens, get_ChatOpenAI, get_prompt_template, wrap_done
+from csm_ai_service.server.db.message_writer import enqueue_message, enqueue_response_update
+from csm_ai_service.server.db.repository import filter_message
 from csm_ai_service.settings import Settings
 from csm_ai_service.utils import build_logger
-from csm_ai_service.server.db.repository import update_response_message
 logger = build_logger()
 
 
@@ -30,7 +34,40 @@ def save_history(state: AgentState) -> AgentState:
     return state
 
 
+def cache_rag_answer(state: AgentState, answer: str):
+    """RAG 路由生成答案成功后写回语义缓存"""
+    cache_lookup = state.get("rag_cache")
+    if state.get("route") == "rag" and cache_lookup is not None:
+        semantic_cache.store(cache_lookup, answer, state.get("rag_docs", []))
+
+
 # ====================== 构建工作流（不包含答案生成）=====================
+_agent_graph = None
+_agent_graph_lock = threading.Lock()
+
+
+def get_agent():
+    """
+    获取已编译的智能体工作流。
+    工作流结构只由节点函数决定、与配置无关，编译一次后所有请求共用；节点内读取的配置仍在运行时生效。
+    """
+    global _agent_graph
+    if _agent_graph is None:
+        with _agent_graph_lock:
+            if _agent_graph is None:
+                _agent_graph = create_agent()
+    return _agent_graph
+
+
+def warmup_agents():
+    """服务启动时预先编译工作流，避免首个请求承担编译开销"""
+    try:
+        get_agent()
+        get_alert_agent()
+    except Exception as e:
+        logger.warning(f"智能体工作流预编译失败，将在首次请求时重试: {e}")
+
+
 def create_agent():
     """创建智能体工作流 - 只执行到数据收集阶段"""
     workflow = StateGraph(AgentState)
@@ -53,8 +90,8 @@ def create_agent():
 
 
 # ====================== 答案生成 ======================
-def generate_answer_sync(state: AgentState) -> str:
-    """同步生成最终答案"""
+async def generate_answer(state: AgentState) -> str:
+    """非流式生成最终答案"""
     route = state.get("route", "llm")
     query = state["query"]
 
@@ -82,9 +119,10 @@ def generate_answer_sync(state: AgentState) -> str:
     chain = ChatPromptTemplate.from_messages([History(role="user", content=prompt).to_msg_template(False)]) | llm
 
     try:
-        response = chain.invoke(context_vars)
+        response = await chain.ainvoke(context_vars)
         answer = response.content if hasattr(response, 'content') else str(response)
         log(f"✅ 答案生成完成，长度: {len(answer)} 字符")
+        cache_rag_answer(state, answer)
         return answer
     except Exception as e:
         log(f"❌ 答案生成失败: {e}")
@@ -102,34 +140,36 @@ async def agent_chat(
     """电力告警智能体对话接口"""
 
     log(f"========== 请求开始: {query} [stream={stream}] ==========")
-    msg_id = add_message_to_db(conversation_id, query, "")
+    msg_id = enqueue_message(conversation_id, query, "")
 
     history = []
     if conversation_id:
-        history = [{"user": r["query"], "answer": r["response"]} for r in
-                   filter_message(conversation_id, limit=10, offset=0)]
+        messages = await run_in_threadpool(filter_message, conversation_id, limit=10, offset=0)
+        history = [{"user": r["query"], "answer": r["response"]} for r in messages]
         log(f"历史记录: {len(history)}条")
 
-    agent = create_agent()
+    agent = get_agent()
 
     # 初始化状态
     init_state = {
         "query": query, "route": "",
         "time_desc": "", "start_date": "", "end_date": "", "query_year": 0, "query_month": 0,
-        "current_tool": "", "current_params": {}, "tool_results": [], "executed_tools": [],
-        "alert_context": "", "rag_context": "", "final_answer": "",
+        "current_tool": "", "current_params": {}, "current_calls": [], "tool_round": 0,
+        "tool_results": [], "executed_tools": [],
+        "alert_context": "", "rag_context": "", "rag_docs": [], "rag_cache": None, "cached_answer": "",
+        "final_answer": "",
         "chat_history": history, "conversation_id": conversation_id, "is_stream": stream,
         "msg_id": msg_id
     }
 
     if not stream:
-        # 非流式：执行工作流 + 同步生成答案
-        state = agent.invoke(init_state)
-        answer = generate_answer_sync(state)
+        # 非流式：执行工作流 + 生成答案
+        state = await agent.ainvoke(init_state)
+        answer = state.get("cached_answer") or await generate_answer(state)
         state["final_answer"] = answer
 
 
-        update_response_message(msg_id, answer)
+        enqueue_response_update(msg_id, answer)
 
         save_history(state)
 
@@ -144,7 +184,8 @@ async def agent_chat(
         # 流式处理 - 仿照 agent_chat.py.bak 的实现
         async def iterator() -> AsyncIterable[str]:
             try:
-                state = agent.invoke(init_state.copy())
+                # 节点均为异步实现，工作流运行期间不阻塞事件循环，其他 SSE 流和请求可以并发处理
+                state = await agent.ainvoke(init_state.copy())
             except Exception as e:
                 log(f"❌ 智能体节点执行失败: {e}")
                 yield OpenAIChatOutput(
@@ -160,6 +201,15 @@ async def agent_chat(
             route = state.get("route", "llm")
             query = state["query"]
 
+            stream_output = OpenAIChatStream(model=Settings.model_settings.DEFAULT_LLM_MODEL)
+            if state.get("cached_answer"):  # 语义缓存命中，直接返回历史答案
+                answer = state["cached_answer"]
+                yield stream_output.chunk(answer)
+                enqueue_response_update(msg_id, answer)
+                state["final_answer"] = answer
+                save_history(state)
+                return
+
             if route == "alert":
                 prompt = get_prompt_template("agent", "alert_polish")
                 alert_context = state.get("alert_context", "未获取告警数据")
@@ -183,20 +233,17 @@ async def agent_chat(
 
             chain = ChatPromptTemplate.from_messages(
                 [History(role="user", content=prompt).to_msg_template(False)]) | llm
-            task = asyncio.create_task(wrap_done(chain.ainvoke(context_vars), callback.done))
+            generation = asyncio.ensure_future(chain.ainvoke(context_vars))
+            task = asyncio.create_task(wrap_done(generation, callback.done))
 
             full = ""
-            async for token in callback.aiter():
+            async for token in coalesce_tokens(callback.aiter(), Settings.basic_settings.SSE_COALESCE_INTERVAL):
                 full += token
-                yield OpenAIChatOutput(
-                    id=f"chat{uuid.uuid4()}",
-                    object="chat.completion.chunk",
-                    content=token,
-                    role="assistant",
-                    model=Settings.model_settings.DEFAULT_LLM_MODEL
-                ).model_dump_json()
+                yield stream_output.chunk(token)
 
             await task
+            if not generation.cancelled() and generation.exception() is None:
+                cache_rag_answer(state, generation.result().content)
             state["final_answer"] = full
             save_history(state)
 
@@ -1,11 +1,13 @@
+import hashlib
 import json
-import requests
+import threading
 from typing import Literal
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, START, END
 
 import csm_ai_service.settings
 from csm_ai_service.server.conversation.chat_agent.agentStatus import AgentState
+from csm_ai_service.server.conversation.chat_agent.alert_api_client import alert_api_client
 from csm_ai_service.server.utils import get_ChatOpenAI
 from csm_ai_service.settings import Settings, AlertToolConfig
 from csm_ai_service.utils import build_logger
@@ -23,26 +25,10 @@ def log(msg: str):
 
 
 def make_api_caller(tool_config: AlertToolConfig):
-    """创建API调用函数"""
+    """创建异步API调用函数，通过共享的告警平台客户端调用（连接池、响应缓存、请求合并）"""
 
-    def caller(**kwargs):
-        try:
-            url = tool_config.url
-            method = tool_config.method.upper()
-            headers = {"Content-Type": "application/json", "User": "00616400000082"}
-
-            if method == "GET":
-                res = requests.get(url, headers=headers, params=kwargs, timeout=tool_config.timeout)
-            else:
-                res = requests.post(url, json=kwargs, headers=headers, timeout=tool_config.timeout)
-
-            return {
-                "tool": tool_config.name,
-                "status": "success" if res.status_code == 200 else "error",
-                "data": res.json() if res.text else {}
-            }
-        except Exception as e:
-            return {"tool": tool_config.name, "status": "error", "error": str(e)}
+    async def caller(**kwargs):
+        return await alert_api_client.call(tool_config, kwargs)
 
     return caller
 
@@ -54,6 +40,7 @@ def build_tools():
         name = c.name
         tool_funcs[name] = {
             "func": make_api_caller(c),
+            "config": c,
             "desc": c.description,
             "params": c.params}
 
@@ -79,7 +66,7 @@ def build_tool_descriptions(tools) -> str:
 class AlertAgent:
     def __init__(self, name: str = "告警智能体", max_iter: int = 2):
         self.name = name
-        self.max_iter = max_iter  # 单次最多调用工具次数
+        self.max_iter = max_iter  # 单次最多调用工具轮数，每轮可并行调用多个工具
         self.tools = build_tools()
         self.llm = get_ChatOpenAI(Settings.model_settings.DEFAULT_LLM_MODEL,
                                   temperature=Settings.model_settings.TEMPERATURE)
@@ -88,7 +75,7 @@ class AlertAgent:
     # ==============================
     # 节点函数
     # ==============================
-    def _select_tool(self, state: AgentState) -> AgentState:
+    async def _select_tool(self, state: AgentState) -> AgentState:
         """
         选择工具 - 基于已有结果，决定是否需要调用更多工具
         """
@@ -122,20 +109,19 @@ class AlertAgent:
 已调用的工具：{executed if executed else '无'}
 
 请判断：
-1. 如果还需要更多数据，返回下一个要调用的工具
+1. 如果还需要更多数据，返回接下来要调用的工具；相互独立的多个工具可以一次全部列出，它们会被并行调用
 2. 如果数据已足够，返回不需要更多工具
 
 请以JSON格式返回：
-{{"tool_name": "工具名称", "parameters": {{"参数名": "值"}}, "need_more": true/false, "reason": "选择原因"}}
+{{"tools": [{{"tool_name": "工具名称", "parameters": {{"参数名": "值"}}}}], "need_more": true/false, "reason": "选择原因"}}
 
 注意：
-- tool_name: 要调用的工具名，如果不需要更多工具则填 null
-- parameters: 工具参数
+- tools: 要调用的工具列表，每项包含工具名 tool_name 和工具参数 parameters，如果不需要更多工具则返回空列表
 - need_more: 是否需要继续调用更多工具
 - reason: 简要说明选择原因"""
 
         log(f"🤖 正在分析... 已调用{len(executed)}个工具")
-        response = self.llm.invoke([HumanMessage(content=prompt)]).content.strip()
+        response = (await self.llm.ainvoke([HumanMessage(content=prompt)])).content.strip()
         log(f"📤 LLM响应:\n {response}")
 
         # 解析JSON
@@ -144,27 +130,30 @@ class AlertAgent:
             end = response.rfind("}")
             if start != -1 and end != -1:
                 data = json.loads(response[start:end + 1])
-                tool_name = data.get("tool_name")
-                params = data.get("parameters", {})
+                calls = data.get("tools")
+                if calls is None:  # 兼容只返回单个工具的格式
+                    calls = [{"tool_name": data.get("tool_name"), "parameters": data.get("parameters", {})}]
                 need_more = data.get("need_more", False)
                 reason = data.get("reason", "")
 
-                # 检查是否重复调用
-                if tool_name and tool_name in executed:
-                    log(f"⚠️ 工具 {tool_name} 已调用过，跳过")
-                    state["current_tool"] = None
-                    state["current_params"] = {}
-                    state["tool_results"] = results
-                    state["executed_tools"] = executed
-
-                    return state
-
-                if tool_name and tool_name in self.tools:
-                    log(f"✅ 选择工具: {tool_name}, need_more={need_more}")
+                selected = []
+                for call in calls or []:
+                    tool_name = call.get("tool_name")
+                    # 检查是否重复调用
+                    if tool_name in executed or any(c["tool"] == tool_name for c in selected):
+                        log(f"⚠️ 工具 {tool_name} 已调用过，跳过")
+                        continue
+                    if tool_name and tool_name in self.tools:
+                        selected.append({"tool": tool_name, "params": call.get("parameters") or {}})
+                selected = selected[:Settings.agent_tools_settings.ALERT_TOOL_MAX_PARALLEL]
+
+                if selected:
+                    log(f"✅ 选择工具: {[c['tool'] for c in selected]}, need_more={need_more}")
                     if reason:
                         log(f"  原因: {reason}")
-                    state["current_tool"] = tool_name
-                    state["current_params"] = params
+                    state["current_tool"] = selected[0]["tool"]
+                    state["current_params"] = selected[0]["params"]
+                    state["current_calls"] = selected
                     state["tool_results"] = results
                     state["executed_tools"] = executed
 
@@ -175,47 +164,47 @@ class AlertAgent:
         log("ℹ️ 不需要更多工具")
         state["current_tool"] = None
         state["current_params"] = {}
+        state["current_calls"] = []
         state["tool_results"] = results
         state["executed_tools"] = executed
         return state
 
-    def _execute_tool(self, state: AgentState) -> AgentState:
-        """执行工具"""
-        tool_name = state.get("current_tool")
-        if not tool_name or tool_name not in self.tools:
+    async def _execute_tool(self, state: AgentState) -> AgentState:
+        """执行工具，同一轮选中的多个工具并行调用"""
+        calls = [c for c in state.get("current_calls") or [] if c["tool"] in self.tools]
+        if not calls:
             return state
 
         log(f"===== ⚙️ 执行工具 =====")
-        log(f"🔨 执行: {tool_name}")
-
-        params = state.get("current_params", {})
+        log(f"🔨 执行: {[c['tool'] for c in calls]}")
 
         # 执行API调用
-        result = self.tools[tool_name]["func"](**params)
+        call_results = await alert_api_client.call_many(
+            [(self.tools[c["tool"]]["config"], c["params"]) for c in calls])
 
-        # 打印结果
-        result_str = json.dumps(result, ensure_ascii=False)
-        log(f"📄 结果: {result_str}")
-        # 更新结果列表
         results = state.get("tool_results", [])
-        results.append(result)
-
-        # 更新已执行工具列表
         executed = state.get("executed_tools", [])
-        executed.append(tool_name)
+        for call, result in zip(calls, call_results):
+            # 打印结果
+            result_str = json.dumps(result, ensure_ascii=False)
+            log(f"📄 结果: {result_str}")
+            # 更新结果列表和已执行工具列表
+            results.append(result)
+            executed.append(call["tool"])
 
         state["current_tool"] = None
         state["current_params"] = {}
+        state["current_calls"] = []
         state["tool_results"] = results
         state["executed_tools"] = executed
+        state["tool_round"] = state.get("tool_round", 0) + 1
         return state
 
     def _route_after_execute(self, state: AgentState) -> Literal["select_tool", "finalize"]:
         """路由：执行工具后，判断是否需要继续选择工具"""
-        # 检查是否已达到最大调用次数
-        executed = state.get("executed_tools", [])
-        if len(executed) >= self.max_iter:
-            log(f"📊 已达到最大工具调用次数({self.max_iter})")
+        # 检查是否已达到最大调用轮数
+        if state.get("tool_round", 0) >= self.max_iter:
+            log(f"📊 已达到最大工具调用轮数({self.max_iter})")
             return "finalize"
 
         # 继续选择工具
@@ -279,5 +268,44 @@ class AlertAgent:
 
         return wf.compile()
 
-    def run(self, state: AgentState) -> AgentState:
-        return self.graph.invoke(state)
+    async def arun(self, state: AgentState) -> AgentState:
+        return await self.graph.ainvoke(state)
+
+
+# ==============================
+# AlertAgent 缓存
+# ==============================
+_alert_agents = {}
+_alert_agents_lock = threading.Lock()
+
+
+def alert_agent_config_hash() -> str:
+    """影响 AlertAgent 构建结果的配置摘要：工具列表、模型及模型平台配置"""
+    model_settings = Settings.model_settings
+    payload = {
+        "tools": [c.model_dump() for c in Settings.agent_tools_settings.ALERT_TOOLS],
+        "model": model_settings.DEFAULT_LLM_MODEL,
+        "temperature": model_settings.TEMPERATURE,
+        "platforms": [p.model_dump() for p in model_settings.MODEL_PLATFORMS],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def get_alert_agent() -> AlertAgent:
+    """
+    获取已编译的 AlertAgent（工具、LLM 和工作流只构建一次）。
+    配置文件被修改后配置摘要随之变化，下次调用时按新配置重建。
+    """
+    key = alert_agent_config_hash()
+    agent = _alert_agents.get(key)
+    if agent is None:
+        with _alert_agents_lock:
+            agent = _alert_agents.get(key)
+            if agent is None:
+                log("构建 AlertAgent 工作流")
+                agent = AlertAgent()
+                _alert_agents.clear()
+                _alert_agents[key] = agent
+    return agent
+
@@ -0,0 +1,154 @@
+"""
+告警平台接口客户端
+
+告警智能体的所有工具调用共用一个客户端：
+1. 连接池：复用 httpx.AsyncClient 的长连接，不再每次调用新建连接
+2. 响应缓存：按 (工具, 归一化后的参数) 缓存成功的响应，缓存时间由工具配置的 cache_ttl 决定
+3. 请求合并：相同的请求正在进行时，后来的调用直接等待同一个结果
+4. 并行调用：call_many 并发执行一轮中相互独立的多个工具调用
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from csm_ai_service.settings import AlertToolConfig, Settings
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+DEFAULT_HEADERS = {"Content-Type": "application/json", "User": "00616400000082"}
+
+
+def _normalize_params(params: dict) -> dict:
+    """去掉空值参数、去除字符串首尾空白，使语义相同的参数得到相同的缓存键"""
+    normalized = {}
+    for k, v in (params or {}).items():
+        if isinstance(v, str):
+            v = v.strip()
+        if v is None or v == "":
+            continue
+        normalized[k] = v
+    return normalized
+
+
+class AlertApiClient:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+        # httpx.AsyncClient 和进行中的请求都绑定在创建它们的事件循环上
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self.stats = {"request": 0, "cache": 0, "coalesced": 0, "error": 0}
+
+    # ==================== 对外接口 ====================
+
+    async def call(self, tool_config: AlertToolConfig, params: dict) -> dict:
+        """调用单个工具接口，返回 {"tool", "status", "data"/"error"}"""
+        params = _normalize_params(params)
+        key = (tool_config.name, tool_config.method.upper(), tool_config.url,
+               json.dumps(params, sort_keys=True, ensure_ascii=False, default=str))
+
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.stats["cache"] += 1
+            return cached
+
+        self._bind_loop()
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            # shield：某个调用方被取消时不影响其他等待同一结果的调用方
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._fetch(key, tool_config, params))
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._inflight.pop(key) if self._inflight.get(key) is f else None)
+        return await asyncio.shield(future)
+
+    async def call_many(self, calls: List[Tuple[AlertToolConfig, dict]]) -> List[dict]:
+        """并发执行多个工具调用，结果顺序与 calls 一致"""
+        return list(await asyncio.gather(*(self.call(config, params) for config, params in calls)))
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    async def aclose(self):
+        client, self._client, self._loop = self._client, None, None
+        self._inflight = {}
+        if client is not None:
+            await client.aclose()
+
+    # ==================== 内部方法 ====================
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 原事件循环已结束（如测试中多次 asyncio.run），其上的连接和请求无法复用
+            self._loop = loop
+            self._client = None
+            self._inflight = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            tools_settings = Settings.agent_tools_settings
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                limits=httpx.Limits(max_connections=tools_settings.ALERT_API_MAX_CONNECTIONS,
+                                    max_keepalive_connections=tools_settings.ALERT_API_MAX_KEEPALIVE),
+            )
+        return self._client
+
+    async def _fetch(self, key: tuple, tool_config: AlertToolConfig, params: dict) -> dict:
+        result = await self._request(tool_config, params)
+        if result["status"] == "success" and tool_config.cache_ttl > 0:
+            self._put_cached(key, result, tool_config.cache_ttl)
+        return result
+
+    async def _request(self, tool_config: AlertToolConfig, params: dict) -> dict:
+        self.stats["request"] += 1
+        try:
+            client = self._get_client()
+            if tool_config.method.upper() == "GET":
+                res = await client.get(tool_config.url, params=params, timeout=tool_config.timeout)
+            else:
+                res = await client.post(tool_config.url, json=params, timeout=tool_config.timeout)
+
+            return {
+                "tool": tool_config.name,
+                "status": "success" if res.status_code == 200 else "error",
+                "data": res.json() if res.text else {}
+            }
+        except Exception as e:
+            self.stats["error"] += 1
+            logger.warning(f"告警接口 {tool_config.name} 调用失败: {e}")
+            return {"tool": tool_config.name, "status": "error", "error": str(e)}
+
+    def _get_cached(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            item = self._cache.get(key)
+            if item is None:
+                return None
+            expire, result = item
+            if expire < time.time():
+                self._cache.pop(key)
+                return None
+            self._cache.move_to_end(key)
+            return result
+
+    def _put_cached(self, key: tuple, result: dict, ttl: int):
+        max_entries = Settings.agent_tools_settings.ALERT_API_CACHE_MAX_ENTRIES
+        with self._lock:
+            self._cache[key] = (time.time() + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > max_entries:
+                self._cache.popitem(last=False)
+
+
+alert_api_client = AlertApiClient()
@@ -0,0 +1,161 @@
+"""
+意图快速路由
+
+在 supervisor 的 LLM 意图识别之前依次尝试：
+1. 路由缓存：相同（归一化后）问题直接复用上次的路由结果
+2. 正则：命中即路由
+3. 关键词加权打分：某一意图领先足够分数即路由
+4. 向量最近质心：问题向量与各意图示例问题质心的余弦相似度足够高且领先足够幅度即路由
+都没有足够把握时返回 None，由调用方交给 LLM 判断，并通过 remember 写入缓存。
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from csm_ai_service.settings import Settings
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+def _normalize(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class IntentRouter:
+    def __init__(self, embed_func: Callable[[List[str]], List[List[float]]] = None):
+        self._embed_func = embed_func
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._centroids: Optional[Tuple[tuple, List[str], np.ndarray]] = None
+        self._patterns: Optional[Tuple[tuple, Dict[str, List[re.Pattern]]]] = None
+        self.stats = {"cache": 0, "pattern": 0, "keyword": 0, "embedding": 0, "llm": 0}
+
+    # ==================== 对外接口 ====================
+
+    def route(self, query: str) -> Optional[str]:
+        """返回 alert/rag/llm；没有把握时返回 None"""
+        key = _normalize(query)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache"] += 1
+                return self._cache[key]
+
+        for source, classify in (("pattern", self._by_pattern),
+                                 ("keyword", self._by_keyword),
+                                 ("embedding", self._by_embedding)):
+            route = classify(key)
+            if route is not None:
+                logger.info(f"[IntentRouter] {source} 路由: {query} -> {route}")
+                self.remember(query, route, source)
+                return route
+        return None
+
+    def remember(self, query: str, route: str, source: str = "llm"):
+        """写入路由缓存（LLM 判断的结果也通过这里缓存）"""
+        size = Settings.agent_tools_settings.INTENT_ROUTE_CACHE_SIZE
+        key = _normalize(query)
+        with self._lock:
+            self.stats[source] += 1
+            self._cache[key] = route
+            self._cache.move_to_end(key)
+            while len(self._cache) > size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._centroids = None
+            self._patterns = None
+
+    # ==================== 分类器 ====================
+
+    def _by_pattern(self, query: str) -> Optional[str]:
+        config = Settings.agent_tools_settings.INTENT_PATTERNS
+        signature = tuple((k, tuple(v)) for k, v in config.items())
+        if self._patterns is None or self._patterns[0] != signature:
+            compiled = {route: [re.compile(p, re.IGNORECASE) for p in patterns] for route, patterns in config.items()}
+            self._patterns = (signature, compiled)
+        for route, patterns in self._patterns[1].items():
+            if any(p.search(query) for p in patterns):
+                return route
+        return None
+
+    @staticmethod
+    def _by_keyword(query: str) -> Optional[str]:
+        tools_settings = Settings.agent_tools_settings
+        scores = {
+            route: sum(weight for word, weight in keywords.items() if word.lower() in query)
+            for route, keywords in tools_settings.INTENT_KEYWORDS.items()
+        }
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        best_route, best = ranked[0]
+        second = ranked[1][1] if len(ranked) > 1 else 0
+        if best - second >= tools_settings.INTENT_KEYWORD_MARGIN:
+            return best_route
+        return None
+
+    def _by_embedding(self, query: str) -> Optional[str]:
+        tools_settings = Settings.agent_tools_settings
+        if tools_settings.INTENT_EMBEDDING_THRESHOLD > 1:
+            return None
+        try:
+            routes, centroids = self._get_centroids()
+            if not routes:
+                return None
+            vector = self._normalize_rows(np.asarray(self._embed([query]), dtype=np.float32))[0]
+        except Exception as e:
+            logger.warning(f"[IntentRouter] 向量路由失败，交给 LLM: {e}")
+            return None
+        scores = centroids @ vector
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        second = float(scores[order[1]]) if len(order) > 1 else -1.0
+        if best >= tools_settings.INTENT_EMBEDDING_THRESHOLD and best - second >= tools_settings.INTENT_EMBEDDING_MARGIN:
+            return routes[order[0]]
+        return None
+
+    # ==================== 内部方法 ====================
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if self._embed_func is None:
+            from csm_ai_service.server.utils import get_Embeddings
+
+            self._embed_func = get_Embeddings().embed_documents
+        return self._embed_func(texts)
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def _get_centroids(self) -> Tuple[List[str], np.ndarray]:
+        """示例问题的向量质心，示例配置变化时重新计算"""
+        examples = Settings.agent_tools_settings.INTENT_EXAMPLES
+        signature = tuple((k, tuple(v)) for k, v in examples.items())
+        with self._lock:
+            if self._centroids is not None and self._centroids[0] == signature:
+                return self._centroids[1], self._centroids[2]
+        routes = [route for route, texts in examples.items() if texts]
+        texts = [text for route in routes for text in examples[route]]
+        if not texts:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        vectors = self._normalize_rows(np.asarray(self._embed(texts), dtype=np.float32))
+        centroids, start = [], 0
+        for route in routes:
+            count = len(examples[route])
+            centroids.append(vectors[start:start + count].mean(axis=0))
+            start += count
+        centroids = self._normalize_rows(np.vstack(centroids))
+        with self._lock:
+            self._centroids = (signature, routes, centroids)
+        return routes, centroids
+
+
+intent_router = IntentRouter()
@@ -1,9 +1,14 @@
+from fastapi.concurrency import run_in_threadpool
 from langchain_core.prompts import ChatPromptTemplate
 import csm_ai_service.settings
 from csm_ai_service.server.conversation.chat.utils import History
 from csm_ai_service.server.conversation.chat_agent.agentStatus import AgentState
-from csm_ai_service.server.conversation.chat_agent.alert_agent import AlertAgent
-from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_docs
+from csm_ai_service.server.conversation.chat_agent.alert_agent import get_alert_agent
+from csm_ai_service.server.conversation.chat_agent.intent_router import intent_router
+from csm_ai_service.server.conversation.chat_agent.time_parser import has_time_hint, parse_time_expression
+from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_kb_docs
+from csm_ai_service.server.conversation.knowledge_base.kb_service.base import KBServiceFactory
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
 from csm_ai_service.server.utils import get_ChatOpenAI, get_prompt_template
 from csm_ai_service.settings import Settings
 from csm_ai_service.utils import build_logger
@@ -21,7 +26,26 @@ def log(msg: str):
 
 
 # ====================== 时间解析 ======================
-def parse_time(query: str) -> dict:
+async def parse_time(query: str) -> dict:
+    """解析时间语义 - 优先使用规则解析，规则无法识别的时间表达才交给LLM"""
+    from datetime import datetime
+    today = datetime.now().date()
+
+    result = parse_time_expression(query)
+    if result:
+        log(f"时间规则解析结果: {result['time_desc']} ({result['start_date']} ~ {result['end_date']})")
+        return result
+    if not has_time_hint(query):
+        # 没有任何时间表达，默认本月
+        return {
+            "time_desc": "本月",
+            "start_date": f"{today.year}-{today.month:02d}-01",
+            "end_date": str(today),
+        }
+    return await _parse_time_by_llm(query)
+
+
+async def _parse_time_by_llm(query: str) -> dict:
     """解析时间语义 - 使用LLM结合当前时间智能判断"""
     from datetime import datetime
     now = datetime.now()
@@ -61,7 +85,7 @@ def parse_time(query: str) -> dict:
     llm = get_ChatOpenAI(Settings.model_settings.DEFAULT_LLM_MODEL, temperature=0)
     
     try:
-        response = llm.invoke(time_parse_prompt).content.strip()
+        response = (await llm.ainvoke(time_parse_prompt)).content.strip()
         log(f"时间解析LLM响应:\n{response}")
         
         # 提取JSON
@@ -103,58 +127,85 @@ def parse_time(query: str) -> dict:
 
 
 # ====================== 节点函数 ======================
-def time_parse_node(state: AgentState) -> AgentState:
-    data = parse_time(state["query"])
+async def time_parse_node(state: AgentState) -> AgentState:
+    data = await parse_time(state["query"])
     log(f"时间解析: {data['start_date']} ~ {data['end_date']}")
     state.update({**data, "start_date": data["start_date"], "end_date": data["end_date"]})
     return state
 
 
-def supervisor_node(state: AgentState) -> AgentState:
+async def supervisor_node(state: AgentState) -> AgentState:
     log("🎯 Supervisor开始意图识别")
     query = state["query"]
 
+    if Settings.agent_tools_settings.INTENT_ROUTER_ENABLED:
+        # 向量路由需要调用 embedding 模型，放到线程池避免阻塞事件循环
+        route = await run_in_threadpool(intent_router.route, query)
+        if route is not None:
+            state["route"] = route
+            log(f"🎯 意图识别结果(快速路由): {state['route']}")
+            return state
+
     prompt = get_prompt_template("agent", "supervisor")
     llm = get_ChatOpenAI(Settings.model_settings.DEFAULT_LLM_MODEL, temperature=0)
-    route = (ChatPromptTemplate.from_messages(
-        [History(role="user", content=prompt).to_msg_template(False)]) | llm).invoke(
-        {"question": query}).content.strip().lower()
+    route = (await (ChatPromptTemplate.from_messages(
+        [History(role="user", content=prompt).to_msg_template(False)]) | llm).ainvoke(
+        {"question": query})).content.strip().lower()
     if "alert" in route:
         state["route"] = "alert"
     elif "rag" in route:
         state["route"] = "rag"
     else:
         state["route"] = "llm"
+    if Settings.agent_tools_settings.INTENT_ROUTER_ENABLED:
+        intent_router.remember(query, state["route"])
 
     log(f"🎯 意图识别结果: {state['route']}")
     return state
 
 
-def alert_agent_node(state: AgentState) -> AgentState:
+async def alert_agent_node(state: AgentState) -> AgentState:
     """告警智能体节点 - 使用AlertAgent循环调用工具"""
     log("=====🔧 告警智能体节点 =====")
 
-    alert_agent = AlertAgent()
-    result_state = alert_agent.run(state)
+    result_state = await get_alert_agent().arun(state)
 
     log(f"告警Agent结果:\n{result_state.get('alert_context', '')}\n")
     return result_state
 
 
-def rag_agent_node(state: AgentState) -> AgentState:
+async def rag_agent_node(state: AgentState) -> AgentState:
     log("=====📚RAG智能体 =====")
-    docs = search_docs(
-        query=state["query"],
-        knowledge_base_name=Settings.kb_settings.DEFAULT_KNOWLEDGE_BASE,
-        top_k=Settings.kb_settings.VECTOR_SEARCH_TOP_K,
-        score_threshold=Settings.kb_settings.SCORE_THRESHOLD
-    )
+    kb_name = Settings.kb_settings.DEFAULT_KNOWLEDGE_BASE
+    kb = await run_in_threadpool(KBServiceFactory.get_service_by_name, kb_name)
+    cache_lookup = None
+    if kb is not None and Settings.kb_settings.SEMANTIC_CACHE_ENABLED:
+        cache_lookup = await run_in_threadpool(semantic_cache.lookup, kb_name, state["query"], kb.embed_model)
+    if cache_lookup is not None and cache_lookup.hit is not None:
+        docs = cache_lookup.hit.docs
+        state["cached_answer"] = cache_lookup.hit.answer
+        log(f"语义缓存命中，相似度 {cache_lookup.score:.4f}")
+    elif kb is None:
+        docs = []
+    else:
+        # 语义缓存未命中时复用其问题向量检索，不再重复向量化
+        docs = await run_in_threadpool(
+            search_kb_docs,
+            kb,
+            state["query"],
+            Settings.kb_settings.VECTOR_SEARCH_TOP_K,
+            Settings.kb_settings.SCORE_THRESHOLD,
+            query_vector=cache_lookup.query_vector if cache_lookup else None,
+            embed_model=cache_lookup.embed_model if cache_lookup else None,
+        )
     context = "\n\n".join([d["page_content"] for d in docs])
     log(f"检索到 {len(docs)} 个文档")
     state["rag_context"] = context
+    state["rag_docs"] = docs
+    state["rag_cache"] = cache_lookup
     return state
 
 
-def llm_agent_node(state: AgentState) -> AgentState:
+async def llm_agent_node(state: AgentState) -> AgentState:
     log("=====💬通用LLM =====")
     return state
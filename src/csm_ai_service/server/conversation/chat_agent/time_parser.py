@@ -0,0 +1,328 @@
+"""
+基于规则的时间表达式解析（中文/英文）
+
+将查询中的时间语义归一化为 [start_date, end_date] 日期范围（YYYY-MM-DD，均为闭区间）：
+- 相对时间：今天、昨天下午、前天、最近三天、近2周、过去3个月、上周、本月、上上个月、去年、本季度、3天前、上周三
+- 绝对时间：2024年1月、2024年1月5日、2024-01-05、2024/1/5、1月5号、3月、去年3月、上个月5号
+- 日期区间：2024-01-01到2024-01-15、1月1日至1月10日、昨天到今天、本月1号到今天、2025年3月到5月、1-3月
+- 英文：today、yesterday、last 7 days、past 2 weeks、last week、this month、3 days ago
+
+查询从左到右逐段识别（同一位置取最长的匹配），以 到/至/- 相连的两段合并为区间。
+无法识别、识别出多个时间段、或识别后剩余文字中仍有时间语义时返回 None，由调用方决定是否回退到 LLM。
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+_CN_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_CN_UNITS = {"十": 10, "百": 100}
+_NUM = r"(\d+|[零〇一二两三四五六七八九十百]+)"
+_WEEKDAYS = {"一": 0, "二": 1, "三": 2, "四": 3, "五": 4, "六": 5, "日": 6, "天": 6, "七": 6}
+_EN_NUMBERS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+               "ten": 10, "fourteen": 14, "fifteen": 15, "thirty": 30}
+
+_TIME_WORDS = (
+    r"今[天日年]|昨|前天|明[天日年]|[上本这下]个?(?:周|星期|礼拜|月|季)|周[一二三四五六日天末]|星期|礼拜|"
+    r"[去前本]年|季度|最近|近期|近来|过去|[年月][初末底]|以来|小时|[一二三四五六七八九十两]+个?(?:天|日|周|月|年)|"
+    r"\b(today|yesterday|tomorrow|day|days|week|weeks|month|months|year|years|hour|hours|ago|since)\b"
+)
+# 出现这些字样说明查询里可能有时间语义，规则解析不出来时才值得交给 LLM
+TIME_HINT_PATTERN = re.compile(r"\d|" + _TIME_WORDS, re.IGNORECASE)
+# 规则识别出时间段后，剩余文字中仍有这些字样说明时间语义没有完整识别
+_UNPARSED_TIME_PATTERN = re.compile(r"\d+\s*(?:年|月|日|号|天|周|星期|小时|点)|" + _TIME_WORDS, re.IGNORECASE)
+# 区间的连接词
+_RANGE_CONNECTOR = re.compile(r"\s*(?:到|至|~|～|—|-|to|until)\s*")
+# 开头的年份（2024年 / 2024- / 去年），区间结束日期省略年份时沿用
+_YEAR_PREFIX = re.compile(r"\s*(\d{4}\s*[年\-/.]|[前去今本明]年)")
+
+
+def cn_to_int(text: str) -> int:
+    """中文/阿拉伯数字转整数，支持到百位（如 三、十五、二十、一百二十）"""
+    if text.isdigit():
+        return int(text)
+    total, current = 0, 0
+    for ch in text:
+        if ch in _CN_DIGITS:
+            current = _CN_DIGITS[ch]
+        elif ch in _CN_UNITS:
+            total += (current or 1) * _CN_UNITS[ch]
+            current = 0
+        else:
+            raise ValueError(f"无法识别的数字: {text}")
+    return total + current
+
+
+def _shift_months(d: date, months: int) -> date:
+    month_index = d.year * 12 + d.month - 1 + months
+    year, month = divmod(month_index, 12)
+    day = min(d.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day)
+
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _clip(start: date, end: date, today: date) -> Tuple[date, date]:
+    """当前周期（本周/本月/今年等）截止到今天"""
+    return start, min(end, today) if start <= today else end
+
+
+def _last_n(n: int, unit: str, today: date) -> Tuple[date, date]:
+    """最近 N 个单位，包含今天"""
+    if unit in ("天", "日", "day"):
+        return today - timedelta(days=n - 1), today
+    if unit in ("周", "星期", "礼拜", "week"):
+        return today - timedelta(days=n * 7 - 1), today
+    if unit in ("月", "month"):
+        return _shift_months(today, -n) + timedelta(days=1), today
+    if unit in ("年", "year"):
+        return _shift_months(today, -12 * n) + timedelta(days=1), today
+    if unit in ("小时", "hour"):
+        return today - timedelta(days=(n - 1) // 24 + 1), today
+    raise ValueError(unit)
+
+
+def _week_range(today: date, offset: int) -> Tuple[date, date]:
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+    return monday, monday + timedelta(days=6)
+
+
+def _quarter_range(today: date, offset: int) -> Tuple[date, date]:
+    index = today.year * 4 + (today.month - 1) // 3 + offset
+    year, quarter = divmod(index, 4)
+    start = date(year, quarter * 3 + 1, 1)
+    return start, _month_range(year, quarter * 3 + 3)[1]
+
+
+def _year_of(token: str, today: date) -> int:
+    """年份写法：2024 / 2024年 / 2024- / 去年 / 去"""
+    if token[:4].isdigit():
+        return int(token[:4])
+    return today.year + _offset_word(token[0])
+
+
+def _parse_date(year: Optional[str], month: str, day: Optional[str], today: date) -> Tuple[date, date]:
+    m = cn_to_int(month)
+    if year:
+        y = _year_of(year, today)
+    else:
+        # 未写年份时取今年；若该月份还没到，则理解为去年
+        y = today.year if m <= today.month else today.year - 1
+    if day:
+        d = date(y, m, cn_to_int(day))
+        return d, d
+    return _month_range(y, m)
+
+
+def _offset_word(word: str) -> int:
+    return {"上上": -2, "上": -1, "前": -2, "去": -1, "本": 0, "这": 0, "今": 0, "下": 1, "明": 1}[word]
+
+
+_CN_PERIOD_SUFFIX = r"(?:凌晨|早上|上午|中午|下午|傍晚|晚上|夜里|全天)?"
+
+
+def _rules() -> List[Tuple[re.Pattern, Callable[[re.Match, date], Tuple[date, date]]]]:
+    # 带年份时允许 2024-01-05 / 2024/1/5 / 2024.1.5 / 去年3月5日；不带年份时必须写成 1月5日，避免误匹配小数、编号
+    md = r"(\d{1,2}|[一二三四五六七八九十]+)"
+    date_pattern = (r"(?:(\d{4}\s*[年\-/.]|[前去今本明]年)\s*" + md + r"\s*[月\-/.]\s*" + md
+                    + r"|" + md + r"\s*月\s*" + md + r")\s*[日号]?")
+    year_pattern = r"(?:(\d{4}|[前去今本明])\s*年)?\s*"
+
+    def absolute_day(m, today):
+        year, month, day = m.group(1), m.group(2) or m.group(4), m.group(3) or m.group(5)
+        return _parse_date(year, month, day, today)
+
+    def last_n(m, today):
+        unit = m.group(2)
+        return _last_n(cn_to_int(m.group(1)), "月" if unit.endswith("月") else unit, today)
+
+    def days_ago(m, today):
+        d = today - timedelta(days=cn_to_int(m.group(1)))
+        return d, d
+
+    def relative_day(m, today):
+        offset = {"今": 0, "昨": -1, "前": -2, "大前": -3, "明": 1}[m.group(1)]
+        d = today + timedelta(days=offset)
+        return d, d
+
+    def weekday(m, today):
+        offset = {"上上": -2, "上": -1, "本": 0, "这": 0, "": 0, "下": 1}[m.group(1) or ""]
+        monday = _week_range(today, offset)[0]
+        d = monday + timedelta(days=_WEEKDAYS[m.group(2)])
+        if not m.group(1) and d > today:
+            # 只说“周五”时指最近已经过去的那一天
+            d -= timedelta(weeks=1)
+        return d, d
+
+    def week(m, today):
+        return _clip(*_week_range(today, _offset_word(m.group(1))), today)
+
+    def month(m, today):
+        first = _shift_months(today.replace(day=1), _offset_word(m.group(1)))
+        return _clip(*_month_range(first.year, first.month), today)
+
+    def month_day(m, today):
+        first = _shift_months(today.replace(day=1), _offset_word(m.group(1)))
+        d = first.replace(day=cn_to_int(m.group(2)))
+        return d, d
+
+    def year(m, today):
+        y = today.year + _offset_word(m.group(1))
+        return _clip(date(y, 1, 1), date(y, 12, 31), today)
+
+    def quarter(m, today):
+        return _clip(*_quarter_range(today, _offset_word(m.group(1))), today)
+
+    def absolute_month(m, today):
+        return _clip(*_parse_date(m.group(1), m.group(2), None, today), today)
+
+    def month_range(m, today):
+        start = _parse_date(m.group(1), m.group(2), None, today)[0]
+        end_month = cn_to_int(m.group(3))
+        # 结束月份小于开始月份时跨年，如 11月到2月
+        end_year = start.year if end_month >= start.month else start.year + 1
+        return _clip(start, _month_range(end_year, end_month)[1], today)
+
+    def absolute_year(m, today):
+        y = int(m.group(1))
+        return _clip(date(y, 1, 1), date(y, 12, 31), today)
+
+    def en_number(text):
+        return int(text) if text.isdigit() else _EN_NUMBERS[text]
+
+    def en_last_n(m, today):
+        return _last_n(en_number(m.group(1)), m.group(2), today)
+
+    def en_days_ago(m, today):
+        d = today - timedelta(days=en_number(m.group(1)))
+        return d, d
+
+    def en_relative_day(m, today):
+        d = today + timedelta(days={"today": 0, "yesterday": -1, "tomorrow": 1}[m.group(1)])
+        return d, d
+
+    def en_period(m, today):
+        offset = {"this": 0, "current": 0, "last": -1, "previous": -1, "next": 1}[m.group(1)]
+        unit = m.group(2)
+        if unit == "week":
+            return _clip(*_week_range(today, offset), today)
+        if unit == "month":
+            first = _shift_months(today.replace(day=1), offset)
+            return _clip(*_month_range(first.year, first.month), today)
+        if unit == "quarter":
+            return _clip(*_quarter_range(today, offset), today)
+        y = today.year + offset
+        return _clip(date(y, 1, 1), date(y, 12, 31), today)
+
+    en_num = r"(\d+|" + "|".join(_EN_NUMBERS) + r")"
+    return [
+        # 绝对日期，上个月5号
+        (re.compile(date_pattern), absolute_day),
+        (re.compile(r"(上上|上|本|这|下)(?:个)?月\s*" + md + r"\s*[日号]"), month_day),
+        # 最近 N 天/周/月/年、N 天前
+        (re.compile(r"(?:最近|近|过去|前|这)\s*" + _NUM + r"\s*(?:个)?\s*(天|日|周|星期|礼拜|个月|月|年|小时)"), last_n),
+        (re.compile(_NUM + r"\s*(?:个)?\s*(天|日|周|星期|个月|月|年|小时)(?:以来|之内|内)"), last_n),
+        (re.compile(_NUM + r"\s*天(?:前|之前)"), days_ago),
+        # 绝对月份/年份，1-3月
+        (re.compile(year_pattern + md + r"\s*(?:到|至|~|～|—|-)\s*" + md + r"\s*月(?:份)?"), month_range),
+        (re.compile(year_pattern + md + r"\s*月(?:份)?"), absolute_month),
+        (re.compile(r"(\d{4})\s*年(?!\d)"), absolute_year),
+        # 今天/昨天下午/前天
+        (re.compile(r"(大前|前|昨|今|明)(?:天|日)" + _CN_PERIOD_SUFFIX), relative_day),
+        # 周X、本周/上周、本月/上个月、本季度、去年
+        (re.compile(r"(?<!每)(上上|上|本|这|下)?(?:个)?(?:周|星期|礼拜)([一二三四五六日天])(?![共些直致])"), weekday),
+        (re.compile(r"(上上|上|本|这|下)(?:个)?(?:周|星期|礼拜)"), week),
+        (re.compile(r"(上上|上|本|这|下)(?:个)?月"), month),
+        (re.compile(r"(上|本|这|下)(?:个)?季度"), quarter),
+        (re.compile(r"(前|去|今|本|明)年"), year),
+        # 英文
+        (re.compile(r"\b(?:last|past|recent|previous)\s+" + en_num + r"\s+(day|week|month|year|hour)s?\b"), en_last_n),
+        (re.compile(r"\b" + en_num + r"\s+days?\s+ago\b"), en_days_ago),
+        (re.compile(r"\b(today|yesterday|tomorrow)\b"), en_relative_day),
+        (re.compile(r"\b(this|current|last|previous|next)\s+(week|month|quarter|year)\b"), en_period),
+    ]
+
+
+_RULES = _rules()
+
+
+def _normalize(query: str) -> str:
+    # 全角数字/符号转半角，英文统一小写
+    table = {ord(c): ord(c) - 0xFEE0 for c in "０１２３４５６７８９－／．"}
+    return query.translate(table).lower()
+
+
+def _match_at(text: str, pos: int, today: date) -> Optional[Tuple[int, int, date, date]]:
+    """在 pos 处识别一段时间表达式，多条规则都能匹配时取最长的，返回 (起, 止, 开始日期, 结束日期)"""
+    matches = [(match, handler) for pattern, handler in _RULES for match in [pattern.match(text, pos)] if match]
+    if not matches:
+        return None
+    end = max(match.end() for match, _ in matches)
+    for match, handler in sorted(matches, key=lambda item: item[0].end(), reverse=True):
+        try:
+            start_date, end_date = handler(match, today)
+        except (ValueError, KeyError):
+            # 非法日期（如 2月30日）退回较短的匹配（2月），整段仍算已识别
+            continue
+        return pos, end, start_date, end_date
+    return None
+
+
+def _scan(text: str, today: date) -> List[Tuple[int, int, date, date]]:
+    """从左到右识别全部时间表达式"""
+    spans = []
+    pos = 0
+    while pos < len(text):
+        span = _match_at(text, pos, today)
+        if span is None:
+            pos += 1
+        else:
+            spans.append(span)
+            pos = span[1]
+    return spans
+
+
+def _range_end(text: str, first: Tuple, second: Tuple, today: date) -> date:
+    """区间结束日期：省略年份的绝对日期（2025年3月到5月）沿用开始日期的年份"""
+    year = _YEAR_PREFIX.match(text, first[0])
+    end_text = text[second[0]:second[1]].strip()
+    if year and not _YEAR_PREFIX.match(end_text) and re.match(r"[\d一二三四五六七八九十]", end_text):
+        prefixed = year.group(1) + end_text
+        span = _match_at(prefixed, 0, today)
+        if span is not None and span[1] == len(prefixed):
+            return span[3]
+    return second[3]
+
+
+def parse_time_expression(query: str, now: Optional[datetime] = None) -> Optional[dict]:
+    """
+    规则解析时间表达式，返回 {"time_desc", "start_date", "end_date"}；无法识别时返回 None
+    """
+    today = (now or datetime.now()).date()
+    text = _normalize(query)
+    periods = []
+    for span in _scan(text, today):
+        if periods and _RANGE_CONNECTOR.fullmatch(text, periods[-1][1], span[0]):
+            first = periods[-1]
+            periods[-1] = (first[0], span[1], first[2], _range_end(text, first, span, today))
+        else:
+            periods.append(span)
+    if len(periods) != 1:
+        return None
+    begin, end, start, stop = periods[0]
+    if _UNPARSED_TIME_PATTERN.search(text[:begin] + " " + text[end:]):
+        return None
+    if start > stop:
+        start, stop = stop, start
+    return {
+        "time_desc": query[begin:end].strip(),
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": stop.strftime("%Y-%m-%d"),
+    }
+
+
+def has_time_hint(query: str) -> bool:
+    """查询中是否可能包含时间语义"""
+    return bool(TIME_HINT_PATTERN.search(_normalize(query)))
@@ -0,0 +1,160 @@
+"""
+知识库问答语义缓存
+
+以 (知识库名称, 知识库版本号, 问题向量) 为键缓存最终答案和检索结果：
+- 新问题与已缓存问题的余弦相似度不低于 SEMANTIC_CACHE_THRESHOLD 即命中
+- 知识库每次 add_doc/delete_doc 等修改都会递增版本号并清空该库的缓存，旧版本的答案不会再被返回
+- 向量化函数可注入，便于用假的 embedding 测试
+- 未命中时问题向量随查询结果返回，知识库检索使用同一向量模型时可直接复用，不再重复向量化
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from csm_ai_service.settings import Settings
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    answer: str
+    docs: List[Dict]
+    created: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheLookup:
+    """一次查询的结果，未命中时携带问题向量和版本号，供生成答案后写回缓存"""
+    kb_name: str
+    query: str
+    version: int
+    embedding: Optional[np.ndarray] = None  # 归一化后的问题向量
+    query_vector: Optional[List[float]] = None  # 向量模型原始输出，可直接用于知识库检索
+    embed_model: Optional[str] = None
+    hit: Optional[CachedAnswer] = None
+    score: float = 0.0
+
+
+class _KBEntries:
+    def __init__(self):
+        self.vectors: Optional[np.ndarray] = None
+        self.items: List[CachedAnswer] = []
+
+
+class SemanticCache:
+    def __init__(self, embed_func: Callable[[str], List[float]] = None):
+        self._embed_func = embed_func
+        self._lock = threading.RLock()
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, _KBEntries] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(kb_name: str) -> str:
+        # 知识库名称在数据库中按大小写不敏感处理
+        return kb_name.lower()
+
+    def _embed_query(self, text: str, embed_model: Optional[str]) -> List[float]:
+        if self._embed_func is not None:
+            return self._embed_func(text)
+        from csm_ai_service.server.utils import get_Embeddings
+
+        return get_Embeddings(embed_model=embed_model).embed_query(text)
+
+    @staticmethod
+    def _normalize(query_vector: List[float]) -> np.ndarray:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def version(self, kb_name: str) -> int:
+        with self._lock:
+            return self._versions.get(self._key(kb_name), 0)
+
+    def bump_version(self, kb_name: str) -> int:
+        """知识库内容发生变化：递增版本号并丢弃该库的全部缓存"""
+        key = self._key(kb_name)
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+            return self._versions[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def lookup(self, kb_name: str, query: str, embed_model: Optional[str] = None) -> CacheLookup:
+        """embed_model 为知识库的向量模型（默认使用默认向量模型），未命中时返回的 query_vector 可用于该知识库检索"""
+        kb_settings = Settings.kb_settings
+        result = CacheLookup(kb_name=kb_name, query=query, version=self.version(kb_name))
+        try:
+            result.query_vector = self._embed_query(query, embed_model)
+            result.embed_model = embed_model
+            result.embedding = self._normalize(result.query_vector)
+        except Exception as e:
+            logger.warning(f"语义缓存向量化失败，跳过缓存: {e}")
+            return result
+
+        key = self._key(kb_name)
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is not None and entries.items and self._versions.get(key, 0) == result.version:
+                self._expire(entries)
+                if entries.items:
+                    scores = entries.vectors @ result.embedding
+                    best = int(np.argmax(scores))
+                    if scores[best] >= kb_settings.SEMANTIC_CACHE_THRESHOLD:
+                        result.hit = entries.items[best]
+                        result.score = float(scores[best])
+            if result.hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if result.hit is not None:
+            logger.info(f"语义缓存命中 [{kb_name}] score={result.score:.4f}: {query} -> {result.hit.query}")
+        return result
+
+    def store(self, lookup: CacheLookup, answer: str, docs: List[Dict]):
+        """写回缓存；检索/生成期间知识库被修改（版本号变化）时放弃写入"""
+        if lookup.embedding is None or lookup.hit is not None or not answer:
+            return
+        kb_settings = Settings.kb_settings
+        key = self._key(lookup.kb_name)
+        with self._lock:
+            if self._versions.get(key, 0) != lookup.version:
+                return
+            entries = self._entries.setdefault(key, _KBEntries())
+            vector = lookup.embedding[np.newaxis, :]
+            if entries.vectors is None or entries.vectors.shape[1] != vector.shape[1]:
+                entries.vectors, entries.items = vector, []
+            else:
+                entries.vectors = np.vstack([entries.vectors, vector])
+            entries.items.append(CachedAnswer(query=lookup.query, answer=answer, docs=docs))
+            overflow = len(entries.items) - kb_settings.SEMANTIC_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                entries.vectors = entries.vectors[overflow:]
+                entries.items = entries.items[overflow:]
+
+    @staticmethod
+    def _expire(entries: _KBEntries):
+        ttl = Settings.kb_settings.SEMANTIC_CACHE_TTL
+        if ttl <= 0:
+            return
+        # 条目按写入时间有序，只需找到第一条未过期的位置
+        now = time.time()
+        start = 0
+        while start < len(entries.items) and now - entries.items[start].created > ttl:
+            start += 1
+        if start:
+            entries.vectors = entries.vectors[start:]
+            entries.items = entries.items[start:]
+
+
+semantic_cache = SemanticCache()
@@ -1,7 +1,7 @@
 import json
 import os
 import urllib
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from fastapi import Body, File, Form, Query, UploadFile
 from fastapi.responses import FileResponse
@@ -13,6 +13,7 @@ from csm_ai_service.server.conversation.knowledge_base.kb_cache.faiss_cache impo
 from csm_ai_service.settings import Settings
 from csm_ai_service.server.db.repository.knowledge_file_repository import get_file_detail
 from csm_ai_service.server.conversation.knowledge_base.kb_service.base import (
+    KBService,
     KBServiceFactory,
     get_kb_file_details,
 )
@@ -24,6 +25,12 @@ from csm_ai_service.server.conversation.knowledge_base.utils import (
     list_files_from_folder,
     validate_kb_name,
 )
+from csm_ai_service.server.upload_utils import (
+    UploadTooLargeError,
+    check_upload_size,
+    is_same_content,
+    save_upload_file,
+)
 from csm_ai_service.server.utils import (
     BaseResponse,
     ListResponse,
@@ -82,8 +89,7 @@ def search_docs(
     data = []
     if kb is not None:
         if query:
-            docs = kb.search_docs(query, top_k, score_threshold)
-            data = [DocumentWithVSId(page_content=x[0].page_content, metadata=x[0].metadata, score=x[1], id=x[0].metadata.get("id")) for x in docs]
+            return search_kb_docs(kb, query, top_k, score_threshold)
         elif file_name or metadata:
             data = kb.list_docs(file_name=file_name, metadata=metadata)
             for d in data:
@@ -92,6 +98,23 @@ def search_docs(
     return [x.dict() for x in data]
 
 
+def search_kb_docs(kb: KBService,
+                   query: str,
+                   top_k: int,
+                   score_threshold: float,
+                   query_vector: Optional[List[float]] = None,
+                   embed_model: Optional[str] = None) -> List[Dict]:
+    """
+    按问题检索知识库；query_vector 为 embed_model 计算的问题向量（如语义缓存未命中时返回的向量），
+    与知识库向量模型一致时直接复用，不再重复向量化
+    """
+    if query_vector is not None and embed_model != kb.embed_model:
+        query_vector = None
+    docs = kb.search_docs(query, top_k, score_threshold, query_vector=query_vector)
+    return [DocumentWithVSId(page_content=x[0].page_content, metadata=x[0].metadata, score=x[1],
+                             id=x[0].metadata.get("id")).dict() for x in docs]
+
+
 def list_files(knowledge_base_name: str) -> ListResponse:
     if not validate_kb_name(knowledge_base_name):
         return ListResponse(code=403, msg="Don't attack me", data=[])
@@ -126,21 +149,22 @@ def _save_files_in_thread(
             )
             data = {"knowledge_base_name": knowledge_base_name, "file_name": filename}
 
-            file_content = file.file.read()  # 读取上传文件的内容
+            check_upload_size(file)
             if (
                     os.path.isfile(file_path)
                     and not override
-                    and os.path.getsize(file_path) == len(file_content)
+                    and is_same_content(file, file_path)
             ):
                 file_status = f"文件 {filename} 已存在。"
                 logger.warning(file_status)
                 return dict(code=404, msg=file_status, data=data)
 
-            if not os.path.isdir(os.path.dirname(file_path)):
-                os.makedirs(os.path.dirname(file_path))
-            with open(file_path, "wb") as f:
-                f.write(file_content)
+            # 分块写入磁盘，不把整个文件读入内存
+            save_upload_file(file, file_path)
             return dict(code=200, msg=f"成功上传文件 {filename}", data=data)
+        except UploadTooLargeError as e:
+            logger.warning(str(e))
+            return dict(code=413, msg=str(e), data=data)
         except Exception as e:
             msg = f"{filename} 文件上传失败，报错信息为: {e}"
             logger.error(f"{e.__class__.__name__}: {msg}")
@@ -3,17 +3,17 @@ import os
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from langchain_core.documents import Document
 
 from csm_ai_service.settings import Settings
 from csm_ai_service.utils import build_logger
-from csm_ai_service.server.db.models.knowledge_base_model import KnowledgeBaseSchema
 from csm_ai_service.server.db.repository.knowledge_base_repository import (
     add_kb_to_db,
     delete_kb_from_db,
     kb_exists,
+    list_kb_details_from_db,
     list_kbs_from_db,
     load_kb_from_db,
 )
@@ -23,11 +23,12 @@ from csm_ai_service.server.db.repository.knowledge_file_repository import (
     delete_file_from_db,
     delete_files_from_db,
     file_exists_in_db,
-    get_file_detail,
     list_docs_from_db,
+    list_file_details_from_db,
     list_files_from_db,
 )
 from csm_ai_service.server.conversation.knowledge_base.model.kb_document_model import DocumentWithVSId
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
 from csm_ai_service.server.conversation.knowledge_base.utils import (
     KnowledgeFile,
     get_doc_path,
@@ -101,6 +102,7 @@ class KBService(ABC):
         """
         self.do_clear_vs()
         status = delete_files_from_db(self.kb_name)
+        semantic_cache.bump_version(self.kb_name)
         return status
 
     def drop_kb(self):
@@ -109,6 +111,7 @@ class KBService(ABC):
         """
         self.do_drop_kb()
         status = delete_kb_from_db(self.kb_name)
+        semantic_cache.bump_version(self.kb_name)
         return status
 
     def add_doc(self, kb_file: KnowledgeFile, docs: List[Document] = [], **kwargs):
@@ -150,6 +153,7 @@ class KBService(ABC):
                 docs_count=len(docs),
                 doc_infos=doc_infos,
             )
+            semantic_cache.bump_version(self.kb_name)
         else:
             status = False
         return status
@@ -162,10 +166,40 @@ class KBService(ABC):
         """
         self.do_delete_doc(kb_file, **kwargs)
         status = delete_file_from_db(kb_file)
+        semantic_cache.bump_version(self.kb_name)
         if delete_content and os.path.exists(kb_file.filepath):
             os.remove(kb_file.filepath)
         return status
 
+    def delete_docs_by_metadata(self, metadata: Dict, delete_content: bool = False) -> List[str]:
+        """
+        删除 metadata 匹配的文档所在的全部文件，返回被删除的文件名。
+        通过数据库一次查出全部文档 id，向量库只删除一次、保存一次
+        """
+        doc_infos = list_docs_from_db(kb_name=self.kb_name, metadata=metadata)
+        if not doc_infos:
+            return []
+
+        ids = [x["id"] for x in doc_infos]
+        # 数据库与向量库不一致时，跳过向量库中已不存在的 id
+        ids = [id for id, doc in zip(ids, self.get_doc_by_ids(ids)) if doc is not None]
+        if ids:
+            self.del_doc_by_ids(ids)
+
+        file_names = []
+        for file_name in dict.fromkeys(x["metadata"].get("source") for x in doc_infos):
+            if not file_name:
+                continue
+            kb_file = KnowledgeFile(filename=file_name, knowledge_base_name=self.kb_name)
+            delete_file_from_db(kb_file)
+            if delete_content and os.path.exists(kb_file.filepath):
+                os.remove(kb_file.filepath)
+            file_names.append(file_name)
+
+        self.save_vector_store()
+        semantic_cache.bump_version(self.kb_name)
+        return file_names
+
     def update_info(self, kb_info: str):
         """
         更新知识库介绍
@@ -206,12 +240,14 @@ class KBService(ABC):
         query: str,
         top_k: int = Settings.kb_settings.VECTOR_SEARCH_TOP_K,
         score_threshold: float = Settings.kb_settings.SCORE_THRESHOLD,
+        query_vector: Optional[List[float]] = None,
     ) -> List[Tuple[Document, float]]:
+        """query_vector 为本知识库向量模型已计算好的问题向量，传入时不再重复向量化"""
         if not self.check_embed_model(
             f"could not search docs because failed to access embed model."
         ):
             return []
-        docs = self.do_search(query, top_k, score_threshold)
+        docs = self.do_search(query, top_k, score_threshold, query_vector=query_vector)
         return docs
 
     def get_doc_by_ids(self, ids: List[str]) -> List[Document]:
@@ -239,6 +275,7 @@ class KBService(ABC):
             ids.append(_id)
             pending_docs.append(doc)
         self.do_add_doc(docs=pending_docs, ids=ids)
+        semantic_cache.bump_version(self.kb_name)
         return True
 
     def list_docs(
@@ -319,9 +356,10 @@ class KBService(ABC):
         query: str,
         top_k: int,
         score_threshold: float,
+        query_vector: Optional[List[float]] = None,
     ) -> List[Tuple[Document, float]]:
         """
-        搜索知识库子类实自己逻辑
+        搜索知识库子类实自己逻辑，传入 query_vector 时直接按向量检索
         """
         pass
 
@@ -382,8 +420,11 @@ class KBServiceFactory:
 
 
 def get_kb_details() -> List[Dict]:
+    """
+    知识库列表：一次目录扫描 + 一次分组查询
+    """
     kbs_in_folder = list_kbs_from_folder()
-    kbs_in_db: List[KnowledgeBaseSchema] = KBService.list_kbs()
+    kbs_in_db = list_kb_details_from_db()
     result = {}
 
     for kb in kbs_in_folder:
@@ -399,7 +440,6 @@ def get_kb_details() -> List[Dict]:
         }
 
     for kb_detail in kbs_in_db:
-        kb_detail = kb_detail.model_dump()
         kb_name = kb_detail["kb_name"]
         kb_detail["in_db"] = True
         if kb_name in result:
@@ -417,12 +457,14 @@ def get_kb_details() -> List[Dict]:
 
 
 def get_kb_file_details(kb_name: str) -> List[Dict]:
-    kb = KBServiceFactory.get_service_by_name(kb_name)
-    if kb is None:
+    """
+    知识库文件列表：一次目录扫描 + 一次文件详情查询
+    """
+    if not kb_exists(kb_name):
         return []
 
     files_in_folder = list_files_from_folder(kb_name)
-    files_in_db = kb.list_files()
+    files_in_db = list_file_details_from_db(kb_name)
     result = {}
 
     for doc in files_in_folder:
@@ -439,15 +481,14 @@ def get_kb_file_details(kb_name: str) -> List[Dict]:
             "in_db": False,
         }
     lower_names = {x.lower(): x for x in result}
-    for doc in files_in_db:
-        doc_detail = get_file_detail(kb_name, doc)
-        if doc_detail:
-            doc_detail["in_db"] = True
-            if doc.lower() in lower_names:
-                result[lower_names[doc.lower()]].update(doc_detail)
-            else:
-                doc_detail["in_folder"] = False
-                result[doc] = doc_detail
+    for doc_detail in files_in_db:
+        doc = doc_detail["file_name"]
+        doc_detail["in_db"] = True
+        if doc.lower() in lower_names:
+            result[lower_names[doc.lower()]].update(doc_detail)
+        else:
+            doc_detail["in_folder"] = False
+            result[doc] = doc_detail
 
     data = []
     for i, v in enumerate(result.values()):
@@ -1,6 +1,6 @@
 import os
 import shutil
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from langchain_core.documents import Document
 
@@ -9,6 +9,7 @@ from csm_ai_service.server.conversation.knowledge_base.kb_cache.faiss_cache impo
     ThreadSafeFaiss,
     kb_faiss_pool,
 )
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
 from csm_ai_service.server.conversation.knowledge_base.kb_service.base import KBService, SupportedVSType
 from csm_ai_service.server.conversation.knowledge_base.utils import KnowledgeFile, get_kb_path, get_vs_path
 
@@ -44,6 +45,7 @@ class FaissKBService(KBService):
     def del_doc_by_ids(self, ids: List[str]) -> bool:
         with self.load_vector_store().acquire() as vs:
             vs.delete(ids)
+        semantic_cache.bump_version(self.kb_name)
 
     def do_init(self):
         self.vector_name = self.vector_name or self.embed_model.replace(":", "_")
@@ -67,6 +69,7 @@ class FaissKBService(KBService):
         query: str,
         top_k: int,
         score_threshold: float = Settings.kb_settings.SCORE_THRESHOLD,
+        query_vector: Optional[List[float]] = None,
     ) -> List[Tuple[Document, float]]:
         """
         搜索相似文档并返回文档及相似度分数
@@ -75,8 +78,11 @@ class FaissKBService(KBService):
             List[Tuple[Document, float]]: (文档, 相似度分数) 列表，分数越小越相似
         """
         with self.load_vector_store().acquire() as vs:
-            # 使用 similarity_search_with_score 获取带分数的结果
-            docs_with_scores = vs.similarity_search_with_score(query, k=top_k)
+            # 使用 similarity_search_with_score 获取带分数的结果，已有问题向量时跳过向量化
+            if query_vector is not None:
+                docs_with_scores = vs.similarity_search_with_score_by_vector(query_vector, k=top_k)
+            else:
+                docs_with_scores = vs.similarity_search_with_score(query, k=top_k)
             # 过滤低于阈值的结果（FAISS中分数越小越相似，L2距离）
             filtered_docs = [
                 (doc, score) for doc, score in docs_with_scores
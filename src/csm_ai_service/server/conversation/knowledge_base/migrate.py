@@ -1,6 +1,9 @@
 import os
 from datetime import datetime
 from typing import List, Literal
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
 from csm_ai_service.settings import Settings
 from csm_ai_service.server.db.base import Base, engine
 
@@ -22,6 +25,23 @@ logger = build_logger()
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all 不会修改已有的表，已有的库需要补齐新增的可空列
+    existing_columns = {
+        table.name: {c["name"] for c in inspect(engine).get_columns(table.name)}
+        for table in Base.metadata.sorted_tables
+    }
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for column in table.columns:
+                if column.name not in existing_columns[table.name] and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+    # create_all 只为新建的表建索引，已有的库需要单独补齐新增的索引
+    # （表达式索引无法通过 checkfirst 反射检测，使用 IF NOT EXISTS）
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
 
 
 def reset_tables():
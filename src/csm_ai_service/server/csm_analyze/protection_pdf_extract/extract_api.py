@@ -5,8 +5,10 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.keywords_helper import KeyWordsHelper
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.keyword_matcher import WeightedKeywordClassifier
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import split_line, save_to_temp_file, remove_dup_str
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.outline_helper import OutlineHelper
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.page_cache import PdfPageCache
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.table_helper import TableHelper
 import logging
 
@@ -73,6 +75,9 @@ _security_type_weighted_keywords = {
         ("集中管理", 0.3)],
 }
 
+# 全部类型的关键词编译为一个 Aho-Corasick 自动机，每条内容只扫描一次即得到各类型的命中权重
+_security_type_classifier = WeightedKeywordClassifier(_security_type_weighted_keywords)
+
 
 class SecurityPredictItem(BaseModel):
     """单项安全类型预测输入"""
@@ -98,21 +103,18 @@ class SecurityPredictRequest(BaseModel):
 def _calc_score_for_type(content: str, target_type: int) -> float:
     """
     基于加权关键词匹配计算 content 对某个安全类型的置信度分数。
-    逻辑：遍历该类型的所有 (关键词, 权重) 对，
-          命中的关键词权重累加，归一化后得到最终分数。
+    逻辑：该类型所有命中的 (关键词, 权重) 对权重累加，归一化后得到最终分数。
     结果确定性，相同输入始终返回相同结果。
     """
     if not content:
         return 0.0
 
-    content_lower = content.lower()
-    weighted_keywords = _security_type_weighted_keywords.get(target_type, [])
+    hit_weight_sums, max_weight_sums = _security_type_classifier.hit_weight_sums(content)
+    return _weight_to_confidence(hit_weight_sums.get(target_type, 0), max_weight_sums.get(target_type, 0))
 
-    # 计算命中关键词的权重之和
-    hit_weight_sum = sum(weight for kw, weight in weighted_keywords if kw.lower() in content_lower)
-    # 所有可能的最大权重之和（全部命中）
-    max_weight_sum = sum(weight for _, weight in weighted_keywords)
 
+def _weight_to_confidence(hit_weight_sum: float, max_weight_sum: float) -> float:
+    """命中权重之和 / 所有可能的最大权重之和（全部命中），映射为置信度"""
     if max_weight_sum == 0:
         return 0.0
 
@@ -138,8 +140,9 @@ def _predict_security_type_by_text(content: str) -> tuple:
     best_type = 0
     best_score = 0.0
 
+    hit_weight_sums, max_weight_sums = _security_type_classifier.hit_weight_sums(content)
     for type_code in _security_type_weighted_keywords:
-        score = _calc_score_for_type(content, type_code)
+        score = _weight_to_confidence(hit_weight_sums[type_code], max_weight_sums[type_code])
         if score > best_score:
             best_score = score
             best_type = type_code
@@ -183,8 +186,9 @@ def extract_table(
         start_page: int,
         end_page: int,
         start_chapter: str,
-        end_chapter: str) -> list[list[str]]:
-    th = TableHelper(pdf_path, start_page, end_page, start_chapter, end_chapter)
+        end_chapter: str,
+        page_cache: PdfPageCache = None) -> list[list[str]]:
+    th = TableHelper(pdf_path, start_page, end_page, start_chapter, end_chapter, page_cache=page_cache)
     table_list = [th.header_list]
     for line in th.merge_table:
         table_list.append(line)
@@ -206,11 +210,14 @@ def split_table(
 
 
 def extract_safe_table(pdf_path: str) -> list[list[str]]:
-    oh = OutlineHelper(pdf_path=pdf_path)
-    if oh.is_valid():
-        return extract_table(pdf_path, oh.start_page, oh.end_page, oh.start_chapter, oh.end_chapter)
-    else:
-        return empty_table_list
+    # 目录解析与表格提取共用同一份页面解析缓存，文档只打开一次
+    with PdfPageCache(pdf_path) as page_cache:
+        oh = OutlineHelper(pdf_path=pdf_path, page_cache=page_cache)
+        if oh.is_valid():
+            return extract_table(pdf_path, oh.start_page, oh.end_page, oh.start_chapter, oh.end_chapter,
+                                 page_cache=page_cache)
+        else:
+            return empty_table_list
 
 def extract_safe_split_table(pdf_path: str) -> list[list[str]]:
     table_list = extract_safe_table(pdf_path)
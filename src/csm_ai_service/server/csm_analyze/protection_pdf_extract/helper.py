@@ -2,9 +2,11 @@ import hashlib
 import math
 import os
 import re
+import uuid
 from fastapi import UploadFile
 import logging
 
+from csm_ai_service.server.upload_utils import save_upload_file
 from csm_ai_service.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -140,16 +142,11 @@ def compute_str_md5(name: str) -> str:
 
 
 # 保存，返回临时路径
+# 分块写入磁盘，每次上传使用唯一文件名，同名文件的并发请求不会互相覆盖、误删
 def save_to_temp_file(file: UploadFile) -> str:
-    file_content = file.file.read()  # 读取上传文件的内容
-    prefix, suffix = os.path.splitext(file.filename)
-    new_file_prefix = compute_str_md5(prefix)
-    new_file_name = new_file_prefix + "." + suffix
-    new_file_path = os.path.join(Settings.basic_settings.BASE_TEMP_DIR, new_file_name)
-    if os.path.exists(new_file_path):
-        os.remove(new_file_path)
-    with open(new_file_path, "wb") as f:
-        f.write(file_content)
+    _, suffix = os.path.splitext(file.filename)
+    new_file_path = os.path.join(Settings.basic_settings.BASE_TEMP_DIR, uuid.uuid4().hex + suffix)
+    save_upload_file(file, new_file_path)
     return new_file_path
 
 
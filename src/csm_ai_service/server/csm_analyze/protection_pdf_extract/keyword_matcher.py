@@ -0,0 +1,97 @@
+"""
+多关键词匹配
+
+AhoCorasick：把全部关键词编译成一个自动机，一次扫描文本即可找出所有出现过的关键词，
+代替 "for kw in keywords: if kw in text" 的逐个子串查找。
+WeightedKeywordClassifier：基于自动机的加权关键词分类打分。
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for i, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, i)
+        self._build_fail()
+
+    def _add(self, pattern: str, index: int):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] += (index,)
+
+    def _build_fail(self):
+        """按层次遍历计算失败指针，并把失败链上的输出合并到当前状态"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = fail if fail != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        """返回 text 中出现过的关键词下标集合"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
+
+
+class WeightedKeywordClassifier:
+    """
+    加权关键词分类：{类别: [(关键词, 权重), ...]}，关键词大小写不敏感。
+    命中权重按类别内关键词的原始顺序累加，浮点结果与逐个关键词判断累加完全一致。
+    """
+
+    def __init__(self, weighted_keywords: Dict[int, Sequence[Tuple[str, float]]]):
+        self.labels = list(weighted_keywords)
+        self._weights = {label: [weight for _, weight in kws] for label, kws in weighted_keywords.items()}
+        self._max_weight_sum = {label: sum(weight for _, weight in kws) for label, kws in weighted_keywords.items()}
+
+        # 相同关键词可能属于多个类别：关键词 -> [(类别, 类别内下标), ...]
+        keyword_index: Dict[str, int] = {}
+        self._targets: List[List[Tuple[int, int]]] = []
+        for label, kws in weighted_keywords.items():
+            for pos, (kw, _) in enumerate(kws):
+                kw = kw.lower()
+                if kw not in keyword_index:
+                    keyword_index[kw] = len(self._targets)
+                    self._targets.append([])
+                self._targets[keyword_index[kw]].append((label, pos))
+        self._automaton = AhoCorasick(keyword_index)
+
+    def hit_weight_sums(self, content: str) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """一次扫描 content，返回 ({类别: 命中权重之和}, {类别: 全部权重之和})"""
+        hits: Dict[int, List[int]] = {}
+        for keyword_id in self._automaton.find(content.lower()):
+            for label, pos in self._targets[keyword_id]:
+                hits.setdefault(label, []).append(pos)
+        sums = dict.fromkeys(self.labels, 0)
+        for label, positions in hits.items():
+            weights = self._weights[label]
+            sums[label] = sum(weights[pos] for pos in sorted(positions))
+        return sums, self._max_weight_sum
@@ -2,23 +2,25 @@
 # 只有word转换成pdf的才可以识别，其他一律不识别
 import os
 import re
-import fitz
-from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import sort_block, contain_key
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import sort_block
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.page_cache import PdfPageCache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class KeyWordsHelper:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, page_cache: PdfPageCache = None):
         self.file_name = os.path.basename(pdf_path)
         self.first_page = 1
         self.djcpjl_page = 0  # 等级测评结论那一页
         self.report_time = ""  # 报告时间
         self.cpjl = ""  # 测评结论
         self.score = ""  # 综合得分
+        # 传入的 page_cache 由调用方负责关闭
+        self.pages = page_cache or PdfPageCache(pdf_path)
         try:
-            self.doc = fitz.open(pdf_path)
+            self.doc = self.pages.doc
             if self.doc is None or self.doc.page_count < 1:
                 logger.error(f"【{self.file_name}】 文件存在问题，无法读取!!!")
                 return
@@ -27,7 +29,8 @@ class KeyWordsHelper:
             self.report_time = self.__extract_report_time()
             self.cpjl, self.score = self.__extract_cpjl_and_score()
         finally:
-            self.doc.close()
+            if page_cache is None:
+                self.pages.close()
 
     # 找到等级测评结论那一页，提取等级测评结论与得分
     # 找到逻辑， 先找到第一个总体评价的页码，然后找等级测评结论的页码，要< 总体评价
@@ -45,18 +48,14 @@ class KeyWordsHelper:
 
     # 获取目标页的文本
     def __get_target_page_text(self, page_num: int) -> str:
-        page = self.doc.load_page(page_num - 1)
-        text = page.get_text("text")
+        text = self.pages.text(page_num - 1)
         text = text.replace(" ", "").replace("\t", "")
         return text
 
+    # 在缓存的页面文本上定位，多个关键字共用同一份页面文本
     def __locate_target_page(self, keyword: str) -> int:
-        for index in range(0, self.total_page_num):
-            page = self.doc.load_page(index)
-            all_text = page.get_text("text")
-            if contain_key(all_text, keyword):
-                return index + 1
-        return 0
+        index = self.pages.first_page(keyword, 0, self.total_page_num)
+        return index + 1 if index >= 0 else 0
 
     # 提取报告时间
     def __extract_report_time(self) -> str:
@@ -70,8 +69,7 @@ class KeyWordsHelper:
 
     # 提取测评结论 与 综合得分
     def __extract_cpjl_and_score(self) -> tuple[str, str]:
-        page = self.doc.load_page(self.djcpjl_page - 1)
-        tables = page.find_tables().tables
+        tables = self.pages.find_tables(self.djcpjl_page - 1)
         if len(tables) < 1:
             return "", ""
 
@@ -1,8 +1,8 @@
 # 找到 安全问题风险分析 所在页范围的方法类
 import os
 import re
-import fitz
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import sort_block, contain_key
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.page_cache import PdfPageCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -154,7 +154,7 @@ end_chapter_keys = ["等级测评结论"]
 
 # pdf解析类帮助方法
 class OutlineHelper:
-    def __init__(self, pdf_path, start_chapter="安全问题风险", end_chapter="等级测评结论"):
+    def __init__(self, pdf_path, start_chapter="安全问题风险", end_chapter="等级测评结论", page_cache: PdfPageCache = None):
         self.file_name = os.path.basename(pdf_path)
         # 最后在外部显示的信息
         self.start_page = 0  # 从1开始 安全问题风险 章节 开始所在页数
@@ -163,8 +163,10 @@ class OutlineHelper:
         self.start_chapter = start_chapter
         self.end_chapter = end_chapter
 
+        # 传入的 page_cache 由调用方负责关闭
+        self.pages = page_cache or PdfPageCache(pdf_path)
         try:
-            self.doc = fitz.open(pdf_path)
+            self.doc = self.pages.doc
             if self.doc is None or self.doc.page_count < 1:
                 logger.error(f"【{self.file_name}】 文件存在问题，无法读取!!!")
                 return
@@ -186,7 +188,8 @@ class OutlineHelper:
                 f"【{self.file_name}】的解析信息如下:\n【目录页信息】 开始页:{self.outline_start_page}\t结束页:{self.outline_end_page}\n"
                 f"【解析信息】 开始章节:{self.start_chapter} 开始页码:{self.start_page}\t结束章节:{self.end_chapter} 结束页码:{self.end_page}")
         finally:
-            self.doc.close()
+            if page_cache is None:
+                self.pages.close()
 
     # 获取 显示的页码实际对应的页码index, 例如显示第1页，在pdf中第10页，返回10
     def __get_actual_page(self, show_page_num):
@@ -200,20 +203,11 @@ class OutlineHelper:
     # 找出(显示第几页，实际第几页)
     # 有些文档正文不是从第一页开始,例如 SA-MI07-HT24031-CP24705_张易第一风电场电力监控系统_测评报告.pdf
     def __get_show_info(self) -> (int, int):
-        for index in range(self.outline_end_page,
-                           min(self.outline_end_page + 40, self.total_page_num - 1)):  # 目录结束后最多找40页
-            page = self.doc.load_page(index)  # 目录结束后的第一页
-            text = page.get_text("text")
-            pattern = r"第(\d+)页"
-
-            replace_text = text.replace(" ", "")
-            lines = replace_text.split("\n")
-            for line in lines:
-                match = re.search(pattern, line)
-                if match:
-                    return int(match.group(1)), index + 1
-                else:
-                    continue
+        # 目录结束后最多找40页，每页的 第N页 页码只解析一次
+        show_page_num, index = self.pages.first_show_page(
+            self.outline_end_page, min(self.outline_end_page + 40, self.total_page_num - 1))
+        if show_page_num is not None:
+            return show_page_num, index + 1
         return 1, self.outline_end_page + 1  # 找不到的话，默认是第一页
 
         # for index in range(int(0.5 * self.total_page_num)):
@@ -260,8 +254,7 @@ class OutlineHelper:
         :param page_index:
         :return: (x0,y0,x1,y1,text,font_size,type)
         """
-        page = self.doc.load_page(page_index)
-        blocks = page.get_text("dict")['blocks']
+        blocks = self.pages.text_dict(page_index)['blocks']
         block_list = []
         for idx, block in enumerate(blocks):
             type = block['type']
@@ -283,17 +276,11 @@ class OutlineHelper:
         return block_list
 
     def __get_origin_blocks_by_page_index(self, page_index):
-        page = self.doc.load_page(page_index)
-        return page.get_text("dict")['blocks']
+        return self.pages.text_dict(page_index)['blocks']
 
     # 根据目录所在页数，确定 “安全问题风险分析” 所在的页数index
     def __locate_target_page(self, keyword: str) -> int:
-        for index in range(self.outline_start_page - 1, self.outline_end_page):
-            page = self.doc.load_page(index)
-            all_text = page.get_text("text")
-            if contain_key(all_text, keyword):
-                return index
-        return -1
+        return self.pages.first_page(keyword, self.outline_start_page - 1, self.outline_end_page)
 
     # 获取 安全问题风险分析 章节 所在的页码
     # 落地思路：最终目标找到 安全问题风险分析所在的实际页数
@@ -0,0 +1,135 @@
+"""
+单个 pdf 文档的页面解析缓存
+
+OutlineHelper、KeyWordsHelper、TableHelper 会反复 load_page 并重复解析同一页：
+目录扫描遍历前一半页面、关键字定位多次全文扫描、snap_tolerance 逐个重试 find_tables。
+PdfPageCache 持有一个打开的文档，按页缓存 get_text("dict")、纯文本、文本块以及
+按 (页, 裁剪区域, snap_tolerance) 缓存 find_tables 的结果，多个 helper 共用同一个实例即可避免重复解析。
+页面矢量图形(get_drawings)按页只提取一次，不同裁剪区域、不同 snap_tolerance 的 find_tables 共用；
+旋转页面 find_tables 会先去除旋转再识别，坐标与 get_drawings 不一致，不使用缓存的矢量图形。
+关键字定位与 "第N页" 页码查找直接扫描缓存的页面纯文本，每页的显示页码只解析一次。
+
+页码统一使用从0开始的 page_index，与 doc.load_page 一致。
+缓存的结果为共享对象，调用方不应修改。
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import contain_key
+
+SHOW_PAGE_PATTERN = re.compile(r"第(\d+)页")
+
+
+def _copy_paths(paths: list) -> list:
+    """find_tables 会原地修改传入路径的 items 与 rect，每次调用传入副本"""
+    return [{**path, "items": list(path["items"]), "rect": fitz.Rect(path["rect"])} for path in paths]
+
+
+class PdfPageCache:
+    def __init__(self, pdf_path: str):
+        self.pdf_path = pdf_path
+        self.doc = fitz.open(pdf_path)
+        self._pages: Dict[int, fitz.Page] = {}
+        self._dicts: Dict[int, dict] = {}
+        self._texts: Dict[int, str] = {}
+        self._blocks: Dict[int, list] = {}
+        self._tables: Dict[Tuple, list] = {}
+        self._drawings: Dict[int, list] = {}
+        self._show_page_nums: Dict[int, Optional[int]] = {}
+
+    @property
+    def page_count(self) -> int:
+        return self.doc.page_count
+
+    def page(self, page_index: int) -> fitz.Page:
+        page = self._pages.get(page_index)
+        if page is None:
+            page = self.doc.load_page(page_index)
+            self._pages[page_index] = page
+        return page
+
+    def rect(self, page_index: int) -> fitz.Rect:
+        return self.page(page_index).rect
+
+    def text_dict(self, page_index: int) -> dict:
+        """page.get_text("dict")"""
+        if page_index not in self._dicts:
+            self._dicts[page_index] = self.page(page_index).get_text("dict")
+        return self._dicts[page_index]
+
+    def text(self, page_index: int) -> str:
+        """page.get_text("text")"""
+        if page_index not in self._texts:
+            self._texts[page_index] = self.page(page_index).get_text("text")
+        return self._texts[page_index]
+
+    def blocks(self, page_index: int) -> list:
+        """page.get_text("blocks")"""
+        if page_index not in self._blocks:
+            self._blocks[page_index] = self.page(page_index).get_text("blocks")
+        return self._blocks[page_index]
+
+    def drawings(self, page_index: int) -> list:
+        """page.get_drawings()"""
+        if page_index not in self._drawings:
+            self._drawings[page_index] = self.page(page_index).get_drawings()
+        return self._drawings[page_index]
+
+    def show_page_num(self, page_index: int) -> Optional[int]:
+        """页面中第一个 "第N页" 的 N：去空格后逐行匹配，没有返回 None"""
+        if page_index not in self._show_page_nums:
+            show_page_num = None
+            for line in self.text(page_index).replace(" ", "").split("\n"):
+                match = SHOW_PAGE_PATTERN.search(line)
+                if match:
+                    show_page_num = int(match.group(1))
+                    break
+            self._show_page_nums[page_index] = show_page_num
+        return self._show_page_nums[page_index]
+
+    def first_page(self, keyword: str, start: int = 0, end: Optional[int] = None) -> int:
+        """返回 [start, end) 中第一个包含 keyword 的 page_index，找不到返回 -1"""
+        end = self.page_count if end is None else end
+        for page_index in range(start, end):
+            if contain_key(self.text(page_index), keyword):
+                return page_index
+        return -1
+
+    def first_show_page(self, start: int, end: int) -> Tuple[Optional[int], int]:
+        """返回 [start, end) 中第一个带 "第N页" 页码的 (N, page_index)，找不到返回 (None, -1)"""
+        for page_index in range(start, end):
+            show_page_num = self.show_page_num(page_index)
+            if show_page_num is not None:
+                return show_page_num, page_index
+        return None, -1
+
+    def find_tables(self, page_index: int, clip=None, snap_tolerance: Optional[float] = None) -> List[fitz.table.Table]:
+        """page.find_tables(clip, snap_tolerance).tables，相同参数只解析一次"""
+        key = (page_index, tuple(clip) if clip is not None else None, snap_tolerance)
+        if key not in self._tables:
+            page = self.page(page_index)
+            kwargs = {"clip": clip}
+            if page.rotation == 0:
+                kwargs["paths"] = _copy_paths(self.drawings(page_index))
+            if snap_tolerance is not None:
+                kwargs["snap_tolerance"] = snap_tolerance
+            self._tables[key] = page.find_tables(**kwargs).tables
+        return self._tables[key]
+
+    def close(self):
+        self._pages.clear()
+        self._dicts.clear()
+        self._texts.clear()
+        self._blocks.clear()
+        self._tables.clear()
+        self._drawings.clear()
+        self._show_page_nums.clear()
+        self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
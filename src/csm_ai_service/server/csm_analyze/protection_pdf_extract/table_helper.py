@@ -5,6 +5,7 @@ from csm_ai_service.server.csm_analyze.protection_pdf_extract.table_utils import
     need_drop, clean_list, get_upper_bbox, header_valid
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import sort_block, contain_key
 from csm_ai_service.server.csm_analyze.protection_pdf_extract.table_info import TableInfo
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.page_cache import PdfPageCache
 
 
 # 获取table数据，以列表的形式
@@ -14,7 +15,7 @@ def get_table_data(table: fitz.table.Table, mark_flag: bool, blocks: list, heade
 
 
 class TableHelper:
-    def __init__(self, pdf_path, start_page, end_page, start_chapter, end_chapter):
+    def __init__(self, pdf_path, start_page, end_page, start_chapter, end_chapter, page_cache: PdfPageCache = None):
         self.pdf_path = pdf_path
         self.snap_tolerance = 3  # 默认是3, 大多数用6适配没问题, 只有极个别必须用4 中卫第四十七光伏电站电力监控系统_测评报告.pdf
         self.start_page = start_page
@@ -22,8 +23,10 @@ class TableHelper:
         self.start_chapter = start_chapter
         self.end_chapter = end_chapter
 
+        # 传入的 page_cache 由调用方负责关闭
+        self.pages = page_cache or PdfPageCache(self.pdf_path)
         try:
-            self.doc = fitz.open(self.pdf_path)
+            self.doc = self.pages.doc
             self.mark_flag = self.__contain_mark()
             self.first_table_bbox = None
             self.__set_first_page_info() # 设置第一页的表格以及第一页表格的bbox信息
@@ -38,24 +41,18 @@ class TableHelper:
             self.__handle_last_page()
             self.merge_table = self.__merge_info()
         finally:
-            self.doc.close()
+            if page_cache is None:
+                self.pages.close()
 
     def __contain_mark(self):  # 判断是否包含水印
-        page = self.__get_page(self.start_page)
-        blocks = page.get_text("dict")['blocks']
+        blocks = self.__get_blocks(self.start_page)
         return contain_mark(blocks)
 
     def __get_blocks(self, page_num):
-        page = self.__get_page(page_num)
-        blocks = page.get_text("dict")['blocks']
-        return blocks
-
-    def __get_page(self, page):
-        return self.doc.load_page(page - 1)
+        return self.pages.text_dict(page_num - 1)['blocks']
 
     def __get_page_bbox(self, page):
-        page = self.__get_page(page)
-        return page.rect
+        return self.pages.rect(page - 1)
 
     def __get_tables(self, page: int, bbox: (float, float, float, float) = None):
         """
@@ -65,9 +62,7 @@ class TableHelper:
         :param bbox:
         :return:
         """
-        page = self.doc.load_page(page - 1)
-        tables = page.find_tables(clip=bbox, snap_tolerance=self.snap_tolerance)
-        return tables.tables
+        return self.pages.find_tables(page - 1, clip=bbox, snap_tolerance=self.snap_tolerance)
 
     def __get_bbox(self, page_num: int, key: str) -> (float, float, float, float):
         """
@@ -77,8 +72,7 @@ class TableHelper:
         :param key:
         :return:
         """
-        page = self.__get_page(page_num)
-        blocks = page.get_text("blocks")
+        blocks = self.pages.blocks(page_num - 1)
         # 进行排序，从上到下排序
         sorted_lst = sort_block(blocks)
         for x0, y0, x1, y1, text, _, _ in sorted_lst:
@@ -105,18 +99,19 @@ class TableHelper:
     def __find_valid_snap(self):
         """
         根据第一个表格确定合适的snap
+        找到第一个表头有效的snap即返回；矢量图形按页缓存，各snap只重新做线段吸附与单元格识别，
+        snap=3 与默认值相同，直接复用 __set_first_page_info 的识别结果。
         :return:
         """
-        page = self.__get_page(self.start_page)
         snap_list = [3, 4, 5, 6, 7]
         for snap in snap_list:
-            tables = page.find_tables(clip=self.first_table_bbox,snap_tolerance=snap)
-            table = tables.tables[0]
+            tables = self.pages.find_tables(self.start_page - 1, clip=self.first_table_bbox, snap_tolerance=snap)
+            table = tables[0]
             table_data = table.extract()
             header_list = table_data[0]
             if header_valid(header_list):
                 return snap
-        return snap_list[0]
+        return 3
 
     # 获取第一个表格
     def __get_first_table(self):
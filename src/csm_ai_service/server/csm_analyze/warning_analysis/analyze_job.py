@@ -0,0 +1,227 @@
+"""
+告警处置报告异步研判任务
+
+提交 -> 轮询/流式获取进度 的任务模式，避免研判全过程占用 HTTP 请求：
+- 提交时只计算文件哈希并落盘临时文件，立即返回 job_id
+- 后台工作线程执行 run_warning_analyze，并记录各阶段进度事件
+- 任务保存在内存中，结束超过 WARNING_JOB_TTL 秒后清理
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from fastapi import Body, File, UploadFile
+from sse_starlette.sse import EventSourceResponse
+
+from csm_ai_service.server.csm_analyze.warning_analysis.report_analyze import (
+    hash_upload_file,
+    get_report_extraction,
+    run_warning_analyze,
+)
+from csm_ai_service.server.upload_utils import save_upload_file
+from csm_ai_service.server.utils import BaseResponse
+from csm_ai_service.settings import Settings
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+FINISHED_STATUS = ("completed", "failed")
+
+
+class WarningAnalyzeJob:
+    def __init__(self, warning_number: str, file_name: str, content_hash: str,
+                 file_path: Optional[str] = None, alarm_desc: str = "", extracted: Optional[Dict] = None):
+        self.job_id = uuid.uuid4().hex
+        self.warning_number = warning_number
+        self.file_name = file_name
+        self.content_hash = content_hash
+        self.file_path = file_path
+        self.alarm_desc = alarm_desc
+        # 提交时已有的提取结果，执行时不再依赖提取缓存
+        self.extracted = extracted
+        self.status = "pending"
+        self.progress = 0
+        self.events: List[Dict] = []
+        self.result: Optional[Dict] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.add_event("queued", "任务已提交，等待研判", 0)
+
+    def add_event(self, stage: str, message: str, progress: int):
+        self.progress = max(self.progress, progress)
+        self.events.append({"stage": stage, "message": message, "progress": self.progress, "time": time.time()})
+
+    def finish(self, status: str, result: Dict):
+        self.result = result
+        self.add_event(status, "研判完成" if status == "completed" else "研判失败", 100)
+        # 最后设置状态，读取方看到结束状态时事件和结果均已就绪
+        self.finished = time.time()
+        self.status = status
+
+    def to_dict(self, with_events: bool = True) -> Dict:
+        data = {
+            "job_id": self.job_id,
+            "warning_number": self.warning_number,
+            "file_name": self.file_name,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+        }
+        if with_events:
+            data["events"] = list(self.events)
+        return data
+
+
+class WarningAnalyzeWorker:
+    """研判任务工作类：多个工作线程从内存队列消费任务"""
+
+    def __init__(self):
+        self.job_queue = queue.Queue()
+        self._jobs: "OrderedDict[str, WarningAnalyzeJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    # ==================== 对外接口 ====================
+
+    def submit(self, job: WarningAnalyzeJob) -> WarningAnalyzeJob:
+        self._cleanup()
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self.job_queue.put(job)
+        logger.info(f"[WarningAnalyzeWorker] 研判任务 {job.job_id} 已加入队列，告警编号 {job.warning_number}")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[WarningAnalyzeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_size(self) -> int:
+        return self.job_queue.qsize()
+
+    # ==================== 生命周期 ====================
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for i in range(max(1, Settings.kb_settings.WARNING_ANALYZE_WORKERS)):
+            thread = threading.Thread(target=self._worker_loop, name=f"WarningAnalyzeWorker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"[WarningAnalyzeWorker] {len(self._threads)} 个工作线程已启动")
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for _ in self._threads:
+            self.job_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=3)
+        self._threads = []
+        logger.info("[WarningAnalyzeWorker] 工作线程已停止")
+
+    # ==================== 工作循环 ====================
+
+    def _worker_loop(self):
+        while self._running:
+            try:
+                job = self.job_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            # 哨兵值，退出循环
+            if job is None:
+                break
+            self._process(job)
+
+    def _process(self, job: WarningAnalyzeJob):
+        job.status = "processing"
+        try:
+            response = run_warning_analyze(job.warning_number, job.file_name, job.content_hash,
+                                           file_path=job.file_path, alarm_desc=job.alarm_desc,
+                                           progress=job.add_event, extracted=job.extracted)
+            status, result = "completed" if response.code == 200 else "failed", response.model_dump()
+        except Exception as e:
+            logger.error(f"[WarningAnalyzeWorker] 研判任务 {job.job_id} 异常: {e}\n{traceback.format_exc()}")
+            status, result = "failed", BaseResponse(code=500, msg=f"研判失败: {e}").model_dump()
+        finally:
+            if job.file_path and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+        # 临时文件删除后再标记结束
+        job.finish(status, result)
+
+    def _cleanup(self):
+        """清理结束时间超过 WARNING_JOB_TTL 的任务"""
+        expire = time.time() - Settings.kb_settings.WARNING_JOB_TTL
+        with self._lock:
+            for job_id in [k for k, j in self._jobs.items() if j.finished is not None and j.finished < expire]:
+                self._jobs.pop(job_id)
+
+
+# ==================== 全局实例 ====================
+
+warning_analyze_worker = WarningAnalyzeWorker()
+
+
+def start_warning_analyze_workers():
+    warning_analyze_worker.start()
+
+
+def stop_warning_analyze_workers():
+    warning_analyze_worker.stop()
+
+
+# ==================== 接口 ====================
+
+def submit_warning_analyze(warning_number: str = Body("test", description="告警编号"),
+                           file: UploadFile = File(..., description="上传文件"),
+                           alarm_desc: str = Body("", description="告警信息描述（可选），提供时同类告警检索与报告解析并行执行"),
+                           ) -> BaseResponse:
+    """提交研判任务，立即返回 job_id"""
+    content_hash = hash_upload_file(file)
+    job = WarningAnalyzeJob(warning_number, file.filename, content_hash, alarm_desc=alarm_desc,
+                            extracted=get_report_extraction(content_hash))
+    if job.extracted is None:
+        # 按 job_id 命名，避免同名文件的并发任务互相覆盖
+        job.file_path = os.path.join(Settings.basic_settings.BASE_TEMP_DIR, f"warning_{job.job_id}_{file.filename}")
+        save_upload_file(file, job.file_path)
+    warning_analyze_worker.submit(job)
+    return BaseResponse(data={"job_id": job.job_id, "status": job.status})
+
+
+def get_warning_analyze_job(job_id: str) -> BaseResponse:
+    """查询研判任务状态、进度事件和结果"""
+    job = warning_analyze_worker.get_job(job_id)
+    if job is None:
+        return BaseResponse(code=404, msg=f"研判任务 {job_id} 不存在或已过期")
+    return BaseResponse(data=job.to_dict())
+
+
+def stream_warning_analyze_job(job_id: str):
+    """以 SSE 推送研判进度事件，任务结束时推送包含结果的最后一条事件"""
+    job = warning_analyze_worker.get_job(job_id)
+    if job is None:
+        return BaseResponse(code=404, msg=f"研判任务 {job_id} 不存在或已过期")
+
+    async def iterator():
+        sent = 0
+        while True:
+            finished = job.status in FINISHED_STATUS
+            events = job.events[sent:]
+            sent += len(events)
+            for event in events:
+                yield json.dumps({"job_id": job_id, **event}, ensure_ascii=False)
+            if finished:
+                yield json.dumps(job.to_dict(with_events=False), ensure_ascii=False)
+                return
+            await asyncio.sleep(Settings.kb_settings.WARNING_JOB_POLL_INTERVAL)
+
+    return EventSourceResponse(iterator())
@@ -0,0 +1,107 @@
+"""
+告警研判数据缓存
+
+按条数、按字节数双重限制的 LRU + TTL 缓存，并记录命中/未命中/淘汰次数：
+- 写入和读取都返回深拷贝，调用方修改结果不会影响缓存内容
+- 条目大小按 orjson 序列化后的字节数估算
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import orjson
+
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expire: float
+
+
+class BoundedTTLCache:
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expire < time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any):
+        try:
+            size = len(orjson.dumps(value, default=str))
+        except TypeError:
+            size = len(repr(value).encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"[{self.name}] 缓存条目 {size} 字节超过上限 {self.max_bytes}，不缓存")
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = _Entry(value=value, size=size, expire=time.time() + self.ttl)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        """只判断是否存在且未过期，不计入命中统计"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry.expire >= time.time()
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
@@ -15,7 +15,8 @@ logging.basicConfig(level=logging.ERROR)
 logging.getLogger().setLevel(logging.ERROR)
 import fitz  # PyMuPDF
 import numpy as np
-from bs4 import BeautifulSoup
+
+from csm_ai_service.server.html_table import expand_spans, parse_html_table
 
 # 关闭所有日志
 logging.getLogger().setLevel(logging.ERROR)
@@ -62,18 +63,12 @@ def html_to_table(html):
     直接从 html 字符串提取表格 → 返回二维列表 [[行1],[行2]]
     稳定、不乱码、不报错
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    table = soup.find('table')
-    if not table:
+    rows = parse_html_table(html)
+    if rows is None:
         return []
 
-    # 提取所有行
-    rows = []
-    for tr in table.find_all('tr'):
-        # 提取每一列的文字
-        cols = [td.get_text(strip=True) for td in tr.find_all(['td', 'th'])]
-        rows.append(cols)
-    return rows
+    # 提取每一列的文字
+    return [[cell.text for cell in cells] for cells in rows]
 
 
 def _init_structured_fields() -> Dict:
@@ -126,46 +121,12 @@ def html_table_to_info(html_table) -> dict:
     把 RapidDoc 输出的 <table> 表格 转成 标准 Markdown 表格
     支持 rowspan / colspan 合并单元格
     """
-    soup = BeautifulSoup(html_table, "html.parser")
-    table = soup.find("table")
-    if not table:
-        return {}
-
-    rows = table.find_all("tr")
-    if len(rows) < 1:
+    rows = parse_html_table(html_table)
+    if not rows:
         return {}
 
-    # 处理跨行跨列核心逻辑
-    row_span_map = []
-    table_data = []
-
-    for tr in rows:
-        cells = tr.find_all(["td", "th"])
-        current_row = []
-        col_idx = 0
-
-        # 填充跨行遗留单元格
-        while col_idx < len(row_span_map) and row_span_map[col_idx] > 0:
-            current_row.append(table_data[-1][col_idx])
-            row_span_map[col_idx] -= 1
-            col_idx += 1
-
-        for cell in cells:
-            text = cell.get_text(strip=True)
-            colspan = int(cell.get("colspan", 1))
-            rowspan = int(cell.get("rowspan", 1))
-
-            # 处理跨列
-            for _ in range(colspan):
-                current_row.append(text)
-                # 处理跨行
-                if rowspan > 1:
-                    while len(row_span_map) <= col_idx:
-                        row_span_map.append(0)
-                    row_span_map[col_idx] = rowspan - 1
-                col_idx += 1
-
-        table_data.append(current_row)
+    # 处理跨行跨列
+    table_data = expand_spans(rows)
 
     # 生成标准 Markdown 表格
     table_info = {}
@@ -1,6 +1,7 @@
 import json
 import os
-from typing import List, Optional, Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, Dict
 from fastapi import Body, UploadFile, File
 from langchain_core.prompts import ChatPromptTemplate
 from csm_ai_service.server.utils import get_default_llm, get_ChatOpenAI, get_prompt_template, BaseResponse, \
@@ -9,8 +10,11 @@ from langchain_core.documents import Document
 
 from csm_ai_service.server.conversation.chat.utils import History
 from csm_ai_service.server.conversation.knowledge_base.kb_service.base import KBServiceFactory
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import semantic_cache
+from csm_ai_service.server.csm_analyze.warning_analysis.data_cache import BoundedTTLCache
 from csm_ai_service.server.csm_analyze.warning_analysis.extract_info.helper import output_standard_dict, _init_structured_fields
 from csm_ai_service.server.csm_analyze.warning_analysis.extract_structed_data import extract_dict_from_file_by_llm
+from csm_ai_service.server.upload_utils import save_upload_file, stream_sha256
 from csm_ai_service.settings import Settings
 from csm_ai_service.utils import build_logger
 from csm_ai_service.server.conversation.knowledge_base.utils import (
@@ -21,8 +25,26 @@ from csm_ai_service.server.conversation.knowledge_base.utils import (
 # 知识库插入、搜索
 logger = build_logger()
 
-# 全局缓存：告警编号 -> 提取的字典数据
+# 已知告警描述时，同类告警检索与报告解析并行执行
+_rag_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="WarningRAG")
+
+
+def _new_cache(name: str) -> BoundedTTLCache:
+    kb_settings = Settings.kb_settings
+    return BoundedTTLCache(name,
+                           max_entries=kb_settings.WARNING_CACHE_MAX_ENTRIES,
+                           max_bytes=kb_settings.WARNING_CACHE_MAX_BYTES,
+                           ttl=kb_settings.WARNING_CACHE_TTL)
+
+
+# 告警编号 -> 提取的字典数据（研判后等待人工确认保存入库）
+# 保存或删除时移除；不设过期和容量淘汰，否则研判后较晚保存会找不到数据而无法入库
 _warning_data_cache: Dict[str, Dict] = {}
+# 文件内容 SHA-256 -> 标准化后的提取结果，相同报告重复上传时跳过提取
+_extract_cache = _new_cache("warning_extract")
+# (文件内容 SHA-256, 告警描述, 告警知识库版本号) -> 研判结果
+# 检索用的告警描述（传入的 alarm_desc 或提取的告警信息）不同、或知识库变化后检索参考不同，需重新研判
+_analysis_cache = _new_cache("warning_analysis")
 
 
 def get_warning_data_from_cache(warning_number: str) -> Optional[Dict]:
@@ -37,11 +59,17 @@ def set_warning_data_to_cache(warning_number: str, data: Dict):
 
 def clear_warning_cache(warning_number: str = None):
     """清除缓存，如果不指定告警编号则清除全部"""
-    global _warning_data_cache
     if warning_number:
         _warning_data_cache.pop(warning_number, None)
     else:
-        _warning_data_cache = {}
+        _warning_data_cache.clear()
+
+
+def get_warning_cache_stats() -> Dict[str, Dict]:
+    """待入库告警数据条数，以及提取/研判缓存的条数、字节数及命中率统计"""
+    stats = {"warning_data": {"entries": len(_warning_data_cache)}}
+    stats.update({cache.name: cache.stats() for cache in (_extract_cache, _analysis_cache)})
+    return stats
 
 
 def _get_or_create_warning_kb():
@@ -113,22 +141,12 @@ def construct_rag_prompt(alarm_desc: str, top_k: int, score_threshold: float):
 
 # 保存，返回临时路径
 def save_to_temp_file(file: UploadFile):
-    file_content = file.file.read()  # 读取上传文件的内容
     new_file_path = os.path.join(Settings.basic_settings.BASE_TEMP_DIR, file.filename)
-    if os.path.exists(new_file_path):
-        os.remove(new_file_path)
-    with open(new_file_path, "wb") as f:
-        f.write(file_content)
-    return str(new_file_path)
+    return save_upload_file(file, new_file_path).path
 
 
 def save_to_target_file(file: UploadFile, target_file_path):
-    file_content = file.file.read()  # 读取上传文件的内容
-    if os.path.exists(target_file_path):
-        os.remove(target_file_path)
-    with open(target_file_path, "wb") as f:
-        f.write(file_content)
-    return str(target_file_path)
+    return save_upload_file(file, str(target_file_path)).path
 
 
 #
@@ -143,29 +161,64 @@ def init_warning_fields() -> dict:
     }
 
 
-# 一次性返回研判结果
-def warning_analyze(warning_number: str = Body("test", description="告警编号"),
-                    file: UploadFile = File(..., description="上传文件")) -> BaseResponse:
+def _ignore_progress(stage: str, message: str, progress: int):
+    pass
+
+
+def run_warning_analyze(warning_number: str,
+                        file_name: str,
+                        content_hash: str,
+                        file_path: str = None,
+                        alarm_desc: str = "",
+                        progress: Callable[[str, str, int], None] = None,
+                        extracted: Optional[Dict] = None) -> BaseResponse:
+    """
+    告警处置报告研判流水线：解析报告 -> 检索同类告警 -> 大模型研判。
+    传入 alarm_desc 时检索不依赖解析结果，与解析并行执行；
+    extracted 为调用方在提交时取到的提取结果，避免执行前缓存过期；
+    file_path 只在没有提取结果时使用，由调用方负责删除；progress(stage, message, progress) 用于上报进度
+    """
+    progress = progress or _ignore_progress
+    kb_settings = Settings.kb_settings
+    analysis_key = (content_hash, alarm_desc, semantic_cache.version(kb_settings.WARNING_KNOWLEDGE))
+    rag_future = None
+    if alarm_desc and analysis_key not in _analysis_cache:
+        progress("retrieving", "检索同类告警处置报告", 5)
+        rag_future = _rag_executor.submit(construct_rag_prompt, alarm_desc=alarm_desc, top_k=kb_settings.VECTOR_SEARCH_TOP_K,
+                                          score_threshold=kb_settings.SCORE_THRESHOLD)
+
+    result = extracted if extracted is not None else _extract_cache.get(content_hash)
+    if result is not None:
+        logger.info(f"\n告警处置报告【{file_name}】内容已解析过，复用提取结果")
+    else:
+        progress("extracting", f"解析告警处置报告{file_name}", 10)
+        ext = os.path.splitext(file_name)[-1].lower()
+        try:
+            result = extract_dict_from_file_by_llm(file_path, file_name, ext)
+            result = output_standard_dict(_init_structured_fields(), result)
+            logger.info(f"\n【step 3】标准化告警处置报告【{file_name}】的结果")
+            _extract_cache.set(content_hash, result)
+        except Exception as e:
+            data = init_warning_fields()
+            data["audit_result"] = "需人工复核"
+            data["audit_details"] = f"解析{file_name}失败，请人工检查，可能是不支持OCR识别导致的"
+            return BaseResponse(code=202, msg=f"解析{file_name}失败，报错信息{e}", data=data)
+    progress("extracted", "报告解析完成", 50)
     # 每次都更新缓存
-    new_file_path = save_to_temp_file(file)
-    file_name = file.filename
-    ext = os.path.splitext(file.filename)[-1].lower()
-    try:
-        result = extract_dict_from_file_by_llm(new_file_path, file_name, ext)
-        result = output_standard_dict(_init_structured_fields(), result)
-        logger.info(f"\n【step 3】标准化告警处置报告【{file_name}】的结果")
-        # 存入缓存
-        set_warning_data_to_cache(warning_number, result)
-    except Exception as e:
-        data = init_warning_fields()
-        data["audit_result"] = "需人工复核"
-        data["audit_details"] = f"解析{file.filename}失败，请人工检查，可能是不支持OCR识别导致的"
-        return BaseResponse(code=202, msg=f"解析{file.filename}失败，报错信息{e}", data=data)
-    finally:
-        os.remove(new_file_path)
+    set_warning_data_to_cache(warning_number, result)
+
+    cached_analysis = _analysis_cache.get(analysis_key)
+    if cached_analysis is not None:
+        logger.info(f"\n告警处置报告【{file_name}】已研判过且告警知识库未变化，复用研判结果")
+        return BaseResponse(data=cached_analysis)
     try:
-        rag_retrieve_info = construct_rag_prompt(alarm_desc=result["告警信息"], top_k=Settings.kb_settings.VECTOR_SEARCH_TOP_K,
-                                                 score_threshold=Settings.kb_settings.SCORE_THRESHOLD)
+        if rag_future is not None:
+            rag_retrieve_info = rag_future.result()
+        else:
+            progress("retrieving", "检索同类告警处置报告", 55)
+            rag_retrieve_info = construct_rag_prompt(alarm_desc=result["告警信息"], top_k=kb_settings.VECTOR_SEARCH_TOP_K,
+                                                     score_threshold=kb_settings.SCORE_THRESHOLD)
+        progress("analyzing", "大模型研判中", 70)
         report_info = json.dumps(result, ensure_ascii=False, indent=2)
         llm = get_ChatOpenAI(
             model_name=get_default_llm(),
@@ -186,12 +239,40 @@ def warning_analyze(warning_number: str = Body("test", description="告警编号
         res_dic = fix_llm_json_output(content)
         logger.debug(f"\n【step 5】修复对{file_name}的智能研判结果json: \n{res_dic}")
         res_dic = output_standard_dict(init_warning_fields(), res_dic)
+        _analysis_cache.set(analysis_key, res_dic)
         return BaseResponse(data=res_dic)
     except Exception as e:
         data = init_warning_fields()
         data["audit_result"] = "需人工复核"
-        data["audit_details"] = f"大模型分析{file.filename}失败，请人工查看"
-        return BaseResponse(code=203, msg=f"大模型分析{file.filename}失败，请人工查看，报错信息{e}", data=data)
+        data["audit_details"] = f"大模型分析{file_name}失败，请人工查看"
+        return BaseResponse(code=203, msg=f"大模型分析{file_name}失败，请人工查看，报错信息{e}", data=data)
+
+
+def hash_upload_file(file: UploadFile) -> str:
+    """计算上传文件内容的 SHA-256，并将读取位置复位"""
+    file.file.seek(0)
+    content_hash = stream_sha256(file.file)
+    file.file.seek(0)
+    return content_hash
+
+
+def get_report_extraction(content_hash: str) -> Optional[Dict]:
+    """相同内容报告的已有提取结果（有则无需落盘临时文件），调用方应把结果传给 run_warning_analyze"""
+    return _extract_cache.get(content_hash)
+
+
+# 一次性返回研判结果
+def warning_analyze(warning_number: str = Body("test", description="告警编号"),
+                    file: UploadFile = File(..., description="上传文件")) -> BaseResponse:
+    content_hash = hash_upload_file(file)
+    extracted = get_report_extraction(content_hash)
+    new_file_path = None if extracted is not None else save_to_temp_file(file)
+    try:
+        return run_warning_analyze(warning_number, file.filename, content_hash, file_path=new_file_path,
+                                   extracted=extracted)
+    finally:
+        if new_file_path:
+            os.remove(new_file_path)
 
 
 # 保存处置报告
@@ -256,30 +337,11 @@ def delete_warning_report(
     if kb is None:
         return BaseResponse(code=404, msg="告警知识库不存在")
 
-    # 根据告警编号检索文档
+    # 根据告警编号一次查出全部文档，批量删除后只保存一次向量库
     try:
-        docs = kb.list_docs(metadata={"warning_number": warning_number})
-        if not docs:
+        valid_file_names = kb.delete_docs_by_metadata({"warning_number": warning_number}, delete_content=True)
+        if not valid_file_names:
             return BaseResponse(code=404, msg=f"未找到告警编号为 {warning_number} 的处置报告")
-        file_names = set()
-        for doc in docs:
-            file_names.add(doc.metadata['source'])
-        valid_file_names = []
-        for file_name in file_names:
-            if not kb.exist_doc(file_name):
-                continue
-            try:
-
-                kb_file = KnowledgeFile(
-                    filename=file_name, knowledge_base_name=Settings.kb_settings.WARNING_KNOWLEDGE
-                )
-                kb.delete_doc(kb_file, True, not_refresh_vs_cache=True)
-                valid_file_names.append(file_name)
-            except Exception as e:
-                msg = f"{file_name} 文件删除失败，错误信息：{e}"
-                logger.error(f"{e.__class__.__name__}: {msg}")
-
-            kb.save_vector_store()
 
         return BaseResponse(
             code=200, msg=f"文件删除完成", data={"delete_files": valid_file_names}
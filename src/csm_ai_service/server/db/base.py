@@ -1,16 +1,130 @@
 import json
+import threading
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from csm_ai_service.settings import Settings
 
 
-engine = create_engine(
-    Settings.basic_settings.SQLALCHEMY_DATABASE_URI,
-    json_serializer=lambda obj: json.dumps(obj, ensure_ascii=False),
-)
+class DBLockStats:
+    """
+    SQLite 锁竞争统计
+    - locked_errors: 等待超过 busy_timeout 后仍抛出 database is locked 的次数
+    - slow_writes: 写语句执行耗时超过 SQLITE_SLOW_LOCK_MS 的次数（基本都是在等写锁）
+    - total_wait_ms / max_wait_ms: 上述慢写语句的累计/最大耗时
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.locked_errors = 0
+            self.slow_writes = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+
+    def record_locked_error(self):
+        with self._lock:
+            self.locked_errors += 1
+
+    def record_slow_write(self, elapsed_ms: float):
+        with self._lock:
+            self.slow_writes += 1
+            self.total_wait_ms += elapsed_ms
+            self.max_wait_ms = max(self.max_wait_ms, elapsed_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "locked_errors": self.locked_errors,
+                "slow_writes": self.slow_writes,
+                "total_wait_ms": round(self.total_wait_ms, 1),
+                "max_wait_ms": round(self.max_wait_ms, 1),
+            }
+
+
+db_lock_stats = DBLockStats()
+
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _create_engine(url: str):
+    """
+    创建数据库引擎。
+    SQLite 下开启 WAL、synchronous=NORMAL 等连接参数，避免任务线程、审计线程和 API 请求并发写 info.db 时出现
+    database is locked 与串行 fsync；其它数据库保持 SQLAlchemy 默认行为。
+    """
+    bs = Settings.basic_settings
+    json_serializer = lambda obj: json.dumps(obj, ensure_ascii=False)
+    if not _is_sqlite(url):
+        return create_engine(url, json_serializer=json_serializer)
+
+    database = make_url(url).database
+    in_memory = not database or database == ":memory:"
+    _engine = create_engine(
+        url,
+        json_serializer=json_serializer,
+        # 连接会在线程池线程之间复用，关闭 pysqlite 的同线程检查；timeout 单位为秒
+        connect_args={"check_same_thread": False, "timeout": bs.SQLITE_BUSY_TIMEOUT / 1000},
+        poolclass=QueuePool,
+        pool_size=bs.SQLITE_POOL_SIZE,
+        max_overflow=bs.SQLITE_POOL_SIZE * 2,
+        pool_pre_ping=True,
+    )
+
+    @event.listens_for(_engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(bs.SQLITE_BUSY_TIMEOUT)}")
+            cursor.execute(f"PRAGMA mmap_size={int(bs.SQLITE_MMAP_SIZE)}")
+            # 负数表示以 KiB 为单位
+            cursor.execute(f"PRAGMA cache_size=-{int(bs.SQLITE_CACHE_SIZE)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
+
+    @event.listens_for(_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start_time"] = time.perf_counter()
+
+    @event.listens_for(_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("query_start_time", None)
+        if start is None or not statement.lstrip().upper().startswith(_WRITE_PREFIXES):
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= bs.SQLITE_SLOW_LOCK_MS:
+            db_lock_stats.record_slow_write(elapsed_ms)
+
+    @event.listens_for(_engine, "handle_error")
+    def _handle_error(context):
+        if "database is locked" in str(context.original_exception):
+            db_lock_stats.record_locked_error()
+
+    return _engine
+
+
+def get_db_lock_stats() -> dict:
+    """获取数据库锁竞争统计及连接池状态"""
+    return {**db_lock_stats.snapshot(), "pool": engine.pool.status()}
+
+
+engine = _create_engine(Settings.basic_settings.SQLALCHEMY_DATABASE_URI)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
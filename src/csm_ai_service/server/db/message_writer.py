@@ -0,0 +1,245 @@
+"""
+聊天记录异步写入（write-behind）
+
+流式对话接口运行在事件循环中，直接同步写 SQLite 时，一次 commit 会卡住同一事件循环上的所有流。
+这里将新增/更新聊天记录的操作放入内存队列立即返回，由后台单线程攒批后在一个事务内提交：
+- 新增记录的 id 在入队时生成，调用方可立即拿到 message_id
+- 同一批内对刚新增记录的更新直接合并到待插入对象上，不额外发 UPDATE
+- 批量提交失败时回滚并逐条重试，避免一条坏数据拖累整批
+"""
+import queue
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, update
+
+from csm_ai_service.server.db.models.message_model import MessageModel
+from csm_ai_service.server.db.models.user_message_model import UserMessageModel
+from csm_ai_service.server.db.session import session_scope
+from csm_ai_service.server.utils import build_logger
+from csm_ai_service.settings import Settings
+
+logger = build_logger()
+
+_ADD = "add"
+_UPDATE = "update"
+
+
+class MessageWriter:
+    """聊天记录写入工作类：单线程从内存队列消费写操作，按批提交"""
+
+    def __init__(self):
+        self.write_queue = queue.Queue()
+        self._worker_thread = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    # ==================== 对外接口 ====================
+
+    def submit_add(self, model, message_id: str, fields: Dict):
+        """提交一条新增记录操作"""
+        self._ensure_started()
+        self.write_queue.put((_ADD, model, message_id, fields))
+
+    def submit_update(self, model, message_id: str, fields: Dict):
+        """提交一条更新记录操作"""
+        self._ensure_started()
+        self.write_queue.put((_UPDATE, model, message_id, fields))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前提交的所有写操作落库，返回是否在超时前完成"""
+        if not self._running:
+            return self.write_queue.empty()
+        done = threading.Event()
+        self.write_queue.put(done)
+        return done.wait(timeout)
+
+    def queue_size(self) -> int:
+        """当前队列中待写入操作数"""
+        return self.write_queue.qsize()
+
+    # ==================== 生命周期 ====================
+
+    def _ensure_started(self):
+        if not self._running:
+            self.start()
+
+    def start(self):
+        """启动写入线程"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._worker_thread = threading.Thread(
+                target=self._worker_loop,
+                name="MessageWriter",
+                daemon=True,
+            )
+            self._worker_thread.start()
+        logger.info("[MessageWriter] 写入线程已启动")
+
+    def stop(self, timeout: float = 3):
+        """停止写入线程（先写完队列中已有的操作）"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        # 哨兵值：唤醒阻塞在 get() 上的线程并让其退出
+        self.write_queue.put(None)
+        if self._worker_thread and self._worker_thread.is_alive():
+            self._worker_thread.join(timeout=timeout)
+        logger.info("[MessageWriter] 写入线程已停止")
+
+    # ==================== 工作循环 ====================
+
+    def _worker_loop(self):
+        bs = Settings.basic_settings
+        while True:
+            item = self.write_queue.get()
+            batch, waiters, stop = [], [], False
+            # 攒批：拿到第一条后在 flush 间隔内继续收集，直到达到批量上限
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= bs.MESSAGE_WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = self.write_queue.get(timeout=bs.MESSAGE_WRITE_FLUSH_INTERVAL)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                # 哨兵之后仍可能有残留操作，退出前全部写完
+                remaining = []
+                while not self.write_queue.empty():
+                    item = self.write_queue.get_nowait()
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    elif item is not None:
+                        remaining.append(item)
+                if remaining:
+                    self._write_batch(remaining)
+                return
+
+    def _write_batch(self, batch: List[tuple]):
+        try:
+            with session_scope() as session:
+                _apply_ops(session, batch)
+        except Exception as e:
+            logger.error(f"[MessageWriter] 批量写入 {len(batch)} 条失败，改为逐条写入: {e}")
+            for op in batch:
+                try:
+                    with session_scope() as session:
+                        _apply_ops(session, [op])
+                except Exception as e:
+                    logger.error(f"[MessageWriter] 写入聊天记录 {op[2]} 失败: {e}")
+
+
+def _apply_ops(session, ops: List[tuple]):
+    """在一个会话内按顺序应用写操作：先插入新记录，再对库中已有记录批量 UPDATE"""
+    pending = {}
+    updates = {}
+    for kind, model, message_id, fields in ops:
+        key = (model, message_id)
+        if kind == _ADD:
+            obj = model(id=message_id, **fields)
+            session.add(obj)
+            pending[key] = obj
+        elif key in pending:
+            for name, value in fields.items():
+                setattr(pending[key], name, value)
+        else:
+            # 同一条记录多次更新只保留最后的字段值
+            updates.setdefault(model, {}).setdefault(message_id, {}).update(fields)
+    session.flush()
+
+    for model, rows in updates.items():
+        by_columns = {}
+        for message_id, fields in rows.items():
+            by_columns.setdefault(tuple(sorted(fields)), []).append({"_id": message_id, **fields})
+        for columns, params in by_columns.items():
+            stmt = (
+                update(model.__table__)
+                .where(model.__table__.c.id == bindparam("_id"))
+                .values({c: bindparam(c) for c in columns})
+            )
+            session.execute(stmt, params)
+
+
+message_writer = MessageWriter()
+
+
+def enqueue_message(
+        conversation_id: str,
+        query,
+        response="",
+        message_id=None,
+        metadata: Dict = None,
+) -> str:
+    """
+    异步新增聊天记录，立即返回 message_id（与 add_message_to_db 参数一致）
+    """
+    if not message_id:
+        message_id = uuid.uuid4().hex
+    message_writer.submit_add(MessageModel, message_id, {
+        "query": query,
+        "response": response,
+        "conversation_id": conversation_id,
+        "meta_data": metadata or {},
+    })
+    return message_id
+
+
+def enqueue_response_update(message_id: str, response: str = None):
+    """
+    异步更新聊天记录的回答（与 update_response_message 参数一致）
+    """
+    if response is not None:
+        message_writer.submit_update(MessageModel, message_id, {"response": response})
+
+
+def enqueue_user_message(
+        chat_type,
+        query,
+        response="",
+        message_id=None,
+        user_id=None,
+) -> str:
+    """
+    异步新增用户维度聊天记录，立即返回 message_id（与 add_user_message_to_db 参数一致）
+    """
+    if not message_id:
+        message_id = uuid.uuid4().hex
+    message_writer.submit_add(UserMessageModel, message_id, {
+        "user_id": user_id,
+        "chat_type": chat_type,
+        "query": query,
+        "response": response,
+    })
+    return message_id
+
+
+def enqueue_user_response_update(message_id: str, response: str = None):
+    """
+    异步更新用户维度聊天记录的回答（与 update_user_message 参数一致）
+    """
+    if response is not None:
+        message_writer.submit_update(UserMessageModel, message_id, {"response": response})
+
+
+def flush_message_writes(timeout: Optional[float] = None) -> bool:
+    """等待已提交的聊天记录全部落库"""
+    return message_writer.flush(timeout)
+
+
+def stop_message_writer():
+    message_writer.stop()
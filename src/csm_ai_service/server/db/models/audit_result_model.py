@@ -1,7 +1,7 @@
 """
 审计结果模型 - 存储每个任务中每条审计规则的执行结果
 """
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean, Index
 from sqlalchemy.dialects.mysql import JSON
 
 from csm_ai_service.server.db.base import Base
@@ -14,7 +14,7 @@ class AuditResultModel(Base):
     __tablename__ = "audit_result"
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment="关联ID")
-    task_id = Column(Integer, ForeignKey("task.id"), nullable=False, index=True, comment="任务ID")
+    task_id = Column(Integer, ForeignKey("task.id"), nullable=False, comment="任务ID")
     rule_id = Column(Integer, ForeignKey("audit_rule.id"), nullable=False, index=True, comment="审计规则ID")
     contract_id = Column(Integer, ForeignKey("contract.id"), nullable=False, index=True, comment="合同ID(冗余)")
 
@@ -34,5 +34,10 @@ class AuditResultModel(Base):
     related_text = Column(Text, default="", comment="引用的相关原文")
     related_doc_ids = Column(JSON, default=list, comment="引用的相关文档ID")
 
+    __table_args__ = (
+        # 按任务取结果并按 id 排序
+        Index("ix_audit_result_task_id_id", "task_id", "id"),
+    )
+
     def __repr__(self):
         return f"<AuditResult(id={self.id}, task_id={self.task_id}, rule_id={self.rule_id}, is_compliant={self.is_compliant})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from csm_ai_service.server.db.base import Base
 from csm_ai_service.server.db.models.base import get_shanghai_time
 
@@ -17,11 +17,19 @@ class ContractModel(Base):
     file_name = Column(String(255), nullable=False, comment="原始文件名")
     file_size = Column(Integer, default=0, comment="文件大小(字节)")
     file_type = Column(String(50), default="pdf", comment="文件类型")
+    file_hash = Column(String(64), nullable=True, comment="文件内容 SHA-256，用于按内容去重")
 
     # 处理状态
     status = Column(String(20), default="pending", comment="处理状态: pending/processing/completed/failed")
     create_time = Column(DateTime, default=get_shanghai_time(), comment="创建时间")
     update_time = Column(DateTime, default=get_shanghai_time(), onupdate=get_shanghai_time(), comment="更新时间")
 
+    __table_args__ = (
+        Index("ix_contract_file_name", "file_name"),
+        Index("ix_contract_file_hash", "file_hash"),
+        # 列表按 (update_time, id) 倒序做游标分页
+        Index("ix_contract_update_time_id", "update_time", "id"),
+    )
+
     def __repr__(self):
         return f"<Contract(id={self.id}, file_name='{self.file_name}', status='{self.status}')>"
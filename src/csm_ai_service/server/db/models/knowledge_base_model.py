@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel
-from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
 
 from csm_ai_service.server.db.base import Base
 from csm_ai_service.server.db.models.base import get_shanghai_time
@@ -22,6 +22,10 @@ class KnowledgeBaseModel(Base):
     file_count = Column(Integer, default=0, comment="文件数量")
     create_time = Column(DateTime, default=get_shanghai_time(), comment="创建时间")
 
+    __table_args__ = (
+        Index("ix_knowledge_base_kb_name", func.lower(kb_name)),
+    )
+
     def __repr__(self):
         return f"<KnowledgeBase(id='{self.id}', kb_name='{self.kb_name}',kb_intro='{self.kb_info} vs_type='{self.vs_type}', embed_model='{self.embed_model}', file_count='{self.file_count}', create_time='{self.create_time}')>"
 
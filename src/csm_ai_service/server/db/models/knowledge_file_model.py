@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer, String, func
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Index, Integer, String, func
 
 from csm_ai_service.server.db.base import Base
 from csm_ai_service.server.db.models.base import get_shanghai_time
@@ -23,6 +23,11 @@ class KnowledgeFileModel(Base):
     docs_count = Column(Integer, default=0, comment="切分文档数量")
     create_time = Column(DateTime, default=get_shanghai_time(), comment="创建时间")
 
+    # 按 (知识库, 文件名) 大小写不敏感查询
+    __table_args__ = (
+        Index("ix_knowledge_file_kb_file", func.lower(kb_name), func.lower(file_name)),
+    )
+
     def __repr__(self):
         return f"<KnowledgeFile(id='{self.id}', file_name='{self.file_name}', file_ext='{self.file_ext}', kb_name='{self.kb_name}', document_loader_name='{self.document_loader_name}', text_splitter_name='{self.text_splitter_name}', file_version='{self.file_version}', create_time='{self.create_time}')>"
 
@@ -39,5 +44,10 @@ class FileDocModel(Base):
     doc_id = Column(String(50), comment="向量库文档ID")
     meta_data = Column(JSON, default={})
 
+    # 按 (知识库, 文件名) 大小写不敏感查询
+    __table_args__ = (
+        Index("ix_file_doc_kb_file", func.lower(kb_name), func.lower(file_name)),
+    )
+
     def __repr__(self):
         return f"<FileDoc(id='{self.id}', kb_name='{self.kb_name}', file_name='{self.file_name}', doc_id='{self.doc_id}', metadata='{self.meta_data}')>"
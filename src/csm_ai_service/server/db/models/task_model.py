@@ -3,7 +3,7 @@
 每个任务对应一个合同，经历 OCR识别 -> 审计 两个阶段
 数据库不存储路径信息，路径通过 contract_id 和 file_name 动态拼接。
 """
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean, Index
 from csm_ai_service.server.db.base import Base
 from csm_ai_service.server.db.models.base import get_shanghai_time
 
@@ -16,7 +16,7 @@ class TaskModel(Base):
     __tablename__ = "task"
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment="任务唯一ID")
-    contract_id = Column(Integer, ForeignKey("contract.id"), nullable=False, index=True, comment="关联合同ID")
+    contract_id = Column(Integer, ForeignKey("contract.id"), nullable=False, comment="关联合同ID")
 
     # 任务状态: pending / ocr_processing / ocr_done / audit_processing / completed / failed
     status = Column(String(30), default="pending", comment="任务状态")
@@ -41,5 +41,12 @@ class TaskModel(Base):
     audit_start_time = Column(DateTime, default=None, comment="审计开始时间")
     audit_end_time = Column(DateTime, default=None, comment="审计结束时间")
 
+    __table_args__ = (
+        # 按合同查询任务及状态
+        Index("ix_task_contract_status", "contract_id", "status"),
+        # 列表按 (create_time, id) 倒序做游标分页
+        Index("ix_task_create_time_id", "create_time", "id"),
+    )
+
     def __repr__(self):
         return f"<Task(id={self.id}, contract_id={self.contract_id}, status='{self.status}')>"
\ No newline at end of file
@@ -3,6 +3,8 @@
 """
 from typing import List, Dict
 
+from sqlalchemy import insert, update
+
 from csm_ai_service.server.protection_audit.audit.audit_graph import RuleAuditResult
 from csm_ai_service.server.db.models import AuditResultModel
 from csm_ai_service.server.db.session import with_session
@@ -117,28 +119,46 @@ def batch_add_audit_results(
 ) -> List[int]:
     """
     批量创建审计结果（初始化时，结果状态均为 False）
-    返回创建的ID列表
+    使用一条 INSERT ... VALUES (...), (...) 写入，返回与 rules 顺序一致的ID列表
+    """
+    if not rules:
+        return []
+    values = [
+        {
+            "task_id": task_id,
+            "rule_id": rule["id"],
+            "contract_id": contract_id,
+            "rule_name": rule["name"],
+            "rule_description": rule["description"],
+            "rule_judge_logic": rule["judge_logic"],
+            "is_compliant": False,
+        }
+        for rule in rules
+    ]
+    stmt = insert(AuditResultModel).values(values) \
+        .returning(AuditResultModel.id, AuditResultModel.rule_id)
+    id_by_rule_id = {rule_id: _id for _id, rule_id in session.execute(stmt).all()}
+    session.commit()
+    return [id_by_rule_id[rule["id"]] for rule in rules]
+
+
+@with_session
+def bulk_update_audit_results(session, results: List[Dict]) -> int:
+    """
+    批量更新审计结果（executemany，一个事务提交）
+    results 形式：[{"id": result_id, "conclusion": ..., ...}, ...]，字段同 update_audit_result，
+    值为 None 的字段不更新
     """
-    ids = []
-    for rule in rules:
-        rule_id = rule["id"]
-        rule_name = rule["name"]
-        rule_description = rule["description"]
-        rule_judge_logic = rule["judge_logic"]
-        m = AuditResultModel(
-            task_id=task_id,
-            rule_id=rule_id,
-            contract_id=contract_id,
-            rule_name=rule_name,
-            rule_description=rule_description,
-            rule_judge_logic=rule_judge_logic,
-            is_compliant=False,
-        )
-        session.add(m)
-        session.flush()
-        ids.append(m.id)
+    params = []
+    for r in results:
+        row = {k: v for k, v in r.items() if v is not None}
+        if "id" in row and len(row) > 1:
+            params.append(row)
+    if not params:
+        return 0
+    session.execute(update(AuditResultModel), params)
     session.commit()
-    return ids
+    return len(params)
 
 # ==================== 辅助函数 ====================
 
@@ -1,8 +1,9 @@
 import os
-from typing import List, Optional
-from sqlalchemy import desc
+from typing import List, Optional, Tuple
+from sqlalchemy import desc, func
 from csm_ai_service.server.db.models import ContractModel
 from csm_ai_service.server.db.session import with_session
+from csm_ai_service.server.db.utils import encode_cursor, keyset_before
 from csm_ai_service.settings import Settings
 
 
@@ -17,6 +18,17 @@ def get_contract_by_name(session, file_name: str) -> Optional[dict]:
     return _contract_to_dict(c)
 
 
+@with_session
+def get_contract_by_hash(session, file_hash: str) -> Optional[dict]:
+    """
+    根据文件内容 SHA-256 查找合同，返回字典；不存在返回None
+    """
+    c = session.query(ContractModel).filter_by(file_hash=file_hash).order_by(ContractModel.id).first()
+    if c is None:
+        return None
+    return _contract_to_dict(c)
+
+
 @with_session
 def add_contract(
     session,
@@ -24,6 +36,7 @@ def add_contract(
     file_size: int = 0,
     file_type: str = "pdf",
     status: str = "pending",
+    file_hash: str = None,
 ) -> int:
     """
     新增合同记录，返回自增ID。
@@ -38,6 +51,7 @@ def add_contract(
         file_size=file_size,
         file_type=file_type,
         status=status,
+        file_hash=file_hash,
     )
     session.add(m)
     session.commit()
@@ -60,14 +74,30 @@ def list_contracts(
     session,
     limit: int = 100,
     offset: int = 0,
-) -> List[dict]:
+    cursor: str = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    获取合同列表，按时间倒序，返回 (合同列表, 下一页游标)
+    传入 cursor（上一页返回的游标）时按游标分页并忽略 offset；没有下一页时游标为 None
+    """
+    query = session.query(ContractModel).order_by(desc(ContractModel.update_time), desc(ContractModel.id))
+    if cursor:
+        query = query.filter(keyset_before(ContractModel.update_time, ContractModel.id, cursor))
+    else:
+        query = query.offset(offset)
+    contracts = query.limit(limit).all()
+    next_cursor = None
+    if contracts and len(contracts) == limit:
+        next_cursor = encode_cursor(contracts[-1].update_time, contracts[-1].id)
+    return [_contract_to_dict(c) for c in contracts], next_cursor
+
+
+@with_session
+def count_contracts(session) -> int:
     """
-    获取合同列表，按时间倒序
+    合同总数
     """
-    contracts = session.query(ContractModel) \
-        .order_by(desc(ContractModel.update_time)) \
-        .offset(offset).limit(limit).all()
-    return [_contract_to_dict(c) for c in contracts]
+    return session.query(func.count(ContractModel.id)).scalar()
 
 
 @with_session
@@ -78,6 +108,7 @@ def update_contract(
     file_size: int = None,
     file_type: str = None,
     status: str = None,
+    file_hash: str = None,
 ) -> bool:
     """
     更新合同信息（只更新传入的非None字段）
@@ -93,6 +124,8 @@ def update_contract(
         m.file_type = file_type
     if status is not None:
         m.status = status
+    if file_hash is not None:
+        m.file_hash = file_hash
     session.add(m)
     session.commit()
     return True
@@ -125,6 +158,7 @@ def _contract_to_dict(c: ContractModel) -> dict:
         "file_path": file_path,
         "file_size": c.file_size,
         "file_type": c.file_type,
+        "file_hash": c.file_hash,
         "status": c.status,
         "create_time": c.create_time.strftime("%Y-%m-%d %H:%M:%S") if c.create_time else None,
         "update_time": c.update_time.strftime("%Y-%m-%d %H:%M:%S") if c.update_time else None,
@@ -1,8 +1,12 @@
+from sqlalchemy import func
+
 from csm_ai_service.server.db.models.knowledge_base_model import (
     KnowledgeBaseModel,
     KnowledgeBaseSchema,
 )
+from csm_ai_service.server.db.models.knowledge_file_model import KnowledgeFileModel
 from csm_ai_service.server.db.session import with_session
+from csm_ai_service.server.db.utils import ci_equal
 
 
 @with_session
@@ -10,7 +14,7 @@ def add_kb_to_db(session, kb_name, kb_info, vs_type, embed_model):
     # 创建知识库实例
     kb = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_name))
         .first()
     )
     if not kb:
@@ -36,11 +40,34 @@ def list_kbs_from_db(session, min_file_count: int = -1):
     return kbs
 
 
+@with_session
+def list_kb_details_from_db(session):
+    """
+    一次分组查询列出所有知识库及其实际文件数（file_count 按 knowledge_file 统计）
+    """
+    rows = (
+        session.query(KnowledgeBaseModel, func.count(KnowledgeFileModel.id))
+        .outerjoin(
+            KnowledgeFileModel,
+            func.lower(KnowledgeFileModel.kb_name) == func.lower(KnowledgeBaseModel.kb_name),
+        )
+        .group_by(KnowledgeBaseModel.id)
+        .order_by(KnowledgeBaseModel.id)
+        .all()
+    )
+    data = []
+    for kb, file_count in rows:
+        detail = KnowledgeBaseSchema.model_validate(kb).model_dump()
+        detail["file_count"] = file_count
+        data.append(detail)
+    return data
+
+
 @with_session
 def kb_exists(session, kb_name):
     kb = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_name))
         .first()
     )
     status = True if kb else False
@@ -51,7 +78,7 @@ def kb_exists(session, kb_name):
 def load_kb_from_db(session, kb_name):
     kb = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_name))
         .first()
     )
 
@@ -66,7 +93,7 @@ def load_kb_from_db(session, kb_name):
 def delete_kb_from_db(session, kb_name):
     kb = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_name))
         .first()
     )
     if kb:
@@ -78,7 +105,7 @@ def delete_kb_from_db(session, kb_name):
 def get_kb_detail(session, kb_name: str) -> dict:
     kb: KnowledgeBaseModel = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_name))
         .first()
     )
     if kb:
@@ -6,6 +6,7 @@ from csm_ai_service.server.db.models.knowledge_file_model import (
     KnowledgeFileModel,
 )
 from csm_ai_service.server.db.session import with_session
+from csm_ai_service.server.db.utils import ci_equal
 from csm_ai_service.server.conversation.knowledge_base.utils import KnowledgeFile
 
 
@@ -38,13 +39,17 @@ def list_docs_from_db(
     列出某知识库某文件对应的所有Document。
     返回形式：[{"id": str, "metadata": dict}, ...]
     """
-    docs = session.query(FileDocModel).filter(FileDocModel.kb_name.ilike(kb_name))
+    docs = session.query(FileDocModel).filter(ci_equal(FileDocModel.kb_name, kb_name))
     if file_name:
-        docs = docs.filter(FileDocModel.file_name.ilike(file_name))
+        # 含 % 时按 sql 通配符匹配，否则走 (kb_name, file_name) 索引等值查询
+        if "%" in file_name:
+            docs = docs.filter(FileDocModel.file_name.ilike(file_name))
+        else:
+            docs = docs.filter(ci_equal(FileDocModel.file_name, file_name))
     for k, v in metadata.items():
         docs = docs.filter(FileDocModel.meta_data[k].as_string() == str(v))
 
-    return [{"id": x.doc_id, "metadata": x.metadata} for x in docs.all()]
+    return [{"id": x.doc_id, "metadata": x.meta_data} for x in docs.all()]
 
 
 @with_session
@@ -58,9 +63,9 @@ def delete_docs_from_db(
     返回形式：[{"id": str, "metadata": dict}, ...]
     """
     docs = list_docs_from_db(kb_name=kb_name, file_name=file_name)
-    query = session.query(FileDocModel).filter(FileDocModel.kb_name.ilike(kb_name))
+    query = session.query(FileDocModel).filter(ci_equal(FileDocModel.kb_name, kb_name))
     if file_name:
-        query = query.filter(FileDocModel.file_name.ilike(file_name))
+        query = query.filter(ci_equal(FileDocModel.file_name, file_name))
     query.delete(synchronize_session=False)
     session.commit()
     return docs
@@ -93,7 +98,7 @@ def add_docs_to_db(session, kb_name: str, file_name: str, doc_infos: List[Dict])
 def count_files_from_db(session, kb_name: str) -> int:
     return (
         session.query(KnowledgeFileModel)
-        .filter(KnowledgeFileModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeFileModel.kb_name, kb_name))
         .count()
     )
 
@@ -102,7 +107,7 @@ def count_files_from_db(session, kb_name: str) -> int:
 def list_files_from_db(session, kb_name):
     files = (
         session.query(KnowledgeFileModel)
-        .filter(KnowledgeFileModel.kb_name.ilike(kb_name))
+        .filter(ci_equal(KnowledgeFileModel.kb_name, kb_name))
         .all()
     )
     docs = [f.file_name for f in files]
@@ -123,8 +128,8 @@ def add_file_to_db(
         existing_file: KnowledgeFileModel = (
             session.query(KnowledgeFileModel)
             .filter(
-                KnowledgeFileModel.kb_name.ilike(kb_file.kb_name),
-                KnowledgeFileModel.file_name.ilike(kb_file.filename),
+                ci_equal(KnowledgeFileModel.kb_name, kb_file.kb_name),
+                ci_equal(KnowledgeFileModel.file_name, kb_file.filename),
             )
             .first()
         )
@@ -163,8 +168,8 @@ def delete_file_from_db(session, kb_file: KnowledgeFile):
     existing_file = (
         session.query(KnowledgeFileModel)
         .filter(
-            KnowledgeFileModel.file_name.ilike(kb_file.filename),
-            KnowledgeFileModel.kb_name.ilike(kb_file.kb_name),
+            ci_equal(KnowledgeFileModel.file_name, kb_file.filename),
+            ci_equal(KnowledgeFileModel.kb_name, kb_file.kb_name),
         )
         .first()
     )
@@ -175,7 +180,7 @@ def delete_file_from_db(session, kb_file: KnowledgeFile):
 
         kb = (
             session.query(KnowledgeBaseModel)
-            .filter(KnowledgeBaseModel.kb_name.ilike(kb_file.kb_name))
+            .filter(ci_equal(KnowledgeBaseModel.kb_name, kb_file.kb_name))
             .first()
         )
         if kb:
@@ -187,14 +192,14 @@ def delete_file_from_db(session, kb_file: KnowledgeFile):
 @with_session
 def delete_files_from_db(session, knowledge_base_name: str):
     session.query(KnowledgeFileModel).filter(
-        KnowledgeFileModel.kb_name.ilike(knowledge_base_name)
+        ci_equal(KnowledgeFileModel.kb_name, knowledge_base_name)
     ).delete(synchronize_session=False)
     session.query(FileDocModel).filter(
-        FileDocModel.kb_name.ilike(knowledge_base_name)
+        ci_equal(FileDocModel.kb_name, knowledge_base_name)
     ).delete(synchronize_session=False)
     kb = (
         session.query(KnowledgeBaseModel)
-        .filter(KnowledgeBaseModel.kb_name.ilike(knowledge_base_name))
+        .filter(ci_equal(KnowledgeBaseModel.kb_name, knowledge_base_name))
         .first()
     )
     if kb:
@@ -209,8 +214,8 @@ def file_exists_in_db(session, kb_file: KnowledgeFile):
     existing_file = (
         session.query(KnowledgeFileModel)
         .filter(
-            KnowledgeFileModel.file_name.ilike(kb_file.filename),
-            KnowledgeFileModel.kb_name.ilike(kb_file.kb_name),
+            ci_equal(KnowledgeFileModel.file_name, kb_file.filename),
+            ci_equal(KnowledgeFileModel.kb_name, kb_file.kb_name),
         )
         .first()
     )
@@ -222,24 +227,42 @@ def get_file_detail(session, kb_name: str, filename: str) -> dict:
     file: KnowledgeFileModel = (
         session.query(KnowledgeFileModel)
         .filter(
-            KnowledgeFileModel.file_name.ilike(filename),
-            KnowledgeFileModel.kb_name.ilike(kb_name),
+            ci_equal(KnowledgeFileModel.file_name, filename),
+            ci_equal(KnowledgeFileModel.kb_name, kb_name),
         )
         .first()
     )
     if file:
-        return {
-            "kb_name": file.kb_name,
-            "file_name": file.file_name,
-            "file_ext": file.file_ext,
-            "file_version": file.file_version,
-            "document_loader": file.document_loader_name,
-            "text_splitter": file.text_splitter_name,
-            "create_time": file.create_time,
-            "file_mtime": file.file_mtime,
-            "file_size": file.file_size,
-            "custom_docs": file.custom_docs,
-            "docs_count": file.docs_count,
-        }
+        return _file_to_dict(file)
     else:
         return {}
+
+
+@with_session
+def list_file_details_from_db(session, kb_name: str) -> List[dict]:
+    """
+    一次查询列出知识库内所有文件的详情，避免逐个文件调用 get_file_detail
+    """
+    files = (
+        session.query(KnowledgeFileModel)
+        .filter(ci_equal(KnowledgeFileModel.kb_name, kb_name))
+        .order_by(KnowledgeFileModel.id)
+        .all()
+    )
+    return [_file_to_dict(f) for f in files]
+
+
+def _file_to_dict(file: KnowledgeFileModel) -> dict:
+    return {
+        "kb_name": file.kb_name,
+        "file_name": file.file_name,
+        "file_ext": file.file_ext,
+        "file_version": file.file_version,
+        "document_loader": file.document_loader_name,
+        "text_splitter": file.text_splitter_name,
+        "create_time": file.create_time,
+        "file_mtime": file.file_mtime,
+        "file_size": file.file_size,
+        "custom_docs": file.custom_docs,
+        "docs_count": file.docs_count,
+    }
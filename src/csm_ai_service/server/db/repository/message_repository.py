@@ -38,7 +38,7 @@ def update_response_message(session, message_id, response: str = None):
     """
     更新已有的聊天记录
     """
-    m = get_message_by_id(message_id)
+    m = session.query(MessageModel).filter_by(id=message_id).first()
     if m is not None:
         if response is not None:
             m.response = response
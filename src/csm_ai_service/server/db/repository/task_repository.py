@@ -1,10 +1,11 @@
 """
 任务仓库 - 任务和任务-规则关联表的数据访问层
 """
-from typing import List, Optional
-from sqlalchemy import desc
+from typing import List, Optional, Tuple
+from sqlalchemy import desc, func
 from csm_ai_service.server.db.models import TaskModel
 from csm_ai_service.server.db.session import with_session
+from csm_ai_service.server.db.utils import encode_cursor, keyset_before
 
 
 # ==================== Task 任务表操作 ====================
@@ -48,7 +49,7 @@ def get_task_by_contract_id(session, contract_id: int) -> Optional[dict]:
     根据合同ID获取最近的任务
     """
     t = session.query(TaskModel).filter_by(contract_id=contract_id) \
-        .order_by(desc(TaskModel.create_time)).first()
+        .order_by(desc(TaskModel.create_time), desc(TaskModel.id)).first()
     if t is None:
         return None
     return _task_to_dict(t)
@@ -59,14 +60,30 @@ def list_tasks(
     session,
     limit: int = 100,
     offset: int = 0,
-) -> List[dict]:
+    cursor: str = None,
+) -> Tuple[List[dict], Optional[str]]:
     """
-    获取任务列表，按时间倒序
+    获取任务列表，按时间倒序，返回 (任务列表, 下一页游标)
+    传入 cursor（上一页返回的游标）时按游标分页并忽略 offset；没有下一页时游标为 None
     """
-    tasks = session.query(TaskModel) \
-        .order_by(desc(TaskModel.create_time)) \
-        .offset(offset).limit(limit).all()
-    return [_task_to_dict(t) for t in tasks]
+    query = session.query(TaskModel).order_by(desc(TaskModel.create_time), desc(TaskModel.id))
+    if cursor:
+        query = query.filter(keyset_before(TaskModel.create_time, TaskModel.id, cursor))
+    else:
+        query = query.offset(offset)
+    tasks = query.limit(limit).all()
+    next_cursor = None
+    if tasks and len(tasks) == limit:
+        next_cursor = encode_cursor(tasks[-1].create_time, tasks[-1].id)
+    return [_task_to_dict(t) for t in tasks], next_cursor
+
+
+@with_session
+def count_tasks(session) -> int:
+    """
+    任务总数
+    """
+    return session.query(func.count(TaskModel.id)).scalar()
 
 
 @with_session
@@ -35,7 +35,7 @@ def update_user_message(session, message_id, response: str = None):
     """
     更新已有的聊天记录
     """
-    m = get_user_message_by_id(message_id)
+    m = session.query(UserMessageModel).filter_by(id=message_id).first()
     if m is not None:
         if response is not None:
             m.response = response
@@ -0,0 +1,48 @@
+"""
+数据库查询辅助函数
+- 大小写不敏感的等值比较（配合 lower(...) 表达式索引，替代无法走索引的 ilike）
+- 基于 (排序列, id) 的游标分页（keyset pagination）
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+_CURSOR_SEP = "|"
+
+
+def ci_equal(column, value: str):
+    """
+    大小写不敏感的等值比较：lower(column) = lower(value)。
+    两侧都交给数据库做 lower，保证与 lower(column) 表达式索引的归一化规则一致。
+    """
+    return func.lower(column) == func.lower(value)
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """将最后一行的 (排序时间, id) 编码为游标字符串"""
+    value = sort_value.isoformat() if sort_value else ""
+    return f"{value}{_CURSOR_SEP}{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """解析游标字符串，格式错误时抛出 ValueError"""
+    value, sep, row_id = cursor.rpartition(_CURSOR_SEP)
+    if not sep:
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return (datetime.fromisoformat(value) if value else None), int(row_id)
+
+
+def keyset_before(sort_column, id_column, cursor: str):
+    """
+    生成 "排在游标之后" 的过滤条件，适用于 ORDER BY sort_column DESC, id DESC。
+    SQLite 降序时 NULL 排在最后，因此排序值为 NULL 的行始终位于非 NULL 行之后。
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return and_(sort_column.is_(None), id_column < row_id)
+    return or_(
+        sort_column < sort_value,
+        and_(sort_column == sort_value, id_column < row_id),
+        sort_column.is_(None),
+    )
@@ -0,0 +1,131 @@
+"""
+HTML 表格流式解析
+
+OCR 输出的表格是 <table> HTML 片段，设备清单类文档一份就有数百个表格。
+这里基于标准库 HTMLParser 边解析边收集 行/单元格/文字，不构建 BeautifulSoup 文档树，
+结果与原 BeautifulSoup("html.parser") 写法一致：
+- 取第一个 <table>，其下全部 <tr>（含嵌套表格）按出现顺序作为行，行下全部 <td>/<th> 作为单元格
+- 单元格文字为其下各段文字 strip 后直接拼接（get_text(strip=True)）
+- 结束标签关闭最近的同名标签，未闭合的标签保持嵌套，找不到同名标签时忽略
+"""
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# 没有结束标签的空元素，不入栈
+_VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+}
+
+
+class HtmlTableCell:
+    __slots__ = ("texts", "attrs")
+
+    def __init__(self, attrs: Dict[str, str]):
+        self.texts: List[str] = []
+        self.attrs = attrs
+
+    @property
+    def text(self) -> str:
+        return "".join(self.texts)
+
+    def get(self, name: str, default=None):
+        return self.attrs.get(name, default)
+
+
+class _TableParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = False
+        self.rows: List[List[HtmlTableCell]] = []
+        self._done = False
+        # 打开的标签栈：(标签名, 行或单元格对象)
+        self._stack: List[tuple] = []
+        self._data: List[str] = []
+
+    def _flush(self):
+        if not self._data:
+            return
+        text = "".join(self._data).strip()
+        self._data = []
+        if text:
+            for _, obj in self._stack:
+                if isinstance(obj, HtmlTableCell):
+                    obj.texts.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        self._flush()
+        obj = None
+        if not self.found:
+            if tag != "table":
+                return
+            self.found = True
+        elif tag == "tr":
+            obj = []
+            self.rows.append(obj)
+        elif tag in ("td", "th"):
+            obj = HtmlTableCell({name: "" if value is None else value for name, value in attrs})
+            for _, row in self._stack:
+                if isinstance(row, list):
+                    row.append(obj)
+        if tag not in _VOID_ELEMENTS:
+            self._stack.append((tag, obj))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if not self._done and tag not in _VOID_ELEMENTS and self._stack and self._stack[-1][0] == tag:
+            self._stack.pop()
+
+    def handle_endtag(self, tag):
+        if self._done or not self.found:
+            return
+        self._flush()
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                break
+        if not self._stack:
+            # 第一个表格已结束，忽略后续内容
+            self._done = True
+
+    def handle_data(self, data):
+        if self.found and not self._done:
+            self._data.append(data)
+
+
+def parse_html_table(html: str) -> Optional[List[List[HtmlTableCell]]]:
+    """解析第一个 <table> 的行与单元格，没有表格时返回 None"""
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+    return parser.rows if parser.found else None
+
+
+def _span(cell: HtmlTableCell, name: str) -> int:
+    return max(int(cell.get(name, 1)), 1)
+
+
+def expand_spans(rows: List[List[HtmlTableCell]]) -> List[List[str]]:
+    """
+    按 rowspan / colspan 展开合并单元格，得到每行的文字列表
+    单元格依次放入占位网格，跳过被上方 rowspan 占用的列；跨行不超出表格最后一行
+    """
+    grid: List[Dict[int, str]] = [{} for _ in rows]
+    for row_idx, cells in enumerate(rows):
+        occupied = grid[row_idx]
+        col_idx = 0
+        for cell in cells:
+            while col_idx in occupied:
+                col_idx += 1
+            text = cell.text
+            colspan, rowspan = _span(cell, "colspan"), _span(cell, "rowspan")
+            for r in range(row_idx, min(row_idx + rowspan, len(rows))):
+                for c in range(col_idx, col_idx + colspan):
+                    grid[r][c] = text
+            col_idx += colspan
+
+    # 中间没有单元格的列补空字符串
+    return [[row.get(c, "") for c in range(max(row) + 1)] if row else [] for row in grid]
@@ -5,8 +5,9 @@ from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Send
 from pydantic import BaseModel
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
+from csm_ai_service.server.protection_audit.audit.chapter_index import ChapterIndex
 from csm_ai_service.server.protection_audit.audit.model import AuditRule, RuleAuditResult
 from csm_ai_service.server.utils import get_ChatOpenAI, fix_llm_json_output
 from csm_ai_service.settings import Settings
@@ -38,23 +39,25 @@ llm = get_ChatOpenAI(
 
 
 # 获取相关文件内容
-def get_related_text(contract_json: dict, chapter_list: List[str]):
+def get_related_text(contract_json: dict, chapter_list: List[str], chapter_index: Optional[ChapterIndex] = None):
+    """chapter_index 为同一合同预先建立的章节索引，未传入时临时建立"""
+    if chapter_index is None:
+        chapter_index = ChapterIndex.from_contract(contract_json)
     res = []
     doc_ids = []
     for chapter in chapter_list:
-        for item_dic in contract_json["structure_json_result"]:
-            item_title = item_dic["title"]
-            if chapter in item_title:
-                res.append(item_dic["text"])
-                doc_ids.append(item_dic["doc_id"])
+        for entry in chapter_index.match(chapter):
+            res.append(entry.text)
+            doc_ids.append(entry.doc_id)
     return "\n---\n".join(res), doc_ids
 
 
 
 # ====================== 内部：单规则真实LLM调用（被限流） ======================
-def llm_audit_single(rule: AuditRule, contract_markdown_json: dict, contract_id: int = 0) -> RuleAuditResult:
+def llm_audit_single(rule: AuditRule, contract_markdown_json: dict, contract_id: int = 0,
+                     chapter_index: Optional[ChapterIndex] = None) -> RuleAuditResult:
     """被信号量限流的真实LLM请求函数，LLM调用失败时返回待人工审核的结果"""
-    related_text, doc_ids = get_related_text(contract_markdown_json, rule.chapter_keywords)
+    related_text, doc_ids = get_related_text(contract_markdown_json, rule.chapter_keywords, chapter_index)
 
     try:
         with llm_semaphore:  # 进入自动占用令牌，超出MAX则阻塞排队
@@ -111,8 +114,11 @@ def llm_audit_single(rule: AuditRule, contract_markdown_json: dict, contract_id:
 # ====================== LangGraph节点 ======================
 def split_audit_tasks(state: AuditState):
     """条件路由函数：返回Send列表做并行fan-out（必须在conditional_edges中使用）"""
+    # 章节索引每份合同只建立一次，全部规则共用
+    chapter_index = ChapterIndex.from_contract(state.contract_markdown_json)
     return [
-        Send("single_rule_audit", {"rule": rule, "contract_markdown_json": state.contract_markdown_json, "contract_id": state.contract_id})
+        Send("single_rule_audit", {"rule": rule, "contract_markdown_json": state.contract_markdown_json,
+                                   "contract_id": state.contract_id, "chapter_index": chapter_index})
         for rule in state.rule_list
     ]
 
@@ -122,8 +128,9 @@ def single_rule_audit(data: dict):
     rule: AuditRule = data["rule"]
     contract_markdown_json = data["contract_markdown_json"]
     contract_id = data.get("contract_id", 0)
+    chapter_index = data.get("chapter_index")
 
-    future = executor.submit(llm_audit_single, rule, contract_markdown_json, contract_id)
+    future = executor.submit(llm_audit_single, rule, contract_markdown_json, contract_id, chapter_index)
     result = future.result()
     return {"single_rule_results": [result]}
 
@@ -0,0 +1,90 @@
+"""
+合同章节标题索引
+
+每条审计规则都要按 chapter_keywords 在 structure_json_result 中查找相关章节，
+原实现对每条规则、每个关键字都把全部章节扫描一遍。ChapterIndex 每份合同只建立一次，供全部规则共用：
+- 规范化(去空白)标题 -> 章节，标题前缀 -> 章节，精确查找与前缀查找都是一次字典查询
+- 标题字 -> 章节 的倒排索引，关键字包含匹配只校验候选章节，结果按关键字缓存
+- 每个章节的标题级别、从顶层标题开始的标题路径，以及正文在各章节顺序拼接文本中的字符区间
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+_SPACE_PATTERN = re.compile(r"\s+")
+_HEADER_PATTERN = re.compile(r"^(#{1,6})\s")
+
+
+def normalize_title(title: str) -> str:
+    """去除全部空白字符"""
+    return _SPACE_PATTERN.sub("", title)
+
+
+@dataclass
+class ChapterEntry:
+    index: int
+    title: str
+    doc_id: str
+    text: str
+    level: int  # markdown 标题级别，没有标题的段落为 0
+    path: Tuple[str, ...]  # 从顶层标题到本章节的标题路径
+    span: Tuple[int, int]  # 正文在各章节顺序拼接文本中的 [start, end) 区间
+
+
+class ChapterIndex:
+    def __init__(self, structure_json_result: List[dict]):
+        self.entries: List[ChapterEntry] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._prefix: Dict[str, List[int]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._match_cache: Dict[str, List[ChapterEntry]] = {}
+
+        ancestors: List[Tuple[int, str]] = []
+        offset = 0
+        for idx, item_dic in enumerate(structure_json_result):
+            title, text = item_dic["title"], item_dic["text"]
+            match = _HEADER_PATTERN.match(text)
+            level = len(match.group(1)) if match else 0
+            if level:
+                while ancestors and ancestors[-1][0] >= level:
+                    ancestors.pop()
+                ancestors.append((level, title))
+            path = tuple(t for _, t in ancestors) + (() if level else (title,))
+            self.entries.append(ChapterEntry(index=idx, title=title, doc_id=item_dic["doc_id"], text=text,
+                                             level=level, path=path, span=(offset, offset + len(text))))
+            offset += len(text)
+
+            normalized = normalize_title(title)
+            self._exact.setdefault(normalized, []).append(idx)
+            for end in range(1, len(normalized) + 1):
+                self._prefix.setdefault(normalized[:end], []).append(idx)
+            for ch in set(title):
+                self._postings.setdefault(ch, set()).add(idx)
+
+    @classmethod
+    def from_contract(cls, contract_json: dict) -> "ChapterIndex":
+        return cls(contract_json.get("structure_json_result", []))
+
+    def exact(self, title: str) -> List[ChapterEntry]:
+        """规范化后标题完全相同的章节"""
+        return [self.entries[i] for i in self._exact.get(normalize_title(title), [])]
+
+    def prefix(self, prefix: str) -> List[ChapterEntry]:
+        """规范化后标题以 prefix 开头的章节"""
+        prefix = normalize_title(prefix)
+        if not prefix:
+            return list(self.entries)
+        return [self.entries[i] for i in self._prefix.get(prefix, [])]
+
+    def match(self, keyword: str) -> List[ChapterEntry]:
+        """标题包含 keyword 的章节（与 keyword in title 一致），按章节顺序返回，结果按关键字缓存"""
+        cached = self._match_cache.get(keyword)
+        if cached is not None:
+            return cached
+        if keyword:
+            candidates = set.intersection(*(self._postings.get(ch, set()) for ch in set(keyword)))
+            result = [self.entries[i] for i in sorted(candidates) if keyword in self.entries[i].title]
+        else:
+            result = list(self.entries)
+        self._match_cache[keyword] = result
+        return result
@@ -0,0 +1,220 @@
+"""
+OCR 服务客户端
+
+所有扫描件识别共用一个客户端：
+1. 连接池：复用 httpx.Client 的长连接，不再每次识别新建连接
+2. 并发上限：同时发往 OCR_SERVICE_URL 的请求不超过 OCR_MAX_CONCURRENCY，多份文档、多个页范围共享
+3. 页范围拆分：OCR_PAGES_PER_REQUEST > 0 时大文档按页范围并发提交，结果按页序合并
+4. 重试：连接失败、超时、5xx 按指数退避重试，只重试失败的页范围
+5. 熔断：连续失败达到阈值后在 OCR_CIRCUIT_RESET_TIMEOUT 秒内直接失败，到期后放行一次试探请求
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+import httpx
+
+from csm_ai_service.server.protection_audit.tools.ocr_tools import SectionLocator, split_markdown
+from csm_ai_service.settings import Settings
+from csm_ai_service.utils import build_logger
+
+logger = build_logger()
+
+PARSE_PATH = "/api/parse/pdf2info"
+
+
+class OcrServiceError(RuntimeError):
+    """OCR 服务不可用或返回错误"""
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= Settings.basic_settings.OCR_CIRCUIT_RESET_TIMEOUT:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            # 半开状态只放行一个试探请求
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= Settings.basic_settings.OCR_CIRCUIT_FAILURE_THRESHOLD:
+                if self.opened_at is None:
+                    logger.warning(f"[OcrClient] OCR 服务连续失败 {self.failures} 次，熔断 "
+                                   f"{Settings.basic_settings.OCR_CIRCUIT_RESET_TIMEOUT} 秒")
+                self.opened_at = time.time()
+
+
+def _page_ranges(total_pages: int, pages_per_request: int) -> List[Tuple[int, int]]:
+    """按页数拆分为 [start, end] 闭区间（从0开始）"""
+    if pages_per_request <= 0 or total_pages <= pages_per_request:
+        return [(0, max(total_pages - 1, 0))]
+    return [(start, min(start + pages_per_request, total_pages) - 1)
+            for start in range(0, total_pages, pages_per_request)]
+
+
+def split_page_ranges(page_indices: List[int], pages_per_request: int) -> List[Tuple[int, int]]:
+    """把页码列表拆分为连续的 [start, end] 闭区间，每个区间不超过 pages_per_request 页"""
+    ranges = []
+    for page in sorted(set(page_indices)):
+        if ranges and ranges[-1][1] == page - 1 and (pages_per_request <= 0 or page - ranges[-1][0] < pages_per_request):
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def merge_ocr_results(results: List[Dict], ranges: List[Tuple[int, int]], processing_time: float = 0.0) -> Dict:
+    """
+    按页序合并多个页范围的识别结果（ranges 按页序排列，也可以混入文本解析得到的页范围结果）
+    markdown 按顺序拼接后重新切分章节，版面块的 doc_id 按合并后的章节重新关联
+    """
+    markdown_text = "\n\n".join(r.get("markdown_text", "") for r in results)
+    structure_json_result = split_markdown(markdown_text)
+    locator = SectionLocator(structure_json_result["structure_json_result"])
+    layout_res_list = []
+    for (start, _), result in zip(ranges, results):
+        pages = (result.get("locate_json_result") or {}).get("layout_res_list", [])
+        # OCR 服务返回的页码可能是页范围内的相对页码
+        offset = start if pages and min(p["meta"]["page_idx"] for p in pages) < start else 0
+        for page in pages:
+            layout_res_list.append({
+                **page,
+                "meta": {**page["meta"], "page_idx": page["meta"]["page_idx"] + offset},
+                "parsing_res_list": [{**block, "doc_id": locator.locate(block["block_content"])}
+                                     for block in page.get("parsing_res_list", [])],
+            })
+    return {
+        "success": True,
+        "processing_time": processing_time,
+        "markdown_text": markdown_text,
+        "locate_json_result": {"layout_res_list": layout_res_list},
+        "structure_json_result": structure_json_result,
+        "error": "",
+    }
+
+
+class OcrClient:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._client_url: Optional[str] = None
+        self._semaphore = threading.BoundedSemaphore(max(1, Settings.basic_settings.OCR_MAX_CONCURRENCY))
+        self.breaker = CircuitBreaker()
+        self.stats = {"request": 0, "retry": 0, "error": 0, "rejected": 0}
+
+    # ==================== 对外接口 ====================
+
+    def parse_pdf(self, file_path: str) -> Dict:
+        """识别整份 PDF，失败时返回 {"success": False, "error": ...}"""
+        start_time = time.time()
+        with fitz.open(file_path) as doc:
+            total_pages = doc.page_count
+        ranges = _page_ranges(total_pages, Settings.basic_settings.OCR_PAGES_PER_REQUEST)
+        try:
+            if len(ranges) == 1:
+                return self._request({"file_path": file_path})
+            logger.info(f"[OcrClient] {file_path} 共 {total_pages} 页，拆分为 {len(ranges)} 个页范围并发识别")
+            results = self.parse_page_ranges(file_path, ranges)
+            return merge_ocr_results(results, ranges, processing_time=time.time() - start_time)
+        except OcrServiceError as e:
+            return {"success": False, "error": str(e)}
+
+    def parse_page_ranges(self, file_path: str, ranges: List[Tuple[int, int]]) -> List[Dict]:
+        """并发识别多个 [start, end] 页范围，结果顺序与 ranges 一致，任一页范围失败时抛出 OcrServiceError"""
+        payloads = [{"file_path": file_path, "start_page_id": start, "end_page_id": end} for start, end in ranges]
+        workers = min(len(ranges), max(1, Settings.basic_settings.OCR_MAX_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="OcrClient") as executor:
+            results = list(executor.map(self._request, payloads))
+        failed = [r for r in results if not r.get("success", False)]
+        if failed:
+            raise OcrServiceError(failed[0].get("error", "OCR服务识别失败"))
+        return results
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    # ==================== 内部实现 ====================
+
+    def _get_client(self) -> httpx.Client:
+        ocr_url = Settings.basic_settings.OCR_SERVICE_URL
+        with self._lock:
+            if self._client is None or self._client_url != ocr_url:
+                if self._client is not None:
+                    self._client.close()
+                limits = httpx.Limits(max_connections=max(1, Settings.basic_settings.OCR_MAX_CONCURRENCY))
+                self._client = httpx.Client(base_url=ocr_url, timeout=Settings.basic_settings.OCR_TIMEOUT,
+                                            limits=limits)
+                self._client_url = ocr_url
+            return self._client
+
+    def _request(self, payload: Dict) -> Dict:
+        """提交一个识别请求，可重试的错误按指数退避重试，熔断时直接抛出 OcrServiceError"""
+        max_retries = Settings.basic_settings.OCR_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            if not self.breaker.allow():
+                self.stats["rejected"] += 1
+                raise OcrServiceError("OCR服务熔断中，暂停调用")
+            try:
+                with self._semaphore:
+                    self.stats["request"] += 1
+                    r = self._get_client().post(PARSE_PATH, json=payload)
+                r.raise_for_status()
+                result = r.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                # 4xx 说明服务可用、请求本身有误，不重试也不计入熔断
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not retryable or attempt == max_retries:
+                    self.stats["error"] += 1
+                    raise OcrServiceError(f"OCR服务调用失败: {e}") from e
+                self.stats["retry"] += 1
+                backoff = Settings.basic_settings.OCR_RETRY_BACKOFF * 2 ** attempt
+                logger.warning(f"[OcrClient] 第 {attempt + 1} 次调用失败: {e}，{backoff:.1f} 秒后重试")
+                time.sleep(backoff)
+                continue
+            except Exception as e:
+                # 返回内容不是 JSON 等其它异常：计入熔断（同时释放半开试探），不重试
+                self.breaker.record_failure()
+                self.stats["error"] += 1
+                raise OcrServiceError(f"OCR服务返回异常: {e}") from e
+            self.breaker.record_success()
+            return result
+
+
+# ==================== 全局实例 ====================
+
+ocr_client = OcrClient()
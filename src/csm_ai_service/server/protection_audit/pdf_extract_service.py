@@ -5,16 +5,23 @@ RapidDoc 服务 - 支持并发限制为 3
 """
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import fitz  # PyMuPDF
-import httpx
 from fastapi import Body
-from csm_ai_service.server.protection_audit.text_pdf_parser import parse_text_pdf
+from csm_ai_service.server.protection_audit.ocr_client import (
+    OcrServiceError,
+    merge_ocr_results,
+    ocr_client,
+    split_page_ranges,
+)
+from csm_ai_service.server.protection_audit.text_pdf_parser import PdfParseResult, generate_markdown, parse_text_pdf
 # 屏蔽 rapid_doc 及其相关库的日志
 logging.getLogger("faiss").setLevel(logging.ERROR)
 
 from csm_ai_service.server.protection_audit.tools.ocr_tools import handle_pdfParseResult
 import os
-from typing import Dict
+from typing import Dict, List, Tuple
 from csm_ai_service.server.utils import build_logger
 from csm_ai_service.settings import Settings
 
@@ -31,14 +38,8 @@ def scanPdf2info(
     - **file**: PDF 文件
     - **return_markdown**: 是否返回 Markdown
     """
-    ocr_url = Settings.basic_settings.OCR_SERVICE_URL
-    with httpx.Client(base_url=ocr_url, timeout=Settings.basic_settings.OCR_TIMEOUT) as c:
-        r = c.post(
-            "/api/parse/pdf2info",
-            json={"file_path": file_path})
-
-    resp = r.json()
-    return resp
+    # 共用连接池，带并发上限、重试与熔断；大文档按页范围并发识别
+    return ocr_client.parse_pdf(file_path)
 
 # 文本类型pdf提取信息
 def textPdf2info(
@@ -84,12 +85,92 @@ def textPdf2info(
         return result
 
 
+# ==================== 文本/扫描页判定 ====================
+
+def is_scanned_page(page: fitz.Page) -> bool:
+    """文字很少且大部分面积被图片覆盖的页判定为扫描页；空白页按文本页处理"""
+    if len(page.get_text("text").strip()) >= Settings.basic_settings.OCR_PAGE_MIN_TEXT_LENGTH:
+        return False
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if page_area <= 0:
+        return False
+    image_area = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if not bbox.is_empty:
+            image_area += bbox.width * bbox.height
+    return image_area / page_area >= Settings.basic_settings.OCR_PAGE_MIN_IMAGE_COVERAGE
+
+
+def _sample_indices(total_pages: int, sample_pages: int) -> List[int]:
+    """在全文范围内均匀抽样页码"""
+    if sample_pages <= 0 or total_pages <= sample_pages:
+        return list(range(total_pages))
+    step = total_pages / sample_pages
+    return sorted({int(i * step + step / 2) for i in range(sample_pages)})
+
+
+def classify_pdf_pages(file_path: str, per_page: bool = True) -> Tuple[str, List[int]]:
+    """
+    抽样判断 PDF 类型，返回 (类型, 扫描页页码列表)
+    - "text": 抽样页全部为文本页
+    - "scan": 抽样页全部为扫描页
+    - "mixed": 抽样页两者都有，此时逐页判定，返回全部扫描页
+    per_page=False（不会按页分流）时，抽样页两者都有也不逐页判定，按抽样页中扫描页的占比整体判为 "scan" 或 "text"
+    """
+    with fitz.open(file_path) as doc:
+        total_pages = doc.page_count
+        sampled = _sample_indices(total_pages, Settings.basic_settings.OCR_SAMPLE_PAGES)
+        scanned = [i for i in sampled if is_scanned_page(doc.load_page(i))]
+        if not scanned:
+            return "text", []
+        if len(scanned) == len(sampled):
+            return "scan", list(range(total_pages))
+        if not per_page:
+            logger.info(f"PDF抽样页扫描页 {len(scanned)}/{len(sampled)}，按占比整体判定: {file_path}")
+            return ("scan", list(range(total_pages))) if len(scanned) * 2 >= len(sampled) else ("text", [])
+        sampled_set = set(sampled)
+        scanned += [i for i in range(total_pages) if i not in sampled_set and is_scanned_page(doc.load_page(i))]
+        return "mixed", sorted(scanned)
+
+
+def _parse_mixed_pdf(file_path: str, scanned_pages: List[int]) -> Dict:
+    """文本页走文本解析、扫描页按页范围提交 OCR 服务，结果按页序合并"""
+    start_time = time.time()
+    with fitz.open(file_path) as doc:
+        total_pages = doc.page_count
+    scanned_set = set(scanned_pages)
+    text_pages = [i for i in range(total_pages) if i not in scanned_set]
+    ocr_ranges = split_page_ranges(scanned_pages, Settings.basic_settings.OCR_PAGES_PER_REQUEST)
+    logger.info(f"混合PDF按页分流: {file_path}, 文本页 {len(text_pages)} 页, 扫描页 {len(scanned_pages)} 页")
+
+    segments = []
+    # 扫描页提交给 OCR 服务后在后台并发识别，同时解析文本页
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="MixedPdfOcr") as executor:
+        ocr_future = executor.submit(ocr_client.parse_page_ranges, file_path, ocr_ranges)
+        parse_result = parse_text_pdf(file_path, page_indices=text_pages)
+        for start, end in split_page_ranges(text_pages, 0):
+            run_pages = [p for p in parse_result.pages if start <= p.page_num <= end]
+            res_dic = handle_pdfParseResult(PdfParseResult(
+                pdf_path=file_path, total_pages=len(run_pages), pages=run_pages,
+                markdown=generate_markdown(run_pages)))
+            segments.append(((start, end), {"markdown_text": res_dic["markdown"],
+                                            "locate_json_result": res_dic["layoutParsingResults"]}))
+        segments.extend(zip(ocr_ranges, ocr_future.result()))
+
+    segments.sort(key=lambda segment: segment[0][0])
+    return merge_ocr_results([result for _, result in segments], [page_range for page_range, _ in segments],
+                             processing_time=time.time() - start_time)
+
+
 
 
 
 def process_file_ocr_by_path(file_path: str) -> Dict:
     """
-    解析 PDF 文件，先尝试文本PDF解析，若文字不足且开启了OCR则进一步调用OCR服务。
+    解析 PDF 文件：先抽样判断文本PDF/扫描件，扫描件直接调用OCR服务，
+    混合文档在 OCR 服务支持页范围时按页分流；文本解析结果文字不足且开启了OCR时仍会调用OCR服务。
     用于 task_queue 异步任务流程
 
     Args:
@@ -110,7 +191,27 @@ def process_file_ocr_by_path(file_path: str) -> Dict:
         return {'error': f"不支持该文件格式: {file_path}"}
 
     try:
-        # 第一步：始终先执行文本PDF解析
+        ocr_enabled = Settings.basic_settings.OCR_ENABLED
+        if ocr_enabled:
+            # 第一步：抽样判断，扫描件不再先做一遍无效的文本解析
+            # OCR 服务不按页范围识别时混合文档不会按页分流，只按抽样页占比整体选择，不再逐页判定
+            pdf_type, scanned_pages = classify_pdf_pages(
+                file_path, per_page=Settings.basic_settings.OCR_PAGES_PER_REQUEST > 0)
+            logger.info(f"PDF抽样判定: {file_path}, 类型: {pdf_type}, 扫描页数: {len(scanned_pages)}")
+            if pdf_type == "mixed":
+                try:
+                    return _parse_mixed_pdf(file_path, scanned_pages)
+                except OcrServiceError as e:
+                    logger.warning(f"混合PDF扫描页OCR识别失败: {e}，回退使用文本解析结果")
+                    return textPdf2info(file_path)
+            if pdf_type == "scan":
+                ocr_result = scanPdf2info(file_path)
+                if ocr_result.get("success", False):
+                    return ocr_result
+                logger.warning(f"OCR服务解析失败: {ocr_result.get('error', '未知错误')}，回退使用文本解析结果")
+                return textPdf2info(file_path)
+
+        # 第二步：执行文本PDF解析
         logger.info(f"开始文本PDF解析: {file_path}")
         text_result = textPdf2info(file_path)
 
@@ -122,12 +223,11 @@ def process_file_ocr_by_path(file_path: str) -> Dict:
         text_length = len(markdown_text.strip())
 
         # 获取配置
-        ocr_enabled = Settings.basic_settings.OCR_ENABLED
         min_text_length = Settings.basic_settings.OCR_MIN_TEXT_LENGTH
 
         logger.info(f"文本PDF解析完成, 文字数量: {text_length}, OCR开关: {ocr_enabled}, 最小文字阈值: {min_text_length}")
 
-        # 第二步：若文字不足且OCR已启用，则调用OCR服务
+        # 第三步：若文字不足且OCR已启用，则调用OCR服务
         if text_length < min_text_length and ocr_enabled:
             logger.info(f"文字数量({text_length})低于阈值({min_text_length})，开始调用OCR服务: {file_path}")
             ocr_result = scanPdf2info(file_path)
@@ -12,8 +12,8 @@ import threading
 import traceback
 from datetime import datetime
 
-from csm_ai_service.server.db.repository.audit_result_repository import batch_add_audit_results, update_audit_result, \
-    get_audit_result_by_result_id
+from csm_ai_service.server.db.repository.audit_result_repository import batch_add_audit_results, \
+    bulk_update_audit_results
 from csm_ai_service.server.db.repository.task_repository import (
     get_task_by_id,
     update_task
@@ -188,12 +188,14 @@ class TaskWorker:
 
         # 不用走审计流程了，因为ocr没识别出来
         if len(ocr_result.get("markdown_text", "")) <= Settings.basic_settings.OCR_MIN_TEXT_LENGTH:
-            for rid in result_ids:
-                update_audit_result(
-                    rid,
-                    conclusion="无法识别上传的合同文件，无法进行审计",
-                    reasoning="由于客观因素，暂不支持识别扫描件",
-                )
+            bulk_update_audit_results([
+                {
+                    "id": rid,
+                    "conclusion": "无法识别上传的合同文件，无法进行审计",
+                    "reasoning": "由于客观因素，暂不支持识别扫描件",
+                }
+                for rid in result_ids
+            ])
         else:
             audit_rules = [
                 AuditRule(id=r["id"], name=r["name"],
@@ -220,35 +222,38 @@ class TaskWorker:
 
             # 用 rule_id 匹配，而非索引顺序，确保并行审计结果与DB记录严格一致
             result_by_rule_id = {r.rule_id: r for r in single_results}
+            updates = []
             for rule_id, rid in rule_id_to_result_id.items():
                 r = result_by_rule_id.get(rule_id)
                 if r is not None:
-                    update_audit_result(
-                        rid,
-                        rule_name=r.rule_name,
-                        rule_description=getattr(r, 'rule_description', ""),
-                        rule_judge_logic=getattr(r, 'rule_judge_logic', ""),
-                        is_compliant=r.is_compliant,
-                        conclusion=getattr(r, 'conclusion', ""),
-                        reasoning=getattr(r, 'reasoning', ""),
-                        origin_text=getattr(r, 'origin_text', ""),
-                        related_chapters=getattr(r, 'related_chapters', []),
-                        related_text=getattr(r, 'related_text', ""),
-                        related_doc_ids=getattr(r, 'related_doc_ids', []),
-                    )
+                    updates.append({
+                        "id": rid,
+                        "rule_name": r.rule_name,
+                        "rule_description": getattr(r, 'rule_description', ""),
+                        "rule_judge_logic": getattr(r, 'rule_judge_logic', ""),
+                        "is_compliant": r.is_compliant,
+                        "conclusion": getattr(r, 'conclusion', ""),
+                        "reasoning": getattr(r, 'reasoning', ""),
+                        "origin_text": getattr(r, 'origin_text', ""),
+                        "related_chapters": getattr(r, 'related_chapters', []),
+                        "related_text": getattr(r, 'related_text', ""),
+                        "related_doc_ids": getattr(r, 'related_doc_ids', []),
+                    })
                 else:
                     # graph调用失败或某规则结果缺失，标记为待人工审核
                     rule = next((ru for ru in rules if ru["id"] == rule_id), {})
-                    update_audit_result(
-                        rid,
-                        rule_name=rule.get("name", ""),
-                        rule_description=rule.get("description", ""),
-                        rule_judge_logic=rule.get("judge_logic", ""),
-                        is_compliant=False,
-                        conclusion="大模型调用失败，请人工审核",
-                        reasoning=f"审计任务异常: {type(graph_exc).__name__}: {graph_exc}" if graph_exc else "审计结果缺失，请人工审核",
-                        related_chapters=rule.get("chapter_keywords", []),
-                    )
+                    updates.append({
+                        "id": rid,
+                        "rule_name": rule.get("name", ""),
+                        "rule_description": rule.get("description", ""),
+                        "rule_judge_logic": rule.get("judge_logic", ""),
+                        "is_compliant": False,
+                        "conclusion": "大模型调用失败，请人工审核",
+                        "reasoning": f"审计任务异常: {type(graph_exc).__name__}: {graph_exc}" if graph_exc else "审计结果缺失，请人工审核",
+                        "related_chapters": rule.get("chapter_keywords", []),
+                    })
+            # 所有规则结果一次写入，避免每条规则单独开事务、单独 fsync
+            bulk_update_audit_results(updates)
 
             t1 = datetime.now()
             update_task(
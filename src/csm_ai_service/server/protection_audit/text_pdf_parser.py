@@ -261,9 +261,10 @@ def _is_footer(text: str, bbox, page_h) -> bool:
 def extract_blocks_with_coords(
     pdf_path: str,
     toc_indices: Optional[List[int]] = None,
+    page_indices: Optional[List[int]] = None,
 ) -> List[PageInfo]:
     """
-    提取 PDF 各页文本块 + 表格块
+    提取 PDF 各页文本块 + 表格块（page_indices 指定时只提取这些页，从0开始）
 
     - 倾斜水印丢弃
     - 页面外文字丢弃
@@ -273,17 +274,18 @@ def extract_blocks_with_coords(
     """
     doc = fitz.open(pdf_path)
     toc_set = set(toc_indices or [])
+    page_range = range(doc.page_count) if page_indices is None else sorted(set(page_indices))
 
     # 预提取每页表格
     table_map: Dict[int, List[TableBlock]] = {}
-    for pi in range(doc.page_count):
+    for pi in page_range:
         p = doc.load_page(pi)
         pd = p.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)
         pw, ph = p.rect.width, p.rect.height
         table_map[pi] = _extract_tables(p, pi, pd, pw, ph)
 
     pages: List[PageInfo] = []
-    for pi in range(doc.page_count):
+    for pi in page_range:
         p = doc.load_page(pi)
         pd = p.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)
         pw, ph = p.rect.width, p.rect.height
@@ -369,10 +371,10 @@ def generate_markdown(pages: List[PageInfo]) -> str:
 
 # ──────────────────────────────── 主入口 ────────────────────────────────
 
-def parse_text_pdf(pdf_path: str) -> PdfParseResult:
-    """解析文本类型 PDF：目录 → 提取 → 标题识别 → Markdown"""
+def parse_text_pdf(pdf_path: str, page_indices: Optional[List[int]] = None) -> PdfParseResult:
+    """解析文本类型 PDF：目录 → 提取 → 标题识别 → Markdown（page_indices 指定时只解析这些页）"""
     toc_indices = detect_and_parse_toc(pdf_path)
-    pages = extract_blocks_with_coords(pdf_path, toc_indices=toc_indices)
+    pages = extract_blocks_with_coords(pdf_path, toc_indices=toc_indices, page_indices=page_indices)
     return PdfParseResult(
         pdf_path=pdf_path,
         total_pages=len(pages),
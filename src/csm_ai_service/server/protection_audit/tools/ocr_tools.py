@@ -1,6 +1,7 @@
+from bisect import bisect_right
 from typing import Dict, List, Optional, Any
-from bs4 import BeautifulSoup
 import re
+from csm_ai_service.server.html_table import expand_spans, parse_html_table
 from csm_ai_service.server.utils import build_logger
 from csm_ai_service.server.protection_audit.text_pdf_parser import PdfParseResult
 
@@ -8,57 +9,56 @@ logger = build_logger()
 
 
 
-def get_doc_id(text, res_list):
-    for res in res_list:
-        if text in res["text"]:
-            return res["doc_id"]
-    return ""
+class SectionLocator:
+    """
+    按字符偏移把版面块定位到 split_markdown 切分出的章节
+    各章节文本用空字符拼接成一个字符串并记录起始偏移，版面块按阅读顺序依次定位：
+    从上一个块的结束位置向后查找，因此同一段文字出现在多个章节时按出现顺序对应；
+    向后找不到（版面顺序与 markdown 顺序不一致）时退回全文第一次出现的位置（即第一个包含它的章节）。
+    """
+
+    def __init__(self, res_list: List[Dict[str, Any]]):
+        self.doc_ids = [res["doc_id"] for res in res_list]
+        self.starts = []
+        offset = 0
+        for res in res_list:
+            self.starts.append(offset)
+            offset += len(res["text"]) + 1
+        self.content = "\0".join(res["text"] for res in res_list)
+        self.cursor = 0
+        self._first_pos: Dict[str, int] = {}
+
+    def _doc_id_at(self, pos: int) -> str:
+        if not self.doc_ids:
+            return ""
+        return self.doc_ids[max(bisect_right(self.starts, pos) - 1, 0)]
+
+    def locate(self, text: str) -> str:
+        """返回 text 所在章节的 doc_id，找不到返回空字符串；空文本归入当前章节"""
+        if not text:
+            return self._doc_id_at(self.cursor)
+        first_pos = self._first_pos.get(text)
+        if first_pos is None:
+            first_pos = self._first_pos[text] = self.content.find(text)
+        if first_pos < 0:
+            return ""
+        pos = first_pos if first_pos >= self.cursor else self.content.find(text, self.cursor)
+        if pos < 0:
+            return self._doc_id_at(first_pos)
+        self.cursor = pos + len(text)
+        return self._doc_id_at(pos)
 
 def html_table_to_markdown(html_table):
     """
     把 RapidDoc 输出的 <table> 表格 转成 标准 Markdown 表格
     支持 rowspan / colspan 合并单元格
     """
-    soup = BeautifulSoup(html_table, "html.parser")
-    table = soup.find("table")
-    if not table:
-        return ""
-
-    rows = table.find_all("tr")
-    if len(rows) < 1:
+    rows = parse_html_table(html_table)
+    if not rows:
         return ""
 
-    # 处理跨行跨列核心逻辑
-    row_span_map = []
-    table_data = []
-
-    for tr in rows:
-        cells = tr.find_all(["td", "th"])
-        current_row = []
-        col_idx = 0
-
-        # 填充跨行遗留单元格
-        while col_idx < len(row_span_map) and row_span_map[col_idx] > 0:
-            current_row.append(table_data[-1][col_idx])
-            row_span_map[col_idx] -= 1
-            col_idx += 1
-
-        for cell in cells:
-            text = cell.get_text(strip=True)
-            colspan = int(cell.get("colspan", 1))
-            rowspan = int(cell.get("rowspan", 1))
-
-            # 处理跨列
-            for _ in range(colspan):
-                current_row.append(text)
-                # 处理跨行
-                if rowspan > 1:
-                    while len(row_span_map) <= col_idx:
-                        row_span_map.append(0)
-                    row_span_map[col_idx] = rowspan - 1
-                col_idx += 1
-
-        table_data.append(current_row)
+    # 处理跨行跨列
+    table_data = expand_spans(rows)
 
     # 生成标准 Markdown 表格
     md = []
@@ -117,11 +117,12 @@ def handle_pdfParseResult(result: PdfParseResult) -> Dict[str, Any]:
     total_markdown = result.markdown # 表格已经清理过了
     structure_json_result = split_markdown(total_markdown)
     # 先markdown 结构化信息
+    locator = SectionLocator(structure_json_result["structure_json_result"])
     layout_res_list = []
     for page in result.pages:
         parsing_res_list = []
         for block in page.blocks:
-            doc_id = get_doc_id(block.text, structure_json_result["structure_json_result"])
+            doc_id = locator.locate(block.text)
             parsing_res_list.append({
                 "block_id": block.block_id,
                 "block_content": block.text,
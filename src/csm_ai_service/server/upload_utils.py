@@ -0,0 +1,110 @@
+"""
+上传文件流式落盘
+
+上传文件由 multipart 解析器暂存在 SpooledTemporaryFile 中（超过 1MB 即转存磁盘），
+这里按块读取写入目标文件，同时增量计算 SHA-256 并检查大小上限：
+- 不再把整个文件 read() 到内存
+- 先写同目录下的临时文件，完成后原子替换，失败或超限时删除临时文件，不会留下半个文件
+- 内容哈希用于按内容去重
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+
+from csm_ai_service.settings import Settings
+
+
+class UploadTooLargeError(ValueError):
+    """上传文件超过大小上限"""
+
+    def __init__(self, filename: str, max_size: int):
+        self.filename = filename
+        self.max_size = max_size
+        super().__init__(f"文件 {filename} 超过大小上限 {max_size // (1024 * 1024)}MB")
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+def _max_upload_size(max_size: Optional[int]) -> int:
+    return Settings.basic_settings.UPLOAD_MAX_SIZE if max_size is None else max_size
+
+
+def check_upload_size(file: UploadFile, max_size: Optional[int] = None):
+    """根据解析器记录的文件大小提前拒绝超限文件，0 表示不限制"""
+    max_size = _max_upload_size(max_size)
+    if max_size and file.size is not None and file.size > max_size:
+        raise UploadTooLargeError(file.filename, max_size)
+
+
+def save_upload_file(file: UploadFile, dst_path: str, max_size: Optional[int] = None) -> SavedUpload:
+    """
+    将上传文件分块写入 dst_path，返回 (路径, 大小, SHA-256)
+    超过 max_size（默认 UPLOAD_MAX_SIZE）时抛出 UploadTooLargeError
+    """
+    max_size = _max_upload_size(max_size)
+    check_upload_size(file, max_size)
+    chunk_size = Settings.basic_settings.UPLOAD_CHUNK_SIZE
+    os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+    part_path = f"{dst_path}.{uuid.uuid4().hex}.part"
+    sha256 = hashlib.sha256()
+    size = 0
+    file.file.seek(0)
+    try:
+        with open(part_path, "wb") as f:
+            while chunk := file.file.read(chunk_size):
+                size += len(chunk)
+                if max_size and size > max_size:
+                    raise UploadTooLargeError(file.filename, max_size)
+                sha256.update(chunk)
+                f.write(chunk)
+        os.replace(part_path, dst_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    finally:
+        file.file.seek(0)
+    return SavedUpload(path=dst_path, size=size, sha256=sha256.hexdigest())
+
+
+def stream_sha256(stream: BinaryIO) -> str:
+    """分块计算文件对象的 SHA-256"""
+    chunk_size = Settings.basic_settings.UPLOAD_CHUNK_SIZE
+    sha256 = hashlib.sha256()
+    while chunk := stream.read(chunk_size):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return stream_sha256(f)
+
+
+def is_same_content(file: UploadFile, path: str) -> bool:
+    """上传文件与本地文件内容是否相同：大小不同直接返回，相同再比较哈希"""
+    if file.size is not None and file.size != os.path.getsize(path):
+        return False
+    file.file.seek(0)
+    try:
+        return stream_sha256(file.file) == file_sha256(path)
+    finally:
+        file.file.seek(0)
+
+
+def link_or_copy(src_path: str, dst_path: str):
+    """同一文件系统内用硬链接代替复制，不支持时退回 copy2"""
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        shutil.copy2(src_path, dst_path)
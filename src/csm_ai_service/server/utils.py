@@ -10,6 +10,8 @@ from pathlib import Path
 from urllib.parse import urlparse
 from typing import (
     Any,
+    AsyncIterable,
+    AsyncIterator,
     Awaitable,
     Callable,
     Dict,
@@ -45,6 +47,57 @@ async def wrap_done(fn: Awaitable, event: asyncio.Event):
         event.set()
 
 
+def coalesce_tokens(tokens: AsyncIterable[str], interval: float) -> AsyncIterable[str]:
+    """
+    将 LLM 的逐 token 输出按固定时间间隔合并成一帧，减少 SSE 帧数和序列化次数。
+    interval <= 0 时原样返回，不做合并。
+    """
+    if interval <= 0:
+        return tokens
+    return _coalesce_tokens(tokens, interval)
+
+
+async def _coalesce_tokens(tokens: AsyncIterable[str], interval: float) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    iterator = tokens.__aiter__()
+    buffer: List[str] = []
+    deadline = None
+    pending = None
+    try:
+        while True:
+            if pending is None and not buffer:
+                # 缓冲为空时无需超时控制，直接等待下一个 token
+                try:
+                    token = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                buffer.append(token)
+                deadline = loop.time() + interval
+                continue
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(deadline - loop.time(), 0) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if done:
+                try:
+                    token = pending.result()
+                except StopAsyncIteration:
+                    pending = None
+                    break
+                pending = None
+                if not buffer:
+                    deadline = loop.time() + interval
+                buffer.append(token)
+            if buffer and loop.time() >= deadline:
+                yield "".join(buffer)
+                buffer = []
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
 def get_base_url(url):
     parsed_url = urlparse(url)  # 解析url
     base_url = '{uri.scheme}://{uri.netloc}/'.format(uri=parsed_url)  # 格式化基础url
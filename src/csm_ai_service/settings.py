@@ -108,6 +108,36 @@ class BasicSettings(BaseFileSettings):
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///" + str(CHATCHAT_ROOT / "data/knowledge_base/info.db")
     """知识库信息数据库连接URI"""
 
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    """SQLite 遇到写锁时的最长等待时间（毫秒），超过后才抛出 database is locked"""
+
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    """SQLite 内存映射读取的大小（字节），0 表示关闭"""
+
+    SQLITE_CACHE_SIZE: int = 64 * 1024
+    """SQLite 每个连接的页缓存大小（KiB）"""
+
+    SQLITE_POOL_SIZE: int = 8
+    """数据库连接池常驻连接数。任务线程、审计线程和 API 请求共享同一个池"""
+
+    SQLITE_SLOW_LOCK_MS: int = 200
+    """写语句执行超过该耗时（毫秒）即视为发生了锁等待，计入锁竞争统计"""
+
+    MESSAGE_WRITE_BATCH_SIZE: int = 200
+    """聊天记录异步写入时单次提交的最大操作数"""
+
+    MESSAGE_WRITE_FLUSH_INTERVAL: float = 0.05
+    """聊天记录异步写入的攒批等待时间（秒），越大批量越大、落库延迟越高"""
+
+    SSE_COALESCE_INTERVAL: float = 0.0
+    """流式对话合并 token 的时间间隔（秒），大于 0 时按该间隔把多个 token 合成一帧发送，0 表示逐 token 发送"""
+
+    UPLOAD_MAX_SIZE: int = 500 * 1024 * 1024
+    """单个上传文件的大小上限（字节），超过后立即停止写入并返回错误，0 表示不限制"""
+
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    """上传文件分块写入磁盘的块大小（字节）"""
+
     OPEN_CROSS_DOMAIN: bool = True
     """API 是否开启跨域"""
 
@@ -134,6 +164,33 @@ class BasicSettings(BaseFileSettings):
     OCR_TIMEOUT: int = 300
     """OCR服务超时时间"""
 
+    OCR_MAX_CONCURRENCY: int = 3
+    """同时发往 OCR 服务的最大请求数，所有文档、所有页范围共享"""
+
+    OCR_PAGES_PER_REQUEST: int = 0
+    """大于0时，扫描件按该页数拆分为多个页范围并发提交 OCR 服务后按页序合并，文本页与扫描页混合的文档也按页分流（需 OCR 服务支持 start_page_id/end_page_id 参数），0 表示整份文档一次提交"""
+
+    OCR_SAMPLE_PAGES: int = 5
+    """判断文本PDF/扫描件时均匀抽样检查的页数"""
+
+    OCR_PAGE_MIN_TEXT_LENGTH: int = 20
+    """单页文字数少于该值、且图片覆盖率不低于 OCR_PAGE_MIN_IMAGE_COVERAGE 时判定为扫描页"""
+
+    OCR_PAGE_MIN_IMAGE_COVERAGE: float = 0.5
+    """判定扫描页的最小图片覆盖率（图片面积占页面面积的比例）"""
+
+    OCR_MAX_RETRIES: int = 2
+    """OCR 请求遇到连接失败、超时或 5xx 时的最大重试次数"""
+
+    OCR_RETRY_BACKOFF: float = 1.0
+    """OCR 请求重试的初始等待时间（秒），之后每次翻倍"""
+
+    OCR_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    """OCR 服务连续失败达到该次数后熔断，熔断期间直接回退文本解析结果"""
+
+    OCR_CIRCUIT_RESET_TIMEOUT: float = 60
+    """OCR 服务熔断持续时间（秒），到期后放行一次试探请求"""
+
     DEFAULT_BIND_HOST: str = "0.0.0.0" if sys.platform != "win32" else "127.0.0.1"
     """
     各服务器默认绑定host。如改为"0.0.0.0"需要修改下方所有XX_SERVER的host
@@ -174,6 +231,24 @@ class KBSettings(BaseFileSettings):
     WARNING_KNOWLEDGE: str = "warning"
     """默认的告警知识库"""
 
+    WARNING_CACHE_MAX_ENTRIES: int = 256
+    """告警报告提取/研判结果缓存的最大条数（每类缓存分别计算）"""
+
+    WARNING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    """告警报告提取/研判结果缓存的最大字节数（每类缓存分别计算）"""
+
+    WARNING_CACHE_TTL: int = 3600
+    """告警报告提取/研判结果缓存的有效期（秒）"""
+
+    WARNING_ANALYZE_WORKERS: int = 2
+    """异步研判任务的工作线程数"""
+
+    WARNING_JOB_TTL: int = 3600
+    """异步研判任务结束后在内存中保留的时间（秒）"""
+
+    WARNING_JOB_POLL_INTERVAL: float = 0.5
+    """流式获取研判进度时检查新事件的间隔（秒）"""
+
     DEFAULT_VS_TYPE: str = "faiss"
     """默认使用faiss向量数据库"""
 
@@ -226,6 +301,18 @@ class KBSettings(BaseFileSettings):
     TEXT_SPLITTER_NAME: str = "ChineseRecursiveTextSplitter"
     """TEXT_SPLITTER 名称"""
 
+    SEMANTIC_CACHE_ENABLED: bool = True
+    """是否开启知识库问答语义缓存（相似问题直接返回历史答案和检索结果）"""
+
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    """语义缓存命中所需的问题向量余弦相似度下限"""
+
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 500
+    """每个知识库最多缓存的问答条数，超出后淘汰最早的条目"""
+
+    SEMANTIC_CACHE_TTL: int = 24 * 3600
+    """语义缓存条目有效期（秒），小于等于 0 表示不过期"""
+
 
 class PlatformConfig(MyBaseModel):
     """模型加载平台配置"""
@@ -359,6 +446,9 @@ class AlertToolConfig(MyBaseModel):
     timeout: int = 30
     """请求超时时间（秒）"""
 
+    cache_ttl: int = 60
+    """相同参数的成功响应缓存时间（秒），0 表示不缓存"""
+
 
 class AgentToolsSettings(BaseFileSettings):
     """Agent 工具配置 - 支持通过 HTTP 调用外部服务"""
@@ -414,6 +504,55 @@ class AgentToolsSettings(BaseFileSettings):
     ]
     """告警工具列表，配置各个工具的调用信息"""
 
+    INTENT_ROUTER_ENABLED: bool = True
+    """是否在 LLM 意图识别之前启用关键词/正则/向量快速路由，置信度不足时才调用 LLM"""
+
+    INTENT_KEYWORDS: t.Dict[str, t.Dict[str, int]] = {
+        "alert": {"告警": 2, "报警": 2, "alarm": 2, "alert": 2, "越限": 2, "遥信": 1, "电厂": 1, "地调": 1, "调度": 1, "故障": 1},
+        "rag": {"规定": 2, "规范": 2, "安全防护": 2, "条款": 2, "标准": 2, "制度": 2, "号令": 2, "电力监控": 1,
+                "电网": 1, "电力设备": 1, "电力知识": 1},
+    }
+    """意图关键词及权重，某一意图得分领先其它意图至少 INTENT_KEYWORD_MARGIN 即直接路由"""
+
+    INTENT_KEYWORD_MARGIN: int = 2
+    """关键词路由所需的最小领先分数"""
+
+    INTENT_PATTERNS: t.Dict[str, t.List[str]] = {
+        "alert": [r"(多少|几条|几次|统计|趋势|分布|排名|排行|情况).{0,8}(告警|报警)",
+                  r"(告警|报警).{0,8}(多少|几条|几次|统计|趋势|分布|排名|排行|情况|总览)"],
+        "llm": [r"^\s*(你好|您好|hi|hello|hey|谢谢|多谢|再见|你是谁|你能做什么)[\s!！。.?？]*$"],
+    }
+    """意图正则，命中即直接路由（优先于关键词）"""
+
+    INTENT_EXAMPLES: t.Dict[str, t.List[str]] = {
+        "alert": ["最近7天告警情况如何", "上个月各地调告警数量排行", "本周告警趋势", "昨天有哪些故障告警", "今年告警类型分布"],
+        "rag": ["电力监控系统安全防护的总体原则是什么", "生产控制大区如何划分", "横向隔离装置的要求有哪些",
+                "电力调度数据网的安全要求", "等级保护测评的要求"],
+        "llm": ["你好", "讲个笑话", "今天天气怎么样", "帮我写一段自我介绍", "1加1等于几"],
+    }
+    """各意图的示例问题，用于向量最近质心分类"""
+
+    INTENT_EMBEDDING_THRESHOLD: float = 0.75
+    """向量路由所需的最低余弦相似度，设为大于 1 的值可关闭向量路由"""
+
+    INTENT_EMBEDDING_MARGIN: float = 0.05
+    """向量路由所需的相似度领先幅度"""
+
+    INTENT_ROUTE_CACHE_SIZE: int = 2048
+    """意图路由结果缓存条数"""
+
+    ALERT_API_MAX_CONNECTIONS: int = 20
+    """告警平台接口连接池最大连接数"""
+
+    ALERT_API_MAX_KEEPALIVE: int = 10
+    """告警平台接口连接池最大空闲长连接数"""
+
+    ALERT_API_CACHE_MAX_ENTRIES: int = 512
+    """告警平台接口响应缓存最大条数"""
+
+    ALERT_TOOL_MAX_PARALLEL: int = 4
+    """告警智能体每轮最多并行调用的工具数"""
+
 
 class PromptSettings(BaseFileSettings):
     """Prompt 模板.使用 jinja2 格式"""
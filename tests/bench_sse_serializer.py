@@ -0,0 +1,96 @@
+"""
+流式输出序列化微基准：对比逐 token 构造 OpenAIChatOutput + model_dump_json 与 OpenAIChatStream 的单核吞吐
+
+运行：python tests/bench_sse_serializer.py [token 数]
+"""
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
+from csm_ai_service.server.utils import coalesce_tokens
+
+MODEL = "qwen2.5-instruct"
+TOKENS = ["电力", "告警", "分析", "：", "最近", "7", "天", "共", "\"12\"", "条", "\n", "warning", " level"]
+
+
+def make_tokens(n: int):
+    return [TOKENS[i % len(TOKENS)] for i in range(n)]
+
+
+def bench_pydantic(tokens):
+    for token in tokens:
+        OpenAIChatOutput(
+            id=f"chat{uuid.uuid4()}",
+            object="chat.completion.chunk",
+            content=token,
+            role="assistant",
+            model=MODEL,
+        ).model_dump_json()
+
+
+def bench_stream(tokens):
+    stream_output = OpenAIChatStream(model=MODEL)
+    for token in tokens:
+        stream_output.chunk(token)
+
+
+async def _bench_coalesced(tokens, interval):
+    async def produce():
+        for i, token in enumerate(tokens):
+            if i % 50 == 0:
+                # 模拟 LLM 流的到达间隔，让合并窗口有机会到期
+                await asyncio.sleep(0)
+            yield token
+
+    stream_output = OpenAIChatStream(model=MODEL)
+    frames = 0
+    async for text in coalesce_tokens(produce(), interval):
+        stream_output.chunk(text)
+        frames += 1
+    return frames
+
+
+def check_compatible():
+    """快速序列化器输出与原有 model_dump_json 的 JSON 结构一致（id/created 除外）"""
+    stream_output = OpenAIChatStream(model=MODEL)
+    for token in TOKENS:
+        fast = json.loads(stream_output.chunk(token))
+        slow = json.loads(OpenAIChatOutput(
+            id=stream_output.id,
+            object="chat.completion.chunk",
+            content=token,
+            role="assistant",
+            model=MODEL,
+        ).model_dump_json())
+        fast.pop("created")
+        slow.pop("created")
+        assert fast == slow, (fast, slow)
+
+
+def run(name, fn, tokens):
+    start = time.process_time()
+    fn(tokens)
+    elapsed = time.process_time() - start
+    print(f"{name:<28} {len(tokens) / elapsed:>14,.0f} tokens/s/core")
+    return elapsed
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tokens = make_tokens(n)
+    check_compatible()
+
+    before = run("OpenAIChatOutput (before)", bench_pydantic, tokens)
+    after = run("OpenAIChatStream (after)", bench_stream, tokens)
+    print(f"speedup: {before / after:.1f}x")
+
+    # 合并的收益是 SSE 帧数（每帧还要经过 sse_starlette 编码和 ASGI send），这里同时给出帧数
+    for interval in (0, 0.05):
+        start = time.process_time()
+        frames = asyncio.run(_bench_coalesced(tokens, interval))
+        elapsed = time.process_time() - start
+        name = f"async stream, coalesce={interval}s"
+        print(f"{name:<28} {n / elapsed:>14,.0f} tokens/s/core ({frames} frames)")
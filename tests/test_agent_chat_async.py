@@ -0,0 +1,81 @@
+"""智能体异步执行测试：告警工具调用期间事件循环不被阻塞（假 LLM + 本地慢速 HTTP 服务）"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from csm_ai_service.server.conversation.chat_agent import agent_chat as agent_chat_module
+from csm_ai_service.server.conversation.chat_agent import alert_agent as alert_agent_module
+from csm_ai_service.settings import AlertToolConfig, Settings
+
+TOOL_DELAY = 0.5
+
+
+class SlowAlertHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(TOOL_DELAY)
+        body = json.dumps({"total": 42}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def alert_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowAlertHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/alert/count"
+    server.shutdown()
+
+
+def test_alert_route_does_not_block_event_loop(monkeypatch, alert_server):
+    # 配置缓存只保留一份，交替访问不同配置类会重新加载配置文件，测试期间关闭自动加载以保留 monkeypatch
+    monkeypatch.setattr(Settings.agent_tools_settings, "auto_reload", False)
+    monkeypatch.setattr(Settings.model_settings, "auto_reload", False)
+    tool = AlertToolConfig(name="alert_count", description="告警总数", url=alert_server, method="GET")
+    monkeypatch.setattr(Settings.agent_tools_settings, "ALERT_TOOLS", [tool])
+    monkeypatch.setattr(Settings.agent_tools_settings, "INTENT_ROUTER_ENABLED", True)
+    monkeypatch.setattr(alert_agent_module, "_alert_agents", {})
+    monkeypatch.setattr(alert_agent_module, "get_ChatOpenAI", lambda *args, **kwargs: FakeListChatModel(
+        responses=['{"tool_name": "alert_count", "parameters": {}, "need_more": false}',
+                   '{"tool_name": null, "parameters": {}, "need_more": false}']))
+    monkeypatch.setattr(agent_chat_module, "get_ChatOpenAI",
+                        lambda *args, **kwargs: FakeListChatModel(responses=["最近7天共42条告警"]))
+    monkeypatch.setattr(agent_chat_module, "enqueue_message", lambda *args, **kwargs: "msg")
+    monkeypatch.setattr(agent_chat_module, "enqueue_response_update", lambda *args, **kwargs: None)
+    monkeypatch.setattr(agent_chat_module, "filter_message", lambda *args, **kwargs: [])
+
+    async def main():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            ret = await agent_chat_module.agent_chat(query="最近7天告警情况如何", stream=False,
+                                                     conversation_id="test")
+        finally:
+            done.set()
+            await ticker_task
+        return json.loads(ret), ticks
+
+    result, ticks = asyncio.run(main())
+
+    assert result["choices"][0]["message"]["content"] == "最近7天共42条告警"
+    # 工具接口耗时 TOOL_DELAY 秒，期间事件循环应持续调度其他协程
+    assert ticks >= TOOL_DELAY / 0.01 / 2
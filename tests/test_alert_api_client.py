@@ -0,0 +1,112 @@
+"""告警平台接口客户端测试：本地慢速 HTTP 服务，验证请求合并、响应缓存和并行调用"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from csm_ai_service.server.conversation.chat_agent.alert_api_client import AlertApiClient
+from csm_ai_service.settings import AlertToolConfig
+
+DELAY = 0.3
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        SlowHandler.requests.append((url.path, parse_qs(url.query)))
+        time.sleep(DELAY)
+        body = json.dumps({"path": url.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    SlowHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def make_tool(base_url, name, cache_ttl=60):
+    return AlertToolConfig(name=name, url=f"{base_url}/{name}", method="GET", cache_ttl=cache_ttl)
+
+
+def test_identical_calls_are_coalesced_and_cached(base_url):
+    client = AlertApiClient()
+    tool = make_tool(base_url, "overview")
+
+    async def main():
+        first = await asyncio.gather(
+            client.call(tool, {"start_date": "2026-10-01", "end_date": "2026-10-19"}),
+            client.call(tool, {"end_date": "2026-10-19", "start_date": " 2026-10-01 ", "level": None}),
+        )
+        second = await client.call(tool, {"start_date": "2026-10-01", "end_date": "2026-10-19"})
+        await client.aclose()
+        return first, second
+
+    (a, b), c = asyncio.run(main())
+
+    assert a == b == c
+    assert a["status"] == "success" and a["data"] == {"path": "/overview"}
+    assert len(SlowHandler.requests) == 1
+    assert client.stats["coalesced"] == 1 and client.stats["cache"] == 1
+
+
+def test_cache_disabled_and_different_params(base_url):
+    client = AlertApiClient()
+    tool = make_tool(base_url, "trend", cache_ttl=0)
+
+    async def main():
+        await client.call(tool, {"start_date": "2026-10-01"})
+        await client.call(tool, {"start_date": "2026-10-01"})
+        await client.call(tool, {"start_date": "2026-09-01"})
+        await client.aclose()
+
+    asyncio.run(main())
+    assert len(SlowHandler.requests) == 3
+
+
+def test_call_many_runs_in_parallel(base_url):
+    client = AlertApiClient()
+    tools = [make_tool(base_url, name) for name in ("overview", "trend", "type_dist")]
+
+    async def main():
+        start = time.perf_counter()
+        results = await client.call_many([(tool, {}) for tool in tools])
+        await client.aclose()
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+
+    assert [r["data"]["path"] for r in results] == ["/overview", "/trend", "/type_dist"]
+    assert elapsed < DELAY * 2
+
+
+def test_connection_error_is_not_cached():
+    client = AlertApiClient()
+    tool = AlertToolConfig(name="down", url="http://127.0.0.1:9/down", method="GET", timeout=1)
+
+    async def main():
+        first = await client.call(tool, {})
+        second = await client.call(tool, {})
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["status"] == second["status"] == "error"
+    assert client.stats["request"] == 2
@@ -0,0 +1,106 @@
+"""审计章节索引测试：章节查找结果必须与逐章节子串匹配一致，且每份合同只建立一次索引"""
+import random
+
+from csm_ai_service.server.protection_audit.audit import audit_graph
+from csm_ai_service.server.protection_audit.audit.chapter_index import ChapterIndex
+from csm_ai_service.server.protection_audit.audit.model import AuditRule
+from csm_ai_service.server.protection_audit.tools.ocr_tools import split_markdown
+
+CONTRACT_MARKDOWN = """合同编号：HT-2026-001
+
+# 第一章 总则
+本合同适用于等级保护测评服务。
+
+## 1.1 服务范围
+覆盖 3 个系统。
+
+## 1.2 服务期限
+一年。
+
+# 第二章 付款方式
+## 2.1 付款 比例
+预付 30%。
+
+### 2.1.1 付款条件
+验收合格后支付尾款。
+
+# 第三章 违约责任
+逾期按日万分之五支付违约金。
+"""
+
+
+def reference_related_text(contract_json, chapter_list):
+    """原逐章节子串匹配的实现"""
+    res, doc_ids = [], []
+    for chapter in chapter_list:
+        for item_dic in contract_json["structure_json_result"]:
+            if chapter in item_dic["title"]:
+                res.append(item_dic["text"])
+                doc_ids.append(item_dic["doc_id"])
+    return "\n---\n".join(res), doc_ids
+
+
+def test_index_paths_spans_and_lookups():
+    contract_json = split_markdown(CONTRACT_MARKDOWN)
+    index = ChapterIndex.from_contract(contract_json)
+    entries = index.entries
+    assert [e.level for e in entries] == [0, 1, 2, 2, 1, 2, 3, 1]
+    assert entries[0].path == ("合同编号：HT-2026-001",)
+    assert entries[6].path == ("第二章 付款方式", "2.1 付款 比例", "2.1.1 付款条件")
+    assert entries[7].path == ("第三章 违约责任",)
+    assert all(e.span[1] - e.span[0] == len(e.text) for e in entries)
+    assert all(a.span[1] == b.span[0] for a, b in zip(entries, entries[1:]))
+
+    assert [e.doc_id for e in index.exact("2.1付款比例")] == ["doc_5"]
+    assert index.exact("付款") == []
+    assert [e.doc_id for e in index.prefix("第二章")] == ["doc_4"]
+    assert [e.doc_id for e in index.prefix("2.1")] == ["doc_5", "doc_6"]
+    assert len(index.prefix("")) == len(entries)
+
+    assert [e.doc_id for e in index.match("付款")] == ["doc_4", "doc_5", "doc_6"]
+    assert index.match("付款") is index.match("付款")
+    assert index.match("付款比例") == [] and index.match("不存在") == []
+
+
+def test_related_text_matches_reference():
+    rng = random.Random(20261019)
+    contract_json = split_markdown(CONTRACT_MARKDOWN)
+    titles = [item["title"] for item in contract_json["structure_json_result"]]
+    index = ChapterIndex.from_contract(contract_json)
+    for _ in range(300):
+        chapter_list = []
+        for _ in range(rng.randint(0, 4)):
+            title = rng.choice(titles)
+            start = rng.randrange(len(title))
+            chapter_list.append(rng.choice([title[start:start + rng.randint(0, 6)], "付款", "章", "不存在", ""]))
+        expected = reference_related_text(contract_json, chapter_list)
+        assert audit_graph.get_related_text(contract_json, chapter_list) == expected
+        assert audit_graph.get_related_text(contract_json, chapter_list, index) == expected
+
+
+def test_graph_builds_index_once_per_contract(monkeypatch):
+    built = []
+
+    class CountingIndex(ChapterIndex):
+        def __init__(self, structure_json_result):
+            built.append(1)
+            super().__init__(structure_json_result)
+
+    class FailingLLM:
+        def invoke(self, prompt):
+            raise RuntimeError("LLM 不可用")
+
+    monkeypatch.setattr(audit_graph, "ChapterIndex", CountingIndex)
+    monkeypatch.setattr(audit_graph, "llm", FailingLLM())
+    contract_json = split_markdown(CONTRACT_MARKDOWN)
+    rules = [AuditRule(id=i, name=f"规则{i}", description="", chapter_keywords=keywords, judge_logic="")
+             for i, keywords in enumerate([["付款"], ["违约"], ["服务", "总则"], ["付款", "期限"]])]
+
+    state = audit_graph.GLOBAL_AUDIT_GRAPH.invoke({
+        "contract_id": 1, "contract_markdown_json": contract_json, "rule_list": rules, "final_report": "",
+    })
+    assert len(built) == 1
+    results = {r.rule_id: r for r in state["single_rule_results"]}
+    for rule in rules:
+        related_text, doc_ids = reference_related_text(contract_json, rule.chapter_keywords)
+        assert results[rule.id].related_text == related_text and results[rule.id].related_doc_ids == doc_ids
@@ -0,0 +1,40 @@
+"""意图快速路由测试：使用假的 embedding，不依赖模型服务"""
+import numpy as np
+
+from csm_ai_service.server.conversation.chat_agent.intent_router import IntentRouter
+from csm_ai_service.settings import Settings
+
+
+def fake_embed(texts):
+    """按意图示例中的特征词生成向量，模拟语义相近的问题向量相近"""
+    features = ["告警", "规定", "你好", "划分", "笑话"]
+    return [[float(f in text) for f in features] + [0.1] for text in texts]
+
+
+def test_pattern_and_keyword_routes():
+    router = IntentRouter(embed_func=fake_embed)
+    assert router.route("最近7天告警情况如何") == "alert"
+    assert router.route("上周地调故障") == "alert"
+    assert router.route("电力监控系统安全防护规定第几条") == "rag"
+    assert router.route("你好") == "llm"
+    assert router.stats["pattern"] == 2 and router.stats["keyword"] == 2
+
+
+def test_ambiguous_query_escalates_and_is_cached():
+    router = IntentRouter(embed_func=lambda texts: np.ones((len(texts), 4)).tolist())
+    # 告警与规定同时出现，关键词打分不分胜负；向量与各质心相同，不满足领先幅度
+    assert router.route("电力调度告警规定") is None
+    router.remember("电力调度告警规定", "rag")
+    assert router.route("  电力调度告警规定 ") == "rag"
+    assert router.stats["llm"] == 1 and router.stats["cache"] == 1
+
+
+def test_embedding_nearest_centroid(monkeypatch):
+    monkeypatch.setattr(Settings.agent_tools_settings, "INTENT_EXAMPLES", {
+        "rag": ["生产控制大区如何划分", "安全区如何划分"],
+        "llm": ["讲个笑话", "再讲个笑话"],
+    })
+    router = IntentRouter(embed_func=fake_embed)
+    assert router.route("管理信息大区怎么划分") == "rag"
+    assert router.route("来个笑话") == "llm"
+    assert router.stats["embedding"] == 2
@@ -0,0 +1,137 @@
+"""聊天记录异步写入测试：同批新增与更新的合并、已有记录的批量 UPDATE，以及批量失败后的逐条重试"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from csm_ai_service.server.db import message_writer as writer_module
+from csm_ai_service.server.db.message_writer import MessageWriter
+from csm_ai_service.server.db.models.message_model import MessageModel
+from csm_ai_service.server.db.models.user_message_model import UserMessageModel
+from csm_ai_service.settings import Settings
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """内存 SQLite 替换全局会话，记录会话次数与执行的写语句"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    MessageModel.__table__.create(engine)
+    UserMessageModel.__table__.create(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    stats = {"sessions": 0, "statements": []}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(" ", 1)[0].upper()
+        if verb in ("INSERT", "UPDATE"):
+            stats["statements"].append((verb, len(parameters) if executemany else 1))
+
+    @contextmanager
+    def session_scope():
+        stats["sessions"] += 1
+        session = Session()
+        try:
+            yield session
+            session.commit()
+        except:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    monkeypatch.setattr(writer_module, "session_scope", session_scope)
+    stats["session"] = Session
+    yield stats
+    engine.dispose()
+
+
+def responses(db, model=MessageModel):
+    session = db["session"]()
+    try:
+        return {m.id: m.response for m in session.query(model).all()}
+    finally:
+        session.close()
+
+
+def add_op(message_id, response="", model=MessageModel):
+    fields = {"query": f"问题{message_id}", "response": response}
+    if model is MessageModel:
+        fields.update(conversation_id="c1", meta_data={})
+    return ("add", model, message_id, fields)
+
+
+def update_op(message_id, response, model=MessageModel):
+    return ("update", model, message_id, {"response": response})
+
+
+def test_updates_merge_into_pending_adds(db):
+    writer = MessageWriter()
+    writer._write_batch([add_op("old1"), add_op("old2"), add_op("old3")])
+    db["statements"].clear()
+    db["sessions"] = 0
+
+    writer._write_batch([
+        add_op("new"),
+        update_op("new", "片段1"),
+        update_op("new", "片段1片段2"),
+        update_op("old1", "旧1-a"),
+        update_op("old1", "旧1-b"),
+        update_op("old2", "旧2"),
+        add_op("u1", model=UserMessageModel),
+        update_op("u1", "用户回答", model=UserMessageModel),
+    ])
+
+    assert db["sessions"] == 1
+    assert responses(db) == {"new": "片段1片段2", "old1": "旧1-b", "old2": "旧2", "old3": ""}
+    assert responses(db, UserMessageModel) == {"u1": "用户回答"}
+    # 新增记录的更新合并进 INSERT；已有记录每条只保留最后一次更新，同列的 UPDATE 一次 executemany
+    updates = [n for verb, n in db["statements"] if verb == "UPDATE"]
+    assert updates == [2]
+    assert sum(n for verb, n in db["statements"] if verb == "INSERT") == 2
+
+
+def test_failed_batch_falls_back_to_row_by_row(db):
+    writer = MessageWriter()
+    writer._write_batch([add_op("dup", "原回答")])
+    db["sessions"] = 0
+
+    batch = [
+        add_op("a", "回答a"),
+        add_op("dup", "重复主键"),
+        update_op("dup", "更新dup"),
+        add_op("b"),
+    ]
+    writer._write_batch(batch)
+
+    # 整批回滚后逐条重试：只有主键冲突的那条失败，其余照常落库
+    assert db["sessions"] == 1 + len(batch)
+    assert responses(db) == {"a": "回答a", "dup": "更新dup", "b": ""}
+
+
+def test_worker_batches_and_flush_waits(db, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "auto_reload", False)
+    monkeypatch.setattr(Settings.basic_settings, "MESSAGE_WRITE_BATCH_SIZE", 1000)
+    monkeypatch.setattr(Settings.basic_settings, "MESSAGE_WRITE_FLUSH_INTERVAL", 0.2)
+
+    writer = MessageWriter()
+    monkeypatch.setattr(writer_module, "message_writer", writer)
+    try:
+        message_id = writer_module.enqueue_message("c1", "问题")
+        for i in range(1, 51):
+            writer_module.enqueue_response_update(message_id, "字" * i)
+        writer_module.enqueue_response_update(message_id, None)
+        user_message_id = writer_module.enqueue_user_message("llm_chat", "问题", user_id="u")
+        writer_module.enqueue_user_response_update(user_message_id, "回答")
+
+        assert writer_module.flush_message_writes(timeout=5)
+        assert writer.queue_size() == 0
+        assert responses(db) == {message_id: "字" * 50}
+        assert responses(db, UserMessageModel) == {user_message_id: "回答"}
+        # 攒批间隔内提交的操作在一个事务中写入
+        assert db["sessions"] == 1
+        assert [verb for verb, _ in db["statements"]] == ["INSERT", "INSERT"]
+    finally:
+        writer.stop()
+    assert not writer._running
@@ -0,0 +1,278 @@
+"""OCR 客户端测试：本地假 OCR 服务验证页范围并发、按页序合并、重试与熔断"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+import pytest
+
+from csm_ai_service.server.protection_audit import pdf_extract_service
+from csm_ai_service.server.protection_audit.ocr_client import OcrClient
+from csm_ai_service.settings import Settings
+
+TOTAL_PAGES = 10
+DELAY = 0.2
+
+
+class FakeOcrServer(ThreadingHTTPServer):
+    """按页范围返回识别结果，页码为页范围内的相对页码"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOcrHandler)
+        self.lock = threading.Lock()
+        self.payloads = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_times = {}  # start_page_id -> 剩余失败次数
+        self.always_fail = False
+        self.bad_json = False  # 返回 200 但内容不是 JSON
+
+
+class FakeOcrHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server: FakeOcrServer = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.payloads.append(payload)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        time.sleep(DELAY)
+        start = payload.get("start_page_id", 0)
+        end = payload.get("end_page_id", TOTAL_PAGES - 1)
+        with server.lock:
+            server.active -= 1
+            fail = server.always_fail or server.fail_times.get(start, 0) > 0
+            if fail and not server.always_fail:
+                server.fail_times[start] -= 1
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if server.bad_json:
+            body = b"<html>gateway error</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        pages = list(range(start, end + 1))
+        body = json.dumps({
+            "success": True,
+            "processing_time": DELAY,
+            "markdown_text": "\n\n".join(f"## 第{i}章\n第{i}页内容" for i in pages),
+            "locate_json_result": {"layout_res_list": [
+                {"meta": {"page_idx": i - start, "page_width": 595, "page_height": 842},
+                 "parsing_res_list": [{"block_id": 0, "block_content": f"第{i}页内容", "block_type": "text",
+                                       "block_bbox": [0, 0, 10, 10], "doc_id": "doc_0"}]}
+                for i in pages]},
+            "structure_json_result": {"structure_json_result": []},
+            "error": "",
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeOcrServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(Settings.basic_settings, "auto_reload", False)
+    for name, value in {"OCR_SERVICE_URL": f"http://127.0.0.1:{server.server_port}", "OCR_MAX_CONCURRENCY": 3,
+                        "OCR_PAGES_PER_REQUEST": 2, "OCR_MAX_RETRIES": 2, "OCR_RETRY_BACKOFF": 0.01,
+                        "OCR_CIRCUIT_FAILURE_THRESHOLD": 3, "OCR_CIRCUIT_RESET_TIMEOUT": 0.5}.items():
+        monkeypatch.setattr(Settings.basic_settings, name, value)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for _ in range(TOTAL_PAGES):
+        doc.new_page()
+    path = tmp_path / "scan.pdf"
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_page_ranges_are_parsed_concurrently_and_merged_in_order(server, pdf_path):
+    client = OcrClient()
+    start = time.perf_counter()
+    result = client.parse_pdf(pdf_path)
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    assert result["success"]
+    # 5 个页范围，最多 3 个并发：两轮
+    assert server.max_active == 3
+    assert elapsed < DELAY * 3
+    assert sorted((p["start_page_id"], p["end_page_id"]) for p in server.payloads) == \
+           [(0, 1), (2, 3), (4, 5), (6, 7), (8, 9)]
+
+    pages = result["locate_json_result"]["layout_res_list"]
+    assert [p["meta"]["page_idx"] for p in pages] == list(range(TOTAL_PAGES))
+    sections = result["structure_json_result"]["structure_json_result"]
+    assert [s["title"] for s in sections] == [f"第{i}章" for i in range(TOTAL_PAGES)]
+    doc_ids = {s["doc_id"]: s["text"] for s in sections}
+    for i, page in enumerate(pages):
+        assert f"第{i}页内容" in doc_ids[page["parsing_res_list"][0]["doc_id"]]
+
+
+def test_only_failed_range_is_retried(server, pdf_path):
+    server.fail_times[4] = 1
+    client = OcrClient()
+    result = client.parse_pdf(pdf_path)
+
+    assert result["success"]
+    starts = [p["start_page_id"] for p in server.payloads]
+    assert starts.count(4) == 2 and all(starts.count(s) == 1 for s in (0, 2, 6, 8))
+    assert client.stats["retry"] == 1
+
+
+def test_circuit_breaker(server, pdf_path, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "OCR_PAGES_PER_REQUEST", 0)
+    server.always_fail = True
+    client = OcrClient()
+
+    # 3 次尝试均失败后熔断
+    assert not client.parse_pdf(pdf_path)["success"]
+    assert len(server.payloads) == 3 and client.breaker.state == "open"
+    # 熔断期间直接失败，不再请求 OCR 服务
+    result = client.parse_pdf(pdf_path)
+    assert "熔断" in result["error"] and len(server.payloads) == 3
+
+    # 到期后放行试探请求，成功则恢复
+    time.sleep(0.5)
+    server.always_fail = False
+    assert client.parse_pdf(pdf_path)["success"]
+    assert client.breaker.state == "closed"
+    assert "start_page_id" not in server.payloads[-1]
+
+
+def test_non_json_reply_fails_and_releases_half_open_probe(server, pdf_path, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "OCR_PAGES_PER_REQUEST", 0)
+    server.bad_json = True
+    client = OcrClient()
+
+    result = client.parse_pdf(pdf_path)
+    assert not result["success"] and "异常" in result["error"]
+    # 不重试，计入熔断
+    assert len(server.payloads) == 1 and client.breaker.failures == 1
+
+    client.parse_pdf(pdf_path)
+    client.parse_pdf(pdf_path)
+    assert client.breaker.state == "open"
+    # 半开试探仍返回非 JSON：重新熔断，而不是一直卡在试探中
+    time.sleep(0.5)
+    assert not client.parse_pdf(pdf_path)["success"]
+    assert client.breaker.state == "open" and not client.breaker._probing
+    time.sleep(0.5)
+    server.bad_json = False
+    assert client.parse_pdf(pdf_path)["success"]
+    assert client.breaker.state == "closed"
+
+
+def test_scan_failure_falls_back_to_text_result(server, pdf_path, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "OCR_ENABLED", True)
+    monkeypatch.setattr(pdf_extract_service, "ocr_client", OcrClient())
+    server.always_fail = True
+
+    result = pdf_extract_service.process_file_ocr_by_path(pdf_path)
+    assert result["success"] and result["markdown_text"] == ""
+
+
+def make_pdf(path, scanned_pages):
+    """scanned_pages 中的页整页贴图，其余页为文字页"""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 60, 80), False)
+    pix.clear_with(200)
+    doc = fitz.open()
+    for i in range(TOTAL_PAGES):
+        page = doc.new_page()
+        if i in scanned_pages:
+            page.insert_image(page.rect, pixmap=pix)
+        else:
+            page.insert_text((72, 72), f"Text page {i} content line", fontsize=12)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def count_text_parse(monkeypatch):
+    calls = []
+    parse_text_pdf = pdf_extract_service.parse_text_pdf
+
+    def counting(pdf_path, page_indices=None):
+        calls.append(page_indices)
+        return parse_text_pdf(pdf_path, page_indices=page_indices)
+
+    monkeypatch.setattr(Settings.basic_settings, "OCR_ENABLED", True)
+    monkeypatch.setattr(Settings.basic_settings, "OCR_MIN_TEXT_LENGTH", 10)
+    monkeypatch.setattr(pdf_extract_service, "parse_text_pdf", counting)
+    monkeypatch.setattr(pdf_extract_service, "ocr_client", OcrClient())
+    return calls
+
+
+def test_classify_pdf_pages(tmp_path):
+    assert pdf_extract_service.classify_pdf_pages(make_pdf(tmp_path / "t.pdf", set())) == ("text", [])
+    assert pdf_extract_service.classify_pdf_pages(make_pdf(tmp_path / "s.pdf", set(range(TOTAL_PAGES)))) == \
+           ("scan", list(range(TOTAL_PAGES)))
+    assert pdf_extract_service.classify_pdf_pages(make_pdf(tmp_path / "m.pdf", {1, 2, 7})) == ("mixed", [1, 2, 7])
+
+
+def test_mixed_pdf_without_page_ranges_uses_sample_majority(server, tmp_path, count_text_parse, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "OCR_PAGES_PER_REQUEST", 0)
+    checked = []
+    is_scanned_page = pdf_extract_service.is_scanned_page
+    monkeypatch.setattr(pdf_extract_service, "is_scanned_page",
+                        lambda page: checked.append(page.number) or is_scanned_page(page))
+
+    # 抽样页为 1、3、5、7、9，其中 1、3、7 为扫描页：只判定抽样页，多数为扫描页则整体走 OCR
+    path = make_pdf(tmp_path / "m.pdf", {1, 2, 3, 7})
+    result = pdf_extract_service.process_file_ocr_by_path(path)
+    assert sorted(checked) == [1, 3, 5, 7, 9]
+    assert result["success"] and count_text_parse == []
+    assert len(server.payloads) == 1 and "start_page_id" not in server.payloads[0]
+
+    checked.clear()
+    assert pdf_extract_service.classify_pdf_pages(make_pdf(tmp_path / "t.pdf", {2, 7}), per_page=False) == ("text", [])
+    assert sorted(checked) == [1, 3, 5, 7, 9]
+
+
+def test_scanned_pdf_skips_text_parse(server, tmp_path, count_text_parse):
+    result = pdf_extract_service.process_file_ocr_by_path(make_pdf(tmp_path / "s.pdf", set(range(TOTAL_PAGES))))
+    assert result["success"] and count_text_parse == []
+    assert len(result["locate_json_result"]["layout_res_list"]) == TOTAL_PAGES
+
+    assert len(server.payloads) == 5
+
+    # 文本PDF只做文本解析，不调用 OCR 服务
+    result = pdf_extract_service.process_file_ocr_by_path(make_pdf(tmp_path / "t.pdf", set()))
+    assert result["success"] and count_text_parse == [None] and len(server.payloads) == 5
+
+
+def test_mixed_pdf_is_routed_per_page(server, tmp_path, count_text_parse):
+    scanned = {1, 2, 3, 7}
+    result = pdf_extract_service.process_file_ocr_by_path(make_pdf(tmp_path / "m.pdf", scanned))
+
+    assert result["success"]
+    assert count_text_parse == [[0, 4, 5, 6, 8, 9]]
+    assert sorted((p["start_page_id"], p["end_page_id"]) for p in server.payloads) == [(1, 2), (3, 3), (7, 7)]
+    pages = result["locate_json_result"]["layout_res_list"]
+    assert [p["meta"]["page_idx"] for p in pages] == list(range(TOTAL_PAGES))
+    for i, page in enumerate(pages):
+        content = page["parsing_res_list"][0]["block_content"]
+        assert content == (f"第{i}页内容" if i in scanned else f"Text page {i} content line")
+    markdown = result["markdown_text"]
+    positions = [markdown.index(f"第{i}页内容" if i in scanned else f"Text page {i} ") for i in range(TOTAL_PAGES)]
+    assert positions == sorted(positions)
@@ -0,0 +1,148 @@
+"""OCR 后处理测试：版面块按字符偏移定位章节、HTML 表格转换"""
+import random
+
+import pytest
+
+from csm_ai_service.server.csm_analyze.warning_analysis.extract_info.helper import html_table_to_info, html_to_table
+from csm_ai_service.server.protection_audit.tools.ocr_tools import (
+    SectionLocator,
+    clean_html_tables_in_text,
+    html_table_to_markdown,
+    split_markdown,
+)
+
+
+def reference_doc_id(text, res_list):
+    """原逐章节子串查找的实现"""
+    for res in res_list:
+        if text in res["text"]:
+            return res["doc_id"]
+    return ""
+
+
+def test_repeated_text_is_assigned_in_reading_order():
+    sections = split_markdown("# 1 物理安全\n检查结果\n符合\n\n# 2 网络安全\n检查结果\n部分符合\n\n# 3 主机安全\n检查结果\n")
+    sections = sections["structure_json_result"]
+    locator = SectionLocator(sections)
+    blocks = ["1 物理安全", "检查结果", "符合", "2 网络安全", "检查结果", "部分符合", "3 主机安全", "检查结果"]
+    assert [locator.locate(b) for b in blocks] == ["doc_0"] * 3 + ["doc_1"] * 3 + ["doc_2"] * 2
+    # 原实现把重复文字都归到第一个章节
+    assert [reference_doc_id(b, sections) for b in blocks][4] == "doc_0"
+
+
+def test_out_of_order_and_missing_blocks():
+    locator = SectionLocator(split_markdown("# A\naaa\n\n# B\nbbb\n")["structure_json_result"])
+    assert locator.locate("bbb") == "doc_1"
+    # 页眉等出现在前面章节的文字退回第一次出现的位置
+    assert locator.locate("aaa") == "doc_0"
+    assert locator.locate("不存在") == ""
+    # 不能跨章节匹配
+    assert locator.locate("aaa\n\n# B") == ""
+    assert SectionLocator([]).locate("aaa") == ""
+
+
+def test_unique_blocks_match_reference():
+    rng = random.Random(20261019)
+    words = [f"词{i:03d}" for i in range(500)]
+    rng.shuffle(words)
+    lines, blocks = [], []
+    for i in range(0, 500, 5):
+        if i % 25 == 0:
+            lines.append(f"## 第{i}节")
+            blocks.append(f"第{i}节")
+        lines.append("".join(words[i:i + 5]))
+        blocks.extend(words[i:i + 5])
+    sections = split_markdown("\n".join(lines))["structure_json_result"]
+    # 阅读顺序中夹杂一些乱序块
+    for _ in range(50):
+        i, j = rng.randrange(len(blocks)), rng.randrange(len(blocks))
+        blocks[i], blocks[j] = blocks[j], blocks[i]
+    locator = SectionLocator(sections)
+    assert [locator.locate(b) for b in blocks] == [reference_doc_id(b, sections) for b in blocks]
+
+
+MERGED_TABLE = """<html><body><table border="1">
+<tr><th rowspan="2">序号</th><th colspan="2">设备</th><th>备注</th></tr>
+<tr><td>名称</td><td>型号</td><td rowspan="3">安全 &amp; 合规</td></tr>
+<tr><td>1</td><td>核心<br/>交换机</td><td> S5700 </td></tr>
+<tr><td>2</td><td colspan="2"><b>防火墙</b> USG</td></tr>
+</table></body></html>"""
+
+
+def test_merged_cell_table_golden():
+    assert html_table_to_markdown(MERGED_TABLE) == "\n".join([
+        "| 序号 | 设备 | 设备 | 备注 |",
+        "|---|---|---|---|",
+        "| 序号 | 名称 | 型号 | 安全 & 合规 |",
+        "| 1 | 核心交换机 | S5700 | 安全 & 合规 |",
+        "| 2 | 防火墙USG | 防火墙USG | 安全 & 合规 |",
+    ])
+    assert html_to_table(MERGED_TABLE) == [
+        ["序号", "设备", "备注"], ["名称", "型号", "安全 & 合规"], ["1", "核心交换机", "S5700"], ["2", "防火墙USG"],
+    ]
+    assert html_table_to_info(MERGED_TABLE) == {"序号": "序号", "设备": "型号", "备注": "安全&合规"}
+
+
+def test_rowspan_in_middle_column():
+    html = "<table><tr><td>A</td><td rowspan=2>B</td><td>C</td></tr><tr><td>D</td><td>E</td></tr></table>"
+    assert html_table_to_markdown(html) == "| A | B | C |\n|---|---|---|\n| D | B | E |"
+    # 跨行跨列同时存在，跨行不超出最后一行
+    html = ("<table><tr><td colspan=2 rowspan=2>X</td><td>1</td></tr><tr><td>2</td></tr>"
+            "<tr><td>a</td><td>b</td><td rowspan=5>c</td></tr></table>")
+    assert html_table_to_markdown(html).split("\n")[2:] == ["| X | X | 2 |", "| a | b | c |"]
+    assert html_table_to_info(html) == {"X": "X", "1": "2"}
+
+
+def test_tables_without_rows():
+    assert html_table_to_markdown("<p>无表格</p>") == ""
+    assert html_table_to_markdown("<table></table>") == ""
+    assert html_to_table("<p>无表格</p>") == [] and html_to_table("<table></table>") == []
+    assert html_table_to_info("<table></table>") == {}
+    text = "前文<table><tr><td>a</td><td>b</td></tr></table>后文<table><tr><td>c</td></tr></table>"
+    assert clean_html_tables_in_text(text) == "前文| a | b |\n|---|---|后文| c |\n|---|"
+
+
+def bs4_rows(html):
+    """原 BeautifulSoup 实现：[[(文字, colspan, rowspan), ...], ...]"""
+    from bs4 import BeautifulSoup
+    table = BeautifulSoup(html, "html.parser").find("table")
+    if not table:
+        return None
+    return [[(cell.get_text(strip=True), cell.get("colspan", 1), cell.get("rowspan", 1))
+             for cell in tr.find_all(["td", "th"])] for tr in table.find_all("tr")]
+
+
+def random_table(rng):
+    words = ["主机", "交换机", " ", "a&amp;b", "&lt;x&gt;", "\n", "192.168.1.1", "符合", "<br>", "<b>加粗</b>", "<!-- 注释 -->"]
+    rows = []
+    for _ in range(rng.randint(0, 6)):
+        cells = []
+        for _ in range(rng.randint(0, 5)):
+            tag = rng.choice(["td", "th"])
+            attrs = ""
+            if rng.random() < 0.3:
+                attrs += f' colspan="{rng.randint(1, 3)}"'
+            if rng.random() < 0.3:
+                attrs += f" rowspan={rng.randint(1, 3)}"
+            text = "".join(rng.choice(words) for _ in range(rng.randint(0, 3)))
+            # 偶尔缺少结束标签，与原解析器一样保持嵌套
+            cells.append(f"<{tag}{attrs}>{text}" + ("" if rng.random() < 0.1 else f"</{tag}>"))
+        if rng.random() < 0.1:
+            cells.append("<td><table><tr><td>内层</td></tr></table></td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    prefix = rng.choice(["", "<p>标题</p>", "</td>", "<div>"])
+    suffix = rng.choice(["", "<table><tr><td>第二个表格</td></tr></table>", "</tr>尾部"])
+    return f"{prefix}<table>{'<tbody>' if rng.random() < 0.5 else ''}{''.join(rows)}</table>{suffix}"
+
+
+def test_random_tables_match_bs4():
+    pytest.importorskip("bs4")
+    from csm_ai_service.server.html_table import parse_html_table
+    rng = random.Random(20261019)
+    for _ in range(500):
+        html = random_table(rng)
+        rows = parse_html_table(html)
+        expected = bs4_rows(html)
+        actual = None if rows is None else [[(c.text, c.get("colspan", 1), c.get("rowspan", 1)) for c in cells]
+                                            for cells in rows]
+        assert actual == expected, html
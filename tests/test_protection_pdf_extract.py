@@ -0,0 +1,227 @@
+"""等保测评报告 pdf 解析测试：用 fitz 生成带目录、跨页表格、测评结论的测评报告"""
+from collections import Counter
+
+import fitz
+import pytest
+
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.extract_api import extract_safe_table
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.helper import contain_key
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.keywords_helper import KeyWordsHelper
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.outline_helper import OutlineHelper
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.page_cache import PdfPageCache
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.table_helper import TableHelper
+
+FONT = "china-s"
+HEADER = ["序号", "安全问题", "关联资产", "风险等级"]
+WIDTHS = [40, 200, 150, 80]
+
+
+def draw_text(page, x, y, text, size=10.5):
+    page.insert_text((x, y), text, fontname=FONT, fontsize=size)
+
+
+def draw_table(page, top, rows, widths, row_h=22, left=60):
+    xs = [left]
+    for w in widths:
+        xs.append(xs[-1] + w)
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            draw_text(page, xs[c] + 3, top + r * row_h + 15, cell, 9)
+    bottom = top + len(rows) * row_h
+    for r in range(len(rows) + 1):
+        page.draw_line((xs[0], top + r * row_h), (xs[-1], top + r * row_h))
+    for x in xs:
+        page.draw_line((x, top), (x, bottom))
+
+
+def risk_rows(start, end, asset, level):
+    return [[str(i), f"问题{i}", f"{asset}{i}", level] for i in range(start, end)]
+
+
+@pytest.fixture(scope="module")
+def report_pdf(tmp_path_factory):
+    """
+    1 封面  2 等级测评结论  3 总体评价  4 目录
+    5~9 正文，显示第1~5页；安全问题风险分析表从第6页跨到第8页，第8页表格下方为等级测评结论
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    draw_text(page, 60, 100, "某电力监控系统等级测评报告", 18)
+    draw_text(page, 60, 200, "报告时间：2024年01月02日")
+    page = doc.new_page()
+    draw_text(page, 60, 80, "等级测评结论", 14)
+    draw_table(page, 120, [["测评结论", "基本符合", "综合得分", "89.9"]], [80, 120, 80, 80])
+    page = doc.new_page()
+    draw_text(page, 60, 80, "总体评价", 14)
+    page = doc.new_page()
+    draw_text(page, 250, 80, "目 录", 16)
+    for i, line in enumerate(["1 概述 ........................ 1",
+                              "5 安全问题风险分析 .............. 2",
+                              "6 等级测评结论 .................. 4",
+                              "7 总体评价 ...................... 5"]):
+        draw_text(page, 60, 150 + i * 40, line)
+    for show in range(1, 6):
+        page = doc.new_page()
+        draw_text(page, 280, 810, f"第 {show} 页", 9)
+        if show == 1:
+            draw_text(page, 60, 80, "1 概述")
+        elif show == 2:
+            draw_text(page, 60, 80, "5 安全问题风险分析", 14)
+            draw_table(page, 120, [HEADER] + risk_rows(1, 8, "服务器", "高"), WIDTHS)
+        elif show == 3:
+            draw_table(page, 60, [HEADER] + risk_rows(8, 15, "交换机", "中"), WIDTHS)
+        elif show == 4:
+            draw_table(page, 60, risk_rows(15, 18, "工作站", "低"), WIDTHS)
+            draw_text(page, 60, 200, "6 等级测评结论", 14)
+        else:
+            draw_text(page, 60, 80, "7 总体评价", 14)
+    path = tmp_path_factory.mktemp("pdf") / "report.pdf"
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+EXPECTED_TABLE = [HEADER] + risk_rows(1, 8, "服务器", "高") + risk_rows(8, 15, "交换机", "中") \
+                 + risk_rows(15, 18, "工作站", "低")
+
+
+def test_outline_helper(report_pdf):
+    oh = OutlineHelper(report_pdf)
+    assert (oh.outline_start_page, oh.outline_end_page, oh.difference) == (4, 4, 4)
+    assert (oh.start_chapter, oh.start_page, oh.end_chapter, oh.end_page) == ("安全问题风险分析", 6, "等级测评结论", 8)
+
+
+def test_extract_safe_table(report_pdf):
+    assert extract_safe_table(report_pdf) == EXPECTED_TABLE
+
+
+def test_keywords_helper(report_pdf):
+    kh = KeyWordsHelper(report_pdf)
+    assert (kh.report_time, kh.cpjl, kh.score) == ("2024年01月02日", "基本符合", "89.9")
+
+
+def test_shared_page_cache_parses_each_page_once(report_pdf, monkeypatch):
+    calls = Counter()
+    load_page, get_text, find_tables = fitz.Document.load_page, fitz.Page.get_text, fitz.Page.find_tables
+
+    def counting_load_page(doc, page_id=0):
+        calls[("load_page", page_id)] += 1
+        return load_page(doc, page_id)
+
+    def counting_get_text(page, option="text", *args, **kwargs):
+        # find_tables 内部也会调用 get_text("dict"/"rawdict")，只统计纯文本与文本块
+        if option in ("text", "blocks"):
+            calls[(option, page.number)] += 1
+        return get_text(page, option, *args, **kwargs)
+
+    def counting_find_tables(page, clip=None, **kwargs):
+        calls[("find_tables", page.number, tuple(clip) if clip else None, kwargs.get("snap_tolerance"))] += 1
+        return find_tables(page, clip=clip, **kwargs)
+
+    monkeypatch.setattr(fitz.Document, "load_page", counting_load_page)
+    monkeypatch.setattr(fitz.Page, "get_text", counting_get_text)
+    monkeypatch.setattr(fitz.Page, "find_tables", counting_find_tables)
+    assert extract_safe_table(report_pdf) == EXPECTED_TABLE
+    assert calls and max(calls.values()) == 1
+
+    calls.clear()
+    with PdfPageCache(report_pdf) as page_cache:
+        KeyWordsHelper(report_pdf, page_cache=page_cache)
+        OutlineHelper(report_pdf, page_cache=page_cache)
+        assert not page_cache.doc.is_closed
+    assert page_cache.doc.is_closed
+    assert max(calls.values()) == 1
+
+
+def test_first_page_and_show_page(tmp_path):
+    doc = fitz.open()
+    words = ["等级测评结论", "总体评价", "安全问题风险分析", "目 录", "网络安全", "测评"]
+    for i in range(60):
+        page = doc.new_page()
+        draw_text(page, 60, 80, words[i % len(words)] + f" 第{i}节")
+        if i % 7 == 3:
+            draw_text(page, 280, 810, f"第 {i - 2} 页", 9)
+    path = tmp_path / "many.pdf"
+    doc.save(path)
+    doc.close()
+
+    with PdfPageCache(str(path)) as page_cache:
+        for keyword in ["总体评价", "等级测评结论", "目录", "目 录", "安全", "第5", "不存在", "第\\d+节"]:
+            for start, end in [(0, 60), (10, 30), (45, 60)]:
+                expected = next((i for i in range(start, end) if contain_key(page_cache.text(i), keyword)), -1)
+                assert page_cache.first_page(keyword, start, end) == expected
+        assert page_cache.first_show_page(0, 60) == (1, 3)
+        assert page_cache.first_show_page(4, 11) == (8, 10)
+        assert page_cache.first_show_page(11, 17) == (None, -1)
+
+
+@pytest.fixture
+def misaligned_pdf(tmp_path):
+    """表头第三列竖线偏移4.5，snap_tolerance < 5 时表头会多出一个空单元格"""
+    doc = fitz.open()
+    page = doc.new_page()
+    draw_text(page, 60, 80, "5 安全问题风险分析", 14)
+    xs, top, row_h = [60, 100, 300, 450, 530], 100, 22
+    rows = [HEADER] + risk_rows(1, 6, "服务器", "高")
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            draw_text(page, xs[c] + 8, top + r * row_h + 15, cell, 9)
+    bottom = top + len(rows) * row_h
+    for r in range(len(rows) + 1):
+        page.draw_line((xs[0], top + r * row_h), (xs[-1], top + r * row_h))
+    for i, x in enumerate(xs):
+        if i == 2:
+            page.draw_line((x + 4.5, top), (x + 4.5, top + row_h))
+            page.draw_line((x, top + row_h), (x, bottom))
+        else:
+            page.draw_line((x, top), (x, bottom))
+    page = doc.new_page()
+    draw_text(page, 60, 80, "6 等级测评结论", 14)
+    path = tmp_path / "misaligned.pdf"
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_cached_drawings_match_direct_find_tables(misaligned_pdf):
+    with fitz.open(misaligned_pdf) as doc, PdfPageCache(misaligned_pdf) as page_cache:
+        for clip in [None, (0, 90, 595, 842)]:
+            for snap in [3, 4, 5, 6, 7]:
+                expected = [t.extract() for t in doc[0].find_tables(clip=clip, snap_tolerance=snap).tables]
+                assert [t.extract() for t in page_cache.find_tables(0, clip=clip, snap_tolerance=snap)] == expected
+
+
+@pytest.mark.parametrize("rotation", [90, 180, 270])
+def test_find_tables_on_rotated_page(tmp_path, rotation):
+    doc = fitz.open()
+    page = doc.new_page()
+    draw_table(page, 100, [HEADER[:3]] + [row[:3] for row in risk_rows(1, 5, "服务器", "高")], WIDTHS[:3])
+    page.set_rotation(rotation)
+    path = tmp_path / "rotated.pdf"
+    doc.save(path)
+    doc.close()
+
+    with fitz.open(path) as doc, PdfPageCache(str(path)) as page_cache:
+        for snap in [None, 4]:
+            kwargs = {} if snap is None else {"snap_tolerance": snap}
+            expected = [t.extract() for t in doc[0].find_tables(**kwargs).tables]
+            assert len(expected) == 1
+            assert [t.extract() for t in page_cache.find_tables(0, snap_tolerance=snap)] == expected
+
+
+def test_find_valid_snap(misaligned_pdf, monkeypatch):
+    snaps = []
+    find_tables = fitz.Page.find_tables
+
+    def counting_find_tables(page, clip=None, **kwargs):
+        snaps.append(kwargs.get("snap_tolerance"))
+        return find_tables(page, clip=clip, **kwargs)
+
+    monkeypatch.setattr(fitz.Page, "find_tables", counting_find_tables)
+    with PdfPageCache(misaligned_pdf) as page_cache:
+        th = TableHelper(misaligned_pdf, 1, 2, "安全问题风险分析", "等级测评结论", page_cache=page_cache)
+        assert th.snap_tolerance == 5
+        assert th.header_list == HEADER
+        assert th.merge_table == risk_rows(1, 6, "服务器", "高")
+        # 首页：默认3、4、5各识别一次；末页识别一次
+        assert sorted(snaps) == [3, 4, 5, 5]
@@ -0,0 +1,70 @@
+"""安全类型分类测试：Aho-Corasick 打分结果必须与逐关键词子串判断完全一致"""
+import random
+
+import pytest
+
+from csm_ai_service.server.csm_analyze.protection_pdf_extract import extract_api
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.keyword_matcher import AhoCorasick
+from csm_ai_service.server.csm_analyze.protection_pdf_extract.extract_api import (
+    SecurityPredictItem,
+    SecurityPredictRequest,
+    _security_type_weighted_keywords,
+)
+
+
+def reference_score(content: str, target_type: int) -> float:
+    """原逐关键词子串判断的实现"""
+    if not content:
+        return 0.0
+    content_lower = content.lower()
+    weighted_keywords = _security_type_weighted_keywords.get(target_type, [])
+    hit_weight_sum = sum(weight for kw, weight in weighted_keywords if kw.lower() in content_lower)
+    max_weight_sum = sum(weight for _, weight in weighted_keywords)
+    if max_weight_sum == 0:
+        return 0.0
+    confidence = 0.3 + 0.65 * (hit_weight_sum / max_weight_sum)
+    return round(min(confidence, 0.95), 4)
+
+
+def reference_predict(item: SecurityPredictItem):
+    if item.securityType:
+        return item.securityType, max(reference_score(item.content, item.securityType), 0.5)
+    if not item.content:
+        return 0, 0.0
+    best_type, best_score = 0, 0.0
+    for type_code in _security_type_weighted_keywords:
+        score = reference_score(item.content, type_code)
+        if score > best_score:
+            best_type, best_score = type_code, score
+    return best_type, best_score
+
+
+def random_contents(n: int):
+    rng = random.Random(20261019)
+    keywords = [kw for kws in _security_type_weighted_keywords.values() for kw, _ in kws]
+    fillers = ["的", "未", "对", "进行", "配置", "设备", "安全", "系统", "Telnet", "NOBODY", "snmp", " ", "，"]
+    for _ in range(n):
+        yield "".join(rng.choice(keywords + fillers * 3) for _ in range(rng.randint(0, 25)))
+
+
+def test_aho_corasick_finds_overlapping_keywords():
+    automaton = AhoCorasick(["网络", "网络边界", "边界", "界设", "a"])
+    assert automaton.find("未对网络边界设备进行检查") == {0, 1, 2, 3}
+    assert automaton.find("") == set()
+
+
+@pytest.mark.parametrize("content", [
+    "", "未部署入侵检测系统，网络边界未防范ARP欺骗", "机房未设置电子门禁和防盗报警", "存在NOBODY等多余用户",
+    "服务器未安装杀毒软件，数据库未定期数据备份", "无关内容",
+])
+def test_scores_match_reference(content):
+    for type_code in list(_security_type_weighted_keywords) + [0, 99]:
+        assert extract_api._calc_score_for_type(content, type_code) == reference_score(content, type_code)
+
+
+def test_predict_matches_reference():
+    items = [SecurityPredictItem(content=content, securityType=i % 3 * (i % 17), seq=i)
+             for i, content in enumerate(random_contents(3000))]
+    results = extract_api.predict_security_type_list(SecurityPredictRequest(items=items))
+    for item, result in zip(items, results):
+        assert (result.predict_securityType, result.predict_score) == reference_predict(item)
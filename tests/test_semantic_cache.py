@@ -0,0 +1,121 @@
+"""语义缓存测试：使用假的 embedding 和假的 LLM，不依赖模型服务"""
+import asyncio
+import json
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from csm_ai_service.server.conversation.chat import kb_chat as kb_chat_module
+from csm_ai_service.server.conversation.knowledge_base.kb_cache.semantic_cache import SemanticCache
+
+
+def fake_embed(text: str):
+    """按字符哈希的词袋向量：字符组成越接近，余弦相似度越高"""
+    vector = np.zeros(64, dtype=np.float32)
+    for ch in text:
+        vector[zlib.crc32(ch.encode()) % 64] += 1
+    return vector.tolist()
+
+
+class FakeStreamingChatModel(FakeListChatModel):
+    """逐字符回调 on_llm_new_token，模拟流式 LLM"""
+    streaming: bool = True
+
+
+DOCS = [{"page_content": "电力监控系统应当安全分区、网络专用、横向隔离、纵向认证。", "metadata": {"source": "27号令.pdf"}}]
+
+
+def test_hit_for_near_identical_query():
+    cache = SemanticCache(embed_func=fake_embed)
+    lookup = cache.lookup("samples", "电力监控系统安全防护的原则是什么")
+    assert lookup.hit is None
+    cache.store(lookup, "安全分区、网络专用、横向隔离、纵向认证", DOCS)
+
+    lookup = cache.lookup("samples", "电力监控系统安全防护的原则是什么？")
+    assert lookup.hit is not None
+    assert lookup.hit.answer == "安全分区、网络专用、横向隔离、纵向认证"
+    assert lookup.hit.docs == DOCS
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_miss_for_other_query_and_other_kb():
+    cache = SemanticCache(embed_func=fake_embed)
+    cache.store(cache.lookup("samples", "电力监控系统安全防护的原则是什么"), "answer", DOCS)
+
+    assert cache.lookup("samples", "告警平台如何配置邮件通知").hit is None
+    assert cache.lookup("warning", "电力监控系统安全防护的原则是什么").hit is None
+    # 知识库名称大小写不敏感
+    assert cache.lookup("SAMPLES", "电力监控系统安全防护的原则是什么").hit is not None
+
+
+def test_version_bump_invalidates_entries():
+    cache = SemanticCache(embed_func=fake_embed)
+    query = "电力监控系统安全防护的原则是什么"
+    cache.store(cache.lookup("samples", query), "answer", DOCS)
+
+    cache.bump_version("samples")
+    assert cache.lookup("samples", query).hit is None
+
+    # 检索/生成期间知识库被修改，旧版本的答案不写入
+    stale = cache.lookup("samples", query)
+    cache.bump_version("samples")
+    cache.store(stale, "stale answer", DOCS)
+    assert cache.lookup("samples", query).hit is None
+
+
+def test_kb_chat_uses_cache(monkeypatch):
+    cache = SemanticCache(embed_func=fake_embed)
+    search_calls = []
+    llm_calls = []
+
+    def fake_search_kb_docs(kb, query, top_k, score_threshold, query_vector=None, embed_model=None):
+        search_calls.append((query, query_vector, embed_model))
+        return DOCS
+
+    def fake_llm(**kwargs):
+        llm_calls.append(1)
+        return FakeStreamingChatModel(responses=["安全分区、网络专用、横向隔离、纵向认证"],
+                                      callbacks=kwargs["callbacks"], streaming=True)
+
+    monkeypatch.setattr(kb_chat_module, "semantic_cache", cache)
+    monkeypatch.setattr(kb_chat_module, "search_kb_docs", fake_search_kb_docs)
+    monkeypatch.setattr(kb_chat_module, "get_ChatOpenAI", fake_llm)
+    monkeypatch.setattr(kb_chat_module.KBServiceFactory, "get_service_by_name", staticmethod(lambda name: SimpleNamespace(embed_model="fake-embed")))
+
+    async def ask(query):
+        ret = await kb_chat_module.kb_chat(query=query, kb_name="samples", stream=False, return_direct=False)
+        return json.loads(ret)["choices"][0]["message"]["content"]
+
+    first = asyncio.run(ask("电力监控系统安全防护的原则是什么"))
+    second = asyncio.run(ask("电力监控系统安全防护的原则是什么？"))
+
+    assert first == second == "安全分区、网络专用、横向隔离、纵向认证"
+    # 缓存未命中时检索复用语义缓存的问题向量
+    assert search_calls == [("电力监控系统安全防护的原则是什么", fake_embed("电力监控系统安全防护的原则是什么"), "fake-embed")]
+    assert len(llm_calls) == 1
+
+
+def test_search_reuses_query_vector_only_for_same_embed_model():
+    from langchain_core.documents import Document
+
+    from csm_ai_service.server.conversation.knowledge_base.kb_doc_api import search_kb_docs
+
+    class FakeKB:
+        embed_model = "fake-embed"
+
+        def __init__(self):
+            self.vectors = []
+
+        def search_docs(self, query, top_k, score_threshold, query_vector=None):
+            self.vectors.append(query_vector)
+            return [(Document(page_content=DOCS[0]["page_content"], metadata={"id": "1"}), 0.9)]
+
+    kb = FakeKB()
+    vector = fake_embed("问题")
+    docs = search_kb_docs(kb, "问题", 3, 0.3, query_vector=vector, embed_model="fake-embed")
+    search_kb_docs(kb, "问题", 3, 0.3, query_vector=vector, embed_model="other-embed")
+    search_kb_docs(kb, "问题", 3, 0.3)
+    assert kb.vectors == [vector, None, None]
+    assert docs[0]["page_content"] == DOCS[0]["page_content"] and docs[0]["score"] == 0.9
@@ -0,0 +1,119 @@
+"""流式输出测试：OpenAIChatStream 与 OpenAIChatOutput.model_dump_json 输出一致，coalesce_tokens 按间隔合并 token"""
+import asyncio
+import json
+
+import pytest
+
+from csm_ai_service.server.api_server.api_schemas import OpenAIChatOutput, OpenAIChatStream
+from csm_ai_service.server.utils import coalesce_tokens
+from csm_ai_service.settings import Settings
+
+MODEL = "qwen2.5-instruct"
+TOKENS = ["电力", "告警", "：", "7", "\"12\"", "\n", "\\n", "\t", "</script>", " level", "", "😀", " "]
+
+
+def expected_chunk(content, **kwargs):
+    return OpenAIChatOutput(
+        object="chat.completion.chunk",
+        content=content,
+        role="assistant",
+        **kwargs,
+    ).model_dump_json()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"model": MODEL},
+    {"model": None},
+    {"model": MODEL, "message_id": "abc123", "status": 2},
+    {"model": MODEL, "message_type": 2, "is_ref": True, "tool_calls": [{"name": "查询告警"}]},
+    {"model": MODEL, "docs": ["出处 [1] 测评报告.pdf"]},
+])
+def test_stream_chunk_matches_model_dump_json(kwargs):
+    stream_output = OpenAIChatStream(created=1700000000, **kwargs)
+    for token in TOKENS:
+        fast = stream_output.chunk(token)
+        slow = expected_chunk(token, id=stream_output.id, created=1700000000, **kwargs)
+        # 只有分隔符空白不同：解析后的值与字段顺序都一致
+        assert json.loads(fast) == json.loads(slow)
+        assert list(json.loads(fast)) == list(json.loads(slow))
+        assert json.loads(fast)["choices"][0]["delta"]["content"] == token
+
+
+def test_stream_keeps_one_id_per_stream():
+    first, second = OpenAIChatStream(model=MODEL), OpenAIChatStream(model=MODEL)
+    assert first.id != second.id
+    assert {json.loads(first.chunk(t))["id"] for t in TOKENS} == {first.id}
+    output = first.output(content="", docs=["doc"])
+    assert output.id == first.id and output.model == MODEL
+    assert json.loads(output.model_dump_json())["docs"] == ["doc"]
+
+
+async def produce(bursts, gap):
+    """按批产出 token，批与批之间间隔 gap 秒"""
+    for i, burst in enumerate(bursts):
+        if i:
+            await asyncio.sleep(gap)
+        for token in burst:
+            yield token
+            await asyncio.sleep(0)
+
+
+async def collect(tokens, interval):
+    return [text async for text in coalesce_tokens(tokens, interval)]
+
+
+def test_coalesce_disabled_passes_tokens_through():
+    tokens = produce([["a", "b"], ["c"]], 0)
+    assert coalesce_tokens(tokens, 0) is tokens
+    assert asyncio.run(collect(produce([["a", "b"], ["c"]], 0), 0)) == ["a", "b", "c"]
+
+
+def test_coalesce_merges_tokens_within_interval(monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "auto_reload", False)
+    monkeypatch.setattr(Settings.basic_settings, "SSE_COALESCE_INTERVAL", 0.05)
+    interval = Settings.basic_settings.SSE_COALESCE_INTERVAL
+    bursts = [["电力", "告警", "分析"], ["：", "共"], ["12", "条"]]
+
+    frames = asyncio.run(collect(produce(bursts, 0.3), interval))
+    # 每批 token 在合并间隔内到达，合成一帧；拼接后与逐 token 输出完全一致
+    assert frames == ["电力告警分析", "：共", "12条"]
+
+    stream_output = OpenAIChatStream(model=MODEL)
+    contents = [json.loads(stream_output.chunk(text))["choices"][0]["delta"]["content"] for text in frames]
+    assert "".join(contents) == "".join(sum(bursts, []))
+
+
+def test_coalesce_flushes_on_deadline_while_waiting():
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        received = []
+        async for text in coalesce_tokens(produce([["a", "b"], ["c"]], 0.5), 0.05):
+            received.append((text, loop.time() - start))
+        return received
+
+    (first, t1), (second, t2) = asyncio.run(main())
+    # 第一帧在间隔到期时发出，不等下一个 token 到达
+    assert (first, second) == ("ab", "c")
+    assert t1 < 0.4 <= t2
+
+
+def test_coalesce_close_cancels_pending_read():
+    cancelled = asyncio.Event()
+
+    async def slow_tokens():
+        yield "a"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        yield "b"
+
+    async def main():
+        frames = coalesce_tokens(slow_tokens(), 0.01)
+        assert await frames.__anext__() == "a"
+        await frames.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(main())
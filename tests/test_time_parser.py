@@ -0,0 +1,83 @@
+"""规则时间解析测试，固定当前时间为 2026-10-19（周一）"""
+from datetime import datetime
+
+import pytest
+
+from csm_ai_service.server.conversation.chat_agent.time_parser import has_time_hint, parse_time_expression
+
+NOW = datetime(2026, 10, 19, 10, 30)
+
+
+@pytest.mark.parametrize("query, start, end", [
+    ("最近三天告警", "2026-10-17", "2026-10-19"),
+    ("最近7天告警情况如何", "2026-10-13", "2026-10-19"),
+    ("近两周", "2026-10-06", "2026-10-19"),
+    ("过去3个月", "2026-07-20", "2026-10-19"),
+    ("近24小时", "2026-10-18", "2026-10-19"),
+    ("今天", "2026-10-19", "2026-10-19"),
+    ("昨天下午有哪些告警", "2026-10-18", "2026-10-18"),
+    ("前天", "2026-10-17", "2026-10-17"),
+    ("3天前", "2026-10-16", "2026-10-16"),
+    ("上周的告警", "2026-10-12", "2026-10-18"),
+    ("上周一共多少告警", "2026-10-12", "2026-10-18"),
+    ("上周三", "2026-10-14", "2026-10-14"),
+    ("周五", "2026-10-16", "2026-10-16"),
+    ("本月", "2026-10-01", "2026-10-19"),
+    ("上个月", "2026-09-01", "2026-09-30"),
+    ("上季度", "2026-07-01", "2026-09-30"),
+    ("去年", "2025-01-01", "2025-12-31"),
+    ("今年", "2026-01-01", "2026-10-19"),
+    ("2024年1月告警统计", "2024-01-01", "2024-01-31"),
+    ("２０２４年３月", "2024-03-01", "2024-03-31"),
+    ("十二月", "2025-12-01", "2025-12-31"),
+    ("2024-01-05的告警", "2024-01-05", "2024-01-05"),
+    ("1月5号", "2026-01-05", "2026-01-05"),
+    ("2024/1/5到2024/1/10", "2024-01-05", "2024-01-10"),
+    ("1月1日至1月10日", "2026-01-01", "2026-01-10"),
+    ("last 7 days", "2026-10-13", "2026-10-19"),
+    ("past two weeks", "2026-10-06", "2026-10-19"),
+    ("yesterday", "2026-10-18", "2026-10-18"),
+    ("last month", "2026-09-01", "2026-09-30"),
+    ("5 days ago", "2026-10-14", "2026-10-14"),
+    # 年份/月份限定、相对日期作区间端点、月份区间
+    ("去年3月", "2025-03-01", "2025-03-31"),
+    ("去年10月", "2025-10-01", "2025-10-31"),
+    ("前年12月5日", "2024-12-05", "2024-12-05"),
+    ("上个月5号", "2026-09-05", "2026-09-05"),
+    ("昨天到今天", "2026-10-18", "2026-10-19"),
+    ("本月1号到今天", "2026-10-01", "2026-10-19"),
+    ("上周一到今天", "2026-10-12", "2026-10-19"),
+    ("2025年3月到5月", "2025-03-01", "2025-05-31"),
+    ("从2025年3月1日至5月10日的告警", "2025-03-01", "2025-05-10"),
+    ("1-3月", "2026-01-01", "2026-03-31"),
+    ("11月到2月", "2025-11-01", "2026-02-28"),
+    ("yesterday to today", "2026-10-18", "2026-10-19"),
+])
+def test_parse(query, start, end):
+    result = parse_time_expression(query, NOW)
+    assert result is not None
+    assert (result["start_date"], result["end_date"]) == (start, end)
+
+
+def test_time_desc_keeps_original_text():
+    assert parse_time_expression("昨天下午有哪些告警", NOW)["time_desc"] == "昨天下午"
+
+
+def test_no_parse():
+    assert parse_time_expression("告警情况如何", NOW) is None
+    assert not has_time_hint("告警情况如何")
+    # 有时间语义但规则无法确定范围，交给 LLM
+    assert parse_time_expression("最近的告警", NOW) is None
+    assert has_time_hint("最近的告警")
+
+
+@pytest.mark.parametrize("query", ["上周和本周对比", "今天和昨天", "2024年1月以来", "上个月5号到10号"])
+def test_ambiguous_or_partially_parsed_falls_back(query):
+    # 多个时间段、或识别后仍剩余时间语义时不给出规则结果，交给 LLM
+    assert parse_time_expression(query, NOW) is None
+    assert has_time_hint(query)
+
+
+def test_invalid_day_degrades_to_month():
+    result = parse_time_expression("2月30日", NOW)
+    assert (result["start_date"], result["end_date"]) == ("2026-02-01", "2026-02-28")
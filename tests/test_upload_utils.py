@@ -0,0 +1,129 @@
+"""上传文件流式落盘测试：分块写入、增量哈希、大小上限，以及合同上传按内容去重"""
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from csm_ai_service.server import upload_utils
+from csm_ai_service.server.api_server import ocr_routes
+from csm_ai_service.server.upload_utils import UploadTooLargeError, save_upload_file
+from csm_ai_service.settings import Settings
+
+CONTENT = os.urandom(100_000)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "auto_reload", False)
+    monkeypatch.setattr(Settings.basic_settings, "UPLOAD_CHUNK_SIZE", 4096)
+    monkeypatch.setattr(Settings.basic_settings, "UPLOAD_MAX_SIZE", 1024 * 1024)
+
+
+def make_upload(content=CONTENT, filename="a.pdf", size=None):
+    return UploadFile(io.BytesIO(content), size=size, filename=filename)
+
+
+def test_save_upload_file_streams_and_hashes(tmp_path, monkeypatch):
+    upload = make_upload()
+    reads = []
+    read = upload.file.read
+    monkeypatch.setattr(upload.file, "read", lambda n=-1: reads.append(n) or read(n))
+
+    saved = save_upload_file(upload, str(tmp_path / "sub" / "a.pdf"))
+
+    assert (saved.size, saved.sha256) == (len(CONTENT), hashlib.sha256(CONTENT).hexdigest())
+    assert (tmp_path / "sub" / "a.pdf").read_bytes() == CONTENT
+    assert set(reads) == {4096}
+    assert upload.file.tell() == 0
+
+
+def test_size_limit(tmp_path):
+    # 解析器记录了大小时直接拒绝，不写任何数据
+    with pytest.raises(UploadTooLargeError):
+        save_upload_file(make_upload(size=len(CONTENT)), str(tmp_path / "a.pdf"), max_size=50_000)
+    # 未记录大小时写到超限为止，并清理临时文件
+    with pytest.raises(UploadTooLargeError):
+        save_upload_file(make_upload(), str(tmp_path / "a.pdf"), max_size=50_000)
+    assert os.listdir(tmp_path) == []
+    assert save_upload_file(make_upload(), str(tmp_path / "a.pdf"), max_size=0).size == len(CONTENT)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """合同/任务表用内存字典代替，上传目录与缓存目录指向临时目录"""
+    contracts = {}
+    monkeypatch.setattr(Settings.basic_settings, "UPLOADS_DIR", tmp_path / "uploads")
+    os.makedirs(tmp_path / "uploads")
+
+    def ensure_cache_dir(contract_id):
+        cache_dir = tmp_path / "cache" / str(contract_id)
+        os.makedirs(cache_dir, exist_ok=True)
+        return str(cache_dir)
+
+    monkeypatch.setattr(ocr_routes, "ensure_cache_dir", ensure_cache_dir)
+
+    def to_dict(c):
+        return {**c, "file_path": os.path.join(Settings.basic_settings.UPLOADS_DIR, c["file_name"])}
+
+    def add_contract(file_name, file_size=0, file_type="pdf", status="pending", file_hash=None):
+        cid = len(contracts) + 1
+        contracts[cid] = {"id": cid, "file_name": file_name, "file_size": file_size, "file_hash": file_hash}
+        return cid
+
+    monkeypatch.setattr(ocr_routes, "add_contract", add_contract)
+    monkeypatch.setattr(ocr_routes, "get_contract_by_hash", lambda h: next(
+        (to_dict(c) for c in contracts.values() if c["file_hash"] == h), None))
+    monkeypatch.setattr(ocr_routes, "get_contract_by_name", lambda n: next(
+        (to_dict(c) for c in contracts.values() if c["file_name"] == n), None))
+    monkeypatch.setattr(ocr_routes, "update_contract", lambda cid, file_hash=None: contracts[cid].update(file_hash=file_hash))
+    monkeypatch.setattr(ocr_routes, "add_task", lambda contract_id, status: contract_id * 100)
+    monkeypatch.setattr(ocr_routes.task_worker, "submit_task", lambda task_id: None)
+    app = FastAPI()
+    app.include_router(ocr_routes.ocr_router)
+    client = TestClient(app)
+    client.contracts = contracts
+    return client
+
+
+def upload(client, content, filename="合同.pdf"):
+    return client.post("/api/upload", files={"file": (filename, content, "application/pdf")}).json()
+
+
+def test_upload_dedupes_by_content(client, tmp_path):
+    first = upload(client, CONTENT)
+    assert first["success"] and not first["data"]["existed"]
+    uploads = tmp_path / "uploads"
+    assert (uploads / "合同.pdf").read_bytes() == CONTENT
+    assert open(first["data"]["file_path"], "rb").read() == CONTENT
+
+    # 内容相同、文件名不同：复用已有合同
+    again = upload(client, CONTENT, filename="副本.pdf")
+    assert again["data"]["existed"] and again["data"]["contract_id"] == first["data"]["contract_id"]
+
+    # 文件名相同、内容不同：新建合同，文件名追加哈希前缀，不覆盖原文件
+    other = b"%PDF-other" + CONTENT
+    second = upload(client, other)
+    assert not second["data"]["existed"]
+    assert second["data"]["file_name"] == f"合同_{hashlib.sha256(other).hexdigest()[:8]}.pdf"
+    assert (uploads / "合同.pdf").read_bytes() == CONTENT
+    assert sorted(os.listdir(uploads)) == sorted(["合同.pdf", second["data"]["file_name"]])
+
+
+def test_upload_matches_legacy_contract_without_hash(client, tmp_path):
+    (tmp_path / "uploads" / "旧合同.pdf").write_bytes(CONTENT)
+    client.contracts[1] = {"id": 1, "file_name": "旧合同.pdf", "file_size": len(CONTENT), "file_hash": None}
+
+    res = upload(client, CONTENT, filename="旧合同.pdf")
+    assert res["data"]["existed"] and res["data"]["contract_id"] == 1
+    assert client.contracts[1]["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_upload_rejects_large_file(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings.basic_settings, "UPLOAD_MAX_SIZE", 1000)
+    res = upload(client, CONTENT)
+    assert not res["success"] and "大小上限" in res["message"]
+    assert os.listdir(tmp_path / "uploads") == []
+    assert upload_utils.check_upload_size(make_upload(size=10)) is None
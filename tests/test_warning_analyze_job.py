@@ -0,0 +1,117 @@
+"""告警处置报告异步研判任务测试：假的提取/检索/LLM，验证提交-轮询-流式接口和并行执行"""
+import json
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from csm_ai_service.server.api_server.warning_routes import warning_router
+from csm_ai_service.server.csm_analyze.warning_analysis import analyze_job, report_analyze
+from csm_ai_service.settings import Settings
+
+DELAY = 0.3
+
+
+@pytest.fixture
+def client(monkeypatch):
+    os.makedirs(Settings.basic_settings.BASE_TEMP_DIR, exist_ok=True)
+    monkeypatch.setattr(report_analyze, "_warning_data_cache", {})
+    for cache in (report_analyze._extract_cache, report_analyze._analysis_cache):
+        monkeypatch.setattr(cache, "_data", type(cache._data)())
+        monkeypatch.setattr(cache, "_bytes", 0)
+
+    def fake_extract(file_path, file_name, ext):
+        assert os.path.exists(file_path)
+        time.sleep(DELAY)
+        return {"告警信息": "监测装置发现未授权访问"}
+
+    def fake_rag(alarm_desc, top_k, score_threshold):
+        time.sleep(DELAY)
+        return "未检索到同类电力告警处置报告"
+
+    monkeypatch.setattr(report_analyze, "extract_dict_from_file_by_llm", fake_extract)
+    monkeypatch.setattr(report_analyze, "construct_rag_prompt", fake_rag)
+    monkeypatch.setattr(report_analyze, "get_ChatOpenAI", lambda **kwargs: FakeListChatModel(
+        responses=['{"audit_result": "通过", "summary": "处置完整"}']))
+    monkeypatch.setattr(report_analyze, "get_default_llm", lambda: "fake")
+
+    worker = analyze_job.WarningAnalyzeWorker()
+    monkeypatch.setattr(analyze_job, "warning_analyze_worker", worker)
+    worker.start()
+    app = FastAPI()
+    app.include_router(warning_router)
+    yield TestClient(app)
+    worker.stop()
+
+
+def submit(client, alarm_desc=""):
+    res = client.post("/warning/analyze/submit",
+                      data={"warning_number": "W1", "alarm_desc": alarm_desc},
+                      files={"file": ("report.txt", "告警处置报告内容".encode("utf-8"))}).json()
+    assert res["code"] == 200
+    return res["data"]["job_id"]
+
+
+def wait_job(client, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f"/warning/analyze/jobs/{job_id}").json()["data"]
+        if data["status"] in ("completed", "failed"):
+            return data
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+
+def test_submit_and_poll(client):
+    job_id = submit(client)
+    job = wait_job(client, job_id)
+
+    assert job["status"] == "completed"
+    assert job["result"]["data"]["audit_result"] == "通过"
+    stages = [e["stage"] for e in job["events"]]
+    assert stages == ["queued", "extracting", "extracted", "retrieving", "analyzing", "completed"]
+    assert job["events"][-1]["progress"] == 100
+    # 临时文件已清理
+    assert not [f for f in os.listdir(Settings.basic_settings.BASE_TEMP_DIR) if job_id in f]
+
+
+def test_extraction_and_retrieval_run_in_parallel(client):
+    start = time.perf_counter()
+    job = wait_job(client, submit(client, alarm_desc="监测装置发现未授权访问"))
+    elapsed = time.perf_counter() - start
+
+    assert job["status"] == "completed"
+    assert elapsed < DELAY * 2
+
+
+def test_stream_events(client):
+    job_id = submit(client)
+    with client.stream("GET", f"/warning/analyze/jobs/{job_id}/stream") as res:
+        events = [json.loads(line[len("data: "):]) for line in res.iter_lines() if line.startswith("data: ")]
+
+    assert [e.get("stage") for e in events[:-1]][-1] == "completed"
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["result"]["data"]["audit_result"] == "通过"
+
+
+def test_unknown_job(client):
+    assert client.get("/warning/analyze/jobs/missing").json()["code"] == 404
+
+
+def test_cached_extraction_survives_eviction_before_run(client, monkeypatch):
+    assert wait_job(client, submit(client))["status"] == "completed"
+
+    queued = []
+    monkeypatch.setattr(analyze_job.warning_analyze_worker, "submit", lambda job: queued.append(job) or job)
+    submit(client)
+    job = queued[0]
+    # 提交时已取到提取结果，无需落盘；执行前提取缓存被淘汰也不影响
+    assert job.file_path is None and job.extracted["告警信息"] == "监测装置发现未授权访问"
+    report_analyze._extract_cache.clear()
+    report_analyze._analysis_cache.clear()
+    analyze_job.warning_analyze_worker._process(job)
+    assert job.status == "completed"
+    assert job.result["data"]["audit_result"] == "通过"
@@ -0,0 +1,117 @@
+"""告警研判缓存测试：容量/字节数/TTL 限制，以及相同报告重复研判时跳过提取和 LLM"""
+import io
+import os
+import time
+
+from fastapi import UploadFile
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from csm_ai_service.server.csm_analyze.warning_analysis import report_analyze
+from csm_ai_service.server.csm_analyze.warning_analysis.data_cache import BoundedTTLCache
+from csm_ai_service.settings import Settings
+
+
+def test_entry_and_byte_limits():
+    cache = BoundedTTLCache("test", max_entries=2, max_bytes=1000, ttl=60)
+    cache.set("a", {"v": "a"})
+    cache.set("b", {"v": "b"})
+    assert cache.get("a") == {"v": "a"}  # a 变为最近使用
+    cache.set("c", {"v": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    cache.set("big", {"v": "x" * 900})
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get("big") is not None
+    # 单条超过上限不缓存
+    cache.set("huge", {"v": "x" * 2000})
+    assert cache.get("huge") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] >= 2
+    assert stats["hits"] == 4 and stats["misses"] == 2
+
+
+def test_ttl_and_copy():
+    cache = BoundedTTLCache("test", max_entries=10, max_bytes=10000, ttl=0.05)
+    data = {"告警信息": "未授权访问"}
+    cache.set("k", data)
+    data["告警信息"] = "changed"
+    value = cache.get("k")
+    assert value == {"告警信息": "未授权访问"}
+    value["warning_number"] = "W1"
+    assert cache.get("k") == {"告警信息": "未授权访问"}
+
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_reupload_skips_extraction_and_llm(monkeypatch):
+    os.makedirs(Settings.basic_settings.BASE_TEMP_DIR, exist_ok=True)
+    monkeypatch.setattr(report_analyze, "_warning_data_cache", {})
+    for cache in (report_analyze._extract_cache, report_analyze._analysis_cache):
+        monkeypatch.setattr(cache, "_data", type(cache._data)())
+        monkeypatch.setattr(cache, "_bytes", 0)
+    extract_calls, llm_calls = [], []
+
+    def fake_extract(file_path, file_name, ext):
+        extract_calls.append(file_name)
+        return {"告警信息": "监测装置发现未授权访问"}
+
+    def fake_llm(**kwargs):
+        llm_calls.append(1)
+        return FakeListChatModel(responses=['{"audit_result": "通过", "summary": "处置完整"}'])
+
+    monkeypatch.setattr(report_analyze, "extract_dict_from_file_by_llm", fake_extract)
+    monkeypatch.setattr(report_analyze, "construct_rag_prompt", lambda **kwargs: "未检索到同类电力告警处置报告")
+    monkeypatch.setattr(report_analyze, "get_ChatOpenAI", fake_llm)
+    monkeypatch.setattr(report_analyze, "get_default_llm", lambda: "fake")
+
+    def analyze(warning_number, filename):
+        file = UploadFile(file=io.BytesIO("告警处置报告内容".encode("utf-8")), filename=filename)
+        return report_analyze.warning_analyze(warning_number=warning_number, file=file)
+
+    first = analyze("W1", "report.txt")
+    second = analyze("W2", "report_copy.txt")
+
+    assert first.code == second.code == 200
+    assert first.data == second.data
+    assert first.data["audit_result"] == "通过"
+    assert extract_calls == ["report.txt"]
+    assert len(llm_calls) == 1
+    # 两个告警编号都能取到待入库的提取数据
+    assert report_analyze.get_warning_data_from_cache("W2")["告警信息"] == "监测装置发现未授权访问"
+
+
+def test_analysis_cache_is_keyed_by_alarm_desc(monkeypatch):
+    monkeypatch.setattr(report_analyze, "_warning_data_cache", {})
+    for cache in (report_analyze._extract_cache, report_analyze._analysis_cache):
+        monkeypatch.setattr(cache, "_data", type(cache._data)())
+        monkeypatch.setattr(cache, "_bytes", 0)
+    rag_queries, llm_calls = [], []
+    monkeypatch.setattr(report_analyze, "construct_rag_prompt", lambda **kwargs: rag_queries.append(kwargs["alarm_desc"]))
+    monkeypatch.setattr(report_analyze, "get_ChatOpenAI", lambda **kwargs: llm_calls.append(1) or FakeListChatModel(
+        responses=['{"audit_result": "通过"}']))
+    monkeypatch.setattr(report_analyze, "get_default_llm", lambda: "fake")
+    report_analyze._extract_cache.set("h", {"告警信息": "提取的告警信息"})
+
+    for alarm_desc in ["", "客户端描述", "", "客户端描述"]:
+        assert report_analyze.run_warning_analyze("W1", "report.txt", "h", alarm_desc=alarm_desc).code == 200
+    # 不同检索描述各研判一次，相同描述复用
+    assert rag_queries == ["提取的告警信息", "客户端描述"]
+    assert len(llm_calls) == 2
+
+
+def test_pending_warning_data_is_never_evicted(monkeypatch):
+    monkeypatch.setattr(report_analyze, "_warning_data_cache", {})
+    count = Settings.kb_settings.WARNING_CACHE_MAX_ENTRIES + 10
+    for i in range(count):
+        report_analyze.set_warning_data_to_cache(f"W{i}", {"告警信息": f"告警{i}"})
+    # 等待人工保存的数据不受条数上限与过期时间影响，保存/删除时才移除
+    assert report_analyze.get_warning_data_from_cache("W0") == {"告警信息": "告警0"}
+    assert report_analyze.get_warning_cache_stats()["warning_data"] == {"entries": count}
+    report_analyze.clear_warning_cache("W0")
+    report_analyze.clear_warning_cache("W0")
+    assert report_analyze.get_warning_data_from_cache("W0") is None
+    assert report_analyze.get_warning_cache_stats()["warning_data"] == {"entries": count - 1}